@@ -0,0 +1,77 @@
+"""
+This module benchmarks the Filters methods on a list of tuples against the same
+filters on a NumPy-backed EntryFrame, for several table sizes. The frame build
+time is reported separately from the filter time.
+
+Usage:
+------
+Run this module from the repository root. Large sizes need several GB of memory
+for the tuple path.
+
+Example:
+--------
+    python -m benchmarks.bench_frame --sizes 10000 1000000 10000000
+"""
+
+import argparse  # Import argparse to read the benchmark options from the command line.
+import time  # Import time to measure the elapsed time.
+from crawler.entry import Entry  # Import the Entry record to build the entries.
+from crawler.filters import Filters  # Import the Filters class to benchmark.
+from crawler.frame import EntryFrame  # Import the EntryFrame class to benchmark.
+
+TITLES = [
+    'Show HN: A tiny SQLite-backed job queue',
+    'Zig',
+    'How I write HTTP servers after 13 years',
+    'Compilers are databases',
+    'Notes on structured concurrency, or: Go statement considered harmful',
+    'Plan 9 from User Space',
+]
+
+
+def make_entries(rows):
+    """
+    Builds synthetic Entry records.
+    """
+    return [Entry(i, TITLES[i % len(TITLES)], (i * 7919) % 1000, (i * 104729) % 500) for i in range(1, rows + 1)]
+
+
+def timed(function, *args):
+    """
+    Calls a function and returns its result and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+    Runs both filter paths for every size and prints the timings.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 4, 10 ** 6, 10 ** 7], help='table sizes')
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        entries = make_entries(rows)
+        entry_frame, build = timed(EntryFrame.from_entries, entries)
+        print(f"{rows:>10} rows  frame build {build:8.3f} s")
+        for method in (Filters.filter_by_comments, Filters.filter_by_points):
+            expected, tuples = timed(method, entries)
+            result, vectorized = timed(method, entry_frame)
+            assert result == expected, "Both paths must return the same ordering"
+            print(
+                f"{rows:>10} rows  {method.__name__:<20} tuples {tuples:8.3f} s"
+                f"  frame {vectorized:8.3f} s  speedup {tuples / vectorized:5.1f}x"
+            )
+            # A top-100 view converts only 100 rows back to tuples, so the ranking dominates.
+            _, tuples_top = timed(lambda: method(entries, top_k=100))
+            _, frame_top = timed(lambda: method(entry_frame, top_k=100))
+            print(
+                f"{rows:>10} rows  {method.__name__:<20} top_k=100 tuples {tuples_top:8.3f} s"
+                f"  frame {frame_top:8.3f} s  speedup {tuples_top / frame_top:5.1f}x"
+            )
+
+if __name__ == '__main__':
+    main()
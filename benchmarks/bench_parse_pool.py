@@ -0,0 +1,69 @@
+"""
+This module benchmarks parsing a backfill of listing pages in a process pool
+with Scraper.parse_pages. The same set of pages is parsed with an increasing
+number of worker processes, and the throughput and scaling efficiency against
+a single process are reported.
+
+Usage:
+------
+Run this module from the repository root. Scaling is only visible on a
+machine with several cores; use the 'bs4' parser for a parse-bound workload.
+
+Example:
+--------
+    python -m benchmarks.bench_parse_pool --pages 400 --parser bs4
+"""
+
+import argparse  # Import argparse to read the benchmark options from the command line.
+import os  # Import os to locate the saved pages and count the cores.
+import time  # Import time to measure the elapsed time.
+from crawler.scraper import Scraper  # Import the Scraper class to benchmark.
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'fixtures')
+
+
+def load_pages(count):
+    """
+    Returns count raw pages, cycling through the saved pages.
+    """
+    saved = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith('.html'):
+            with open(os.path.join(FIXTURES, name), 'rb') as handle:
+                saved.append(handle.read())
+    return [saved[i % len(saved)] for i in range(count)]
+
+
+def main():
+    """
+    Parses the pages with 0 (in process), 1, 2, 4, ... worker processes and prints the throughput.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200, help='pages to parse per run')
+    parser.add_argument('--parser', default='bs4', choices=('fast', 'bs4'), help='listing parser')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='largest pool size')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    counts = [0, 1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers and args.max_workers > 1:
+        counts.append(args.max_workers)
+
+    baseline = None
+    for workers in counts:
+        scraper = Scraper(db_path=':memory:', parser=args.parser, parse_workers=workers)
+        start = time.perf_counter()
+        scraper.parse_pages(pages)
+        rate = len(pages) / (time.perf_counter() - start)
+        label = 'in process' if workers == 0 else f'{workers} workers'
+        if workers == 1:
+            baseline = rate
+        scaling = f'  {rate / baseline:4.2f}x of 1 worker ({rate / baseline / workers:4.0%} efficiency)' if workers >= 1 else ''
+        print(f"{label:<12} {rate:10.1f} pages/s{scaling}")
+        scraper.db.conn.close()
+
+
+if __name__ == '__main__':
+    main()
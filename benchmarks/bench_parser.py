@@ -0,0 +1,44 @@
+"""
+This module benchmarks the listing parsers from the crawler.parser module on the
+saved pages in tests/fixtures. Each parser is run repeatedly on every page and the
+best time per page is reported, together with the speedup of the fast parser.
+
+Usage:
+------
+Run this module from the repository root.
+
+Example:
+--------
+    python -m benchmarks.bench_parser --repeat 50
+"""
+
+import argparse  # Import argparse to read the benchmark options from the command line.
+import os  # Import os to locate the saved pages.
+import timeit  # Import timeit to time the parsers.
+from crawler.parser import PARSERS  # Import the parsers to benchmark.
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'fixtures')
+
+
+def main():
+    """
+    Times every parser on every saved page and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='timing rounds per parser and page')
+    args = parser.parse_args()
+
+    pages = sorted(name for name in os.listdir(FIXTURES) if name.endswith('.html'))
+    for name in pages:
+        with open(os.path.join(FIXTURES, name), encoding='utf-8') as handle:
+            html = handle.read()
+        timings = {}
+        for parser_name, parse in PARSERS.items():
+            best = min(timeit.repeat(lambda: parse(html), number=1, repeat=args.repeat))
+            timings[parser_name] = best
+            print(f"{name:<20} {parser_name:<6} {best * 1000:8.3f} ms/page")
+        print(f"{name:<20} speedup {timings['bs4'] / timings['fast']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
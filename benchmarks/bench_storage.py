@@ -0,0 +1,68 @@
+"""
+This module benchmarks entry writes in the crawler.storage module. It compares
+one insert_entry call per row with a single insert_entries call, with and
+without the Database performance profile, and reports rows per second.
+
+Usage:
+------
+Run this module from the repository root.
+
+Example:
+--------
+    python -m benchmarks.bench_storage --rows 20000
+"""
+
+import argparse  # Import argparse to read the benchmark options from the command line.
+import os  # Import os to remove the temporary database files.
+import tempfile  # Import tempfile to write the databases outside the repository.
+import time  # Import time to measure the elapsed time.
+from crawler.storage import Database  # Import the Database class to benchmark.
+
+
+def make_entries(rows):
+    """
+    Builds synthetic entries in the (number, title, points, comments, item_id) format.
+    """
+    return [(str(i), f'Synthetic story number {i}', i % 500, i % 90, 40000000 + i) for i in range(1, rows + 1)]
+
+
+def run(entries, bulk, performance):
+    """
+    Writes the entries to a fresh database file and returns the rows per second.
+    """
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        db = Database(path, performance=performance)
+        start = time.perf_counter()
+        if bulk:
+            db.insert_entries(entries)
+        else:
+            for entry in entries:
+                db.insert_entry(entry)
+        elapsed = time.perf_counter() - start
+        db.conn.close()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    return len(entries) / elapsed
+
+
+def main():
+    """
+    Runs every write mode and prints the throughput.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000, help='entries written per mode')
+    args = parser.parse_args()
+
+    entries = make_entries(args.rows)
+    for bulk in (False, True):
+        for performance in (False, True):
+            mode = ('insert_entries' if bulk else 'insert_entry') + (' +performance' if performance else '')
+            print(f"{mode:<30} {run(entries, bulk, performance):12.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+This module manages the corpus of recorded Hacker News listing pages used by the
+benchmarks and by the parser tests. The corpus lives in tests/fixtures; running
+this module records live pages into it.
+
+Functions:
+----------
+load_corpus(directory=CORPUS_DIR):
+    Returns the raw bytes of every recorded page.
+record(pages=2, sections=('',), directory=CORPUS_DIR):
+    Downloads live listing pages into the corpus.
+
+Example:
+--------
+    python -m benchmarks.corpus --pages 3 --sections '' newest
+"""
+
+import argparse  # Import argparse to read the recording options from the command line.
+import os  # Import os to locate the corpus.
+from datetime import date  # Import date to name the recorded pages.
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests', 'fixtures')
+
+
+def load_corpus(directory=CORPUS_DIR):
+    """
+    Returns the raw bytes of every recorded page, ordered by file name.
+    """
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as handle:
+                pages.append(handle.read())
+    return pages
+
+
+def record(pages=2, sections=('',), directory=CORPUS_DIR):
+    """
+    Downloads live listing pages into the corpus.
+
+    Parameters:
+    -----------
+    pages : int, optional
+        The number of pages to record per section (default is 2).
+    sections : iterable of str, optional
+        The sections to record (default is the front page).
+    directory : str, optional
+        The corpus directory (default is tests/fixtures).
+
+    Returns:
+    --------
+    list of str
+        The paths of the recorded files.
+    """
+    from crawler.scraper import Scraper  # Imported here so loading the corpus needs no network stack.
+
+    scraper = Scraper(db_path=':memory:')
+    paths = []
+    for url in scraper.page_urls(pages, sections):
+        suffix = url[len(Scraper.BASE_URL):].replace('?p=', '_p') or 'news'
+        path = os.path.join(directory, f'recorded_{date.today():%Y%m%d}_{suffix}.html')
+        with open(path, 'wb') as handle:
+            handle.write(scraper.fetch_raw(url))
+        paths.append(path)
+    return paths
+
+
+def main():
+    """
+    Records live pages from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Record live listing pages into the benchmark corpus.')
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--sections', nargs='+', default=[''])
+    args = parser.parse_args()
+    for path in record(args.pages, args.sections):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+This module runs the offline benchmark suite: fetching from a local HTTP stand-in,
+parsing recorded and synthetic pages, writing to the database and filtering. It
+needs no network access, so results are comparable between machines and releases.
+
+Each stage runs in a fresh process and reports pages/s, rows/s, p50 and p99
+latency of a single operation, and the peak resident set size of the process. The
+results are printed and written as JSON; with --compare, the throughput is checked
+against an earlier results file and the exit status is 1 when a stage got slower
+than the allowed tolerance.
+
+Usage:
+------
+Run this module from the repository root.
+
+Example:
+--------
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --compare results.json --tolerance 0.2
+"""
+
+import argparse  # Import argparse to read the benchmark options from the command line.
+import json  # Import json to write and read the results.
+import multiprocessing  # Import multiprocessing to run each stage in a fresh process.
+import platform  # Import platform to record the machine the results come from.
+import resource  # Import resource to read the peak resident set size.
+import sys  # Import sys to record the Python version and set the exit status.
+from concurrent.futures import ProcessPoolExecutor  # Import the pool that runs each stage.
+from datetime import datetime, timezone  # Import datetime to timestamp the results.
+from benchmarks import stages  # Import the benchmark stages.
+
+# (name, stage function, options, quick options)
+STAGES = (
+    ('fetch', 'bench_fetch', {'pages': 120}, {'pages': 30}),
+    ('parse.fast', 'bench_parse', {'parser': 'fast'}, {'parser': 'fast', 'repeat': 3}),
+    ('parse.bs4', 'bench_parse', {'parser': 'bs4', 'repeat': 3}, {'parser': 'bs4', 'repeat': 1}),
+    ('store', 'bench_store', {}, {'rows': 5000}),
+    ('filters.list', 'bench_filters', {'source': 'list'}, {'source': 'list', 'rows': 5000, 'repeat': 5}),
+    ('filters.database', 'bench_filters', {'source': 'database'}, {'source': 'database', 'rows': 5000, 'repeat': 5}),
+    ('filters.frame', 'bench_filters', {'source': 'frame'}, {'source': 'frame', 'rows': 5000, 'repeat': 5}),
+)
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # Bytes on macOS, kilobytes elsewhere.
+
+
+def run_stage(function, options):
+    """
+    Runs a stage in the current process and summarizes its measurements.
+    """
+    raw = getattr(stages, function)(**options)
+    seconds = raw['seconds']
+    latencies = raw['latencies']
+    return {
+        'options': options,
+        'seconds': round(seconds, 4),
+        'pages_per_s': round(raw['pages'] / seconds, 1) if raw['pages'] else None,
+        'rows_per_s': round(raw['rows'] / seconds, 1) if raw['rows'] else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'operations': len(latencies),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def run_isolated(function, options):
+    """
+    Runs a stage in a freshly spawned process, so the peak RSS is the stage's own.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_stage, function, options).result()
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the stages whose throughput dropped by more than the tolerance.
+
+    Parameters:
+    -----------
+    results, baseline : dict
+        The current and the earlier results.
+    tolerance : float
+        The allowed relative slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+    --------
+    list of str
+        A description of every regression.
+    """
+    regressions = []
+    for name, stage in results['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if not before:
+            continue
+        for metric in ('pages_per_s', 'rows_per_s'):
+            if stage.get(metric) and before.get(metric) and stage[metric] < before[metric] * (1 - tolerance):
+                change = stage[metric] / before[metric] - 1
+                regressions.append(f"{name} {metric}: {before[metric]} -> {stage[metric]} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    """
+    Runs the selected stages, prints and saves the results.
+    """
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite.')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the JSON results')
+    parser.add_argument('--stages', nargs='+', help='run only these stages, e.g. parse.fast store')
+    parser.add_argument('--quick', action='store_true', help='use small inputs, for a smoke test')
+    parser.add_argument('--compare', metavar='BASELINE', help='an earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown with --compare')
+    args = parser.parse_args()
+
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'stages': {},
+    }
+    print(f"{'stage':<18} {'pages/s':>10} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for name, function, options, quick_options in STAGES:
+        if args.stages and name not in args.stages:
+            continue
+        try:
+            stage = run_isolated(function, quick_options if args.quick else options)
+        except ImportError as error:  # An optional dependency such as NumPy is missing.
+            print(f"{name:<18} skipped: {error}")
+            continue
+        results['stages'][name] = stage
+        pages = f"{stage['pages_per_s']:.0f}" if stage['pages_per_s'] else '-'
+        rows = f"{stage['rows_per_s']:.0f}" if stage['rows_per_s'] else '-'
+        print(f"{name:<18} {pages:>10} {rows:>12} {stage['p50_ms']:>9.3f} {stage['p99_ms']:>9.3f} "
+              f"{stage['peak_rss_mb']:>8.1f}")
+
+    with open(args.output, 'w') as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
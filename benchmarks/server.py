@@ -0,0 +1,148 @@
+"""
+This module defines a local HTTP stand-in for Hacker News used by the benchmarks.
+It serves a corpus of listing pages with an optional artificial latency, so the
+fetch stage can be measured offline and reproducibly.
+
+Requests for '/', '/news', '/newest', '/ask' or '/show' with '?p=N' get page N of
+the corpus, wrapping around when N is larger than the corpus.
+
+Classes:
+--------
+CorpusServer:
+    A threaded HTTP server that serves a corpus of pages.
+
+Usage:
+------
+Use CorpusServer as a context manager in benchmarks, or run this module to
+serve the saved pages from the command line.
+
+Example:
+--------
+    from benchmarks.server import CorpusServer
+
+    with CorpusServer(pages, latency=0.05) as server:
+        scraper.BASE_URL = server.url
+
+    python -m benchmarks.server --port 8080 --latency 0.05
+"""
+
+import argparse  # Import argparse to read the server options from the command line.
+import threading  # Import threading to serve in the background.
+import time  # Import time to add the artificial latency.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Import the standard library HTTP server.
+from urllib.parse import parse_qs, urlsplit  # Import the URL helpers to read the page number.
+
+
+class _CorpusHandler(BaseHTTPRequestHandler):
+    """
+    Serves the page of the corpus selected by the ?p= parameter.
+    """
+    protocol_version = 'HTTP/1.1'  # Keep connections alive like the real site.
+
+    def do_GET(self):
+        """
+        Answers with a corpus page after the configured latency.
+        """
+        pages = self.server.pages
+        query = parse_qs(urlsplit(self.path).query)
+        page = int(query.get('p', ['1'])[0])
+        body = pages[(page - 1) % len(pages)]
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Silences the request log.
+        """
+
+
+class CorpusServer:
+    """
+    A threaded HTTP server that serves a corpus of pages.
+
+    Attributes:
+    -----------
+    url : str
+        The base URL of the server, ending with a slash.
+
+    Methods:
+    --------
+    __init__(pages, latency=0.0, host='127.0.0.1', port=0):
+        Initializes the server; port 0 picks a free port.
+
+    start():
+        Starts serving in a background thread.
+
+    stop():
+        Stops the server.
+    """
+
+    def __init__(self, pages, latency=0.0, host='127.0.0.1', port=0):
+        """
+        Initializes the server; port 0 picks a free port.
+
+        Parameters:
+        -----------
+        pages : list of bytes or str
+            The pages to serve, in page-number order.
+        latency : float, optional
+            The seconds to wait before answering each request (default is 0.0).
+        host : str, optional
+            The interface to listen on (default is '127.0.0.1').
+        port : int, optional
+            The port to listen on (default is 0, any free port).
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _CorpusHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.pages = [page.encode('utf-8') if isinstance(page, str) else page for page in pages]
+        self.httpd.latency = latency
+        self.url = f'http://{host}:{self.httpd.server_address[1]}/'
+        self._thread = None
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    """
+    Serves the saved pages until interrupted.
+    """
+    from benchmarks.corpus import load_corpus  # Imported here to keep the server module standalone.
+
+    parser = argparse.ArgumentParser(description='Serve the benchmark corpus over HTTP.')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    args = parser.parse_args()
+    server = CorpusServer(load_corpus(), latency=args.latency, port=args.port)
+    print(f"Serving {len(server.httpd.pages)} pages on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
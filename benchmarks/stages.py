@@ -0,0 +1,192 @@
+"""
+This module defines the stages of the offline benchmark suite. Each stage runs one
+part of the crawler on recorded or synthetic pages and returns its measurements;
+benchmarks.run executes every stage in a fresh process so that its peak RSS is
+its own.
+
+Every stage returns a dict with:
+- 'seconds': the total elapsed time,
+- 'pages' and 'rows': the work done (None when not meaningful),
+- 'latencies': the elapsed time of each operation, in seconds.
+
+Functions:
+----------
+bench_fetch(pages=60, latency=0.01, workers=8):
+    Fetches pages from the local HTTP stand-in through Scraper.fetch_raw.
+bench_parse(parser='fast', repeat=20, rows=1000):
+    Parses the corpus and a large synthetic page with a listing parser.
+bench_store(rows=50000, batch=500, performance=True):
+    Writes synthetic entries to a fresh database in batches.
+bench_filters(rows=50000, source='database', repeat=20):
+    Runs the Filters methods on a list, a Database or an EntryFrame.
+"""
+
+import os  # Import os to remove the temporary database files.
+import tempfile  # Import tempfile to write the databases outside the repository.
+import time  # Import time to measure the elapsed time.
+from concurrent.futures import ThreadPoolExecutor  # Import the pool used to fetch concurrently.
+from benchmarks.corpus import load_corpus  # Import the recorded pages.
+from benchmarks.server import CorpusServer  # Import the local HTTP stand-in.
+from benchmarks.synth import make_entries, make_page  # Import the synthetic data generators.
+from crawler.filters import Filters  # Import the filters to benchmark.
+from crawler.parser import PARSERS  # Import the listing parsers to benchmark.
+from crawler.query import CACHE  # Import the query cache to empty it between database runs.
+from crawler.scraper import Scraper  # Import the Scraper to benchmark fetching.
+from crawler.storage import Database  # Import the Database to benchmark writes.
+
+
+def _timed(function, *args, **kwargs):
+    """
+    Calls a function and returns (elapsed seconds, result).
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _temp_database(**options):
+    """
+    Returns a Database on a fresh temporary file and the path of the file.
+    """
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return Database(path, **options), path
+
+
+def _remove_database(db, path):
+    """
+    Closes a temporary Database and removes its files.
+    """
+    db.conn.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def bench_fetch(pages=60, latency=0.01, workers=8):
+    """
+    Fetches pages from the local HTTP stand-in through Scraper.fetch_raw.
+
+    Parameters:
+    -----------
+    pages : int, optional
+        The number of pages to fetch (default is 60).
+    latency : float, optional
+        The seconds the stand-in waits before each response (default is 0.01).
+    workers : int, optional
+        The number of concurrent requests (default is 8).
+    """
+    with CorpusServer(load_corpus(), latency=latency) as server:
+        scraper = Scraper(db_path=':memory:', workers=workers, parse_workers=0)
+        scraper.BASE_URL = server.url
+        urls = [server.url + f'?p={page}' for page in range(1, pages + 1)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda url: _timed(scraper.fetch_raw, url), urls))
+        seconds = time.perf_counter() - start
+    return {
+        'seconds': seconds,
+        'pages': pages,
+        'rows': None,
+        'bytes': sum(len(body) for _, body in results),
+        'latencies': [elapsed for elapsed, _ in results],
+    }
+
+
+def bench_parse(parser='fast', repeat=20, rows=1000):
+    """
+    Parses the corpus and a large synthetic page with a listing parser.
+
+    Parameters:
+    -----------
+    parser : str, optional
+        The parser to benchmark: 'fast' or 'bs4' (default is 'fast').
+    repeat : int, optional
+        The number of passes over the pages (default is 20).
+    rows : int, optional
+        The number of stories on the synthetic page (default is 1000).
+    """
+    parse = PARSERS[parser]
+    pages = [page.decode('utf-8') for page in load_corpus()] + [make_page(rows)]
+    latencies = []
+    parsed = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            elapsed, entries = _timed(parse, html)
+            latencies.append(elapsed)
+            parsed += len(entries)
+    return {
+        'seconds': time.perf_counter() - start,
+        'pages': len(latencies),
+        'rows': parsed,
+        'latencies': latencies,
+    }
+
+
+def bench_store(rows=50000, batch=500, performance=True):
+    """
+    Writes synthetic entries to a fresh database in batches.
+
+    Parameters:
+    -----------
+    rows : int, optional
+        The number of entries to write (default is 50000).
+    batch : int, optional
+        The number of entries per Database.insert_entries call (default is 500).
+    performance : bool, optional
+        Whether to enable the Database performance profile (default is True).
+    """
+    entries = make_entries(rows)
+    db, path = _temp_database(performance=performance)
+    try:
+        latencies = []
+        start = time.perf_counter()
+        for first in range(0, rows, batch):
+            elapsed, _ = _timed(db.insert_entries, entries[first:first + batch])
+            latencies.append(elapsed)
+        seconds = time.perf_counter() - start
+    finally:
+        _remove_database(db, path)
+    return {'seconds': seconds, 'pages': None, 'rows': rows, 'latencies': latencies}
+
+
+def bench_filters(rows=50000, source='database', repeat=20):
+    """
+    Runs the Filters methods on a list, a Database or an EntryFrame.
+
+    Each repetition runs filter_by_comments and filter_by_points once; the rows
+    count is the number of entries scanned. The query cache is emptied before each
+    run, so the database case measures the SQL queries and not cache hits.
+
+    Parameters:
+    -----------
+    rows : int, optional
+        The number of stored entries (default is 50000).
+    source : str, optional
+        What the filters read: 'list', 'database' or 'frame' (default is 'database').
+    repeat : int, optional
+        The number of repetitions (default is 20).
+    """
+    entries = make_entries(rows)
+    db, path = _temp_database(performance=True)
+    try:
+        db.insert_entries(entries)
+        if source == 'list':
+            target = db.fetch_all_entries()
+        elif source == 'frame':
+            from crawler.frame import EntryFrame  # Imported here because NumPy is optional.
+            target = EntryFrame.from_database(db)
+        else:
+            target = db
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for method in (Filters.filter_by_comments, Filters.filter_by_points):
+                CACHE.clear()
+                elapsed, _ = _timed(method, target, limit=30)
+                latencies.append(elapsed)
+        seconds = time.perf_counter() - start
+    finally:
+        _remove_database(db, path)
+    return {'seconds': seconds, 'pages': None, 'rows': rows * len(latencies), 'latencies': latencies}
@@ -0,0 +1,207 @@
+"""
+This module generates synthetic Hacker News listing pages and entries of any size
+for the benchmarks. The pages use the same markup as the saved pages in
+tests/fixtures, including job postings, "discuss" links, singular "1 point" /
+"1 comment" subtexts, character references and site suffixes, so both listing
+parsers can read them.
+
+Functions:
+----------
+make_page(rows=30, start=1, seed=0):
+    Returns the HTML of a listing page with the given number of rows.
+make_entries(rows, seed=0):
+    Returns entries in the (number, title, points, comments, item_id) format.
+make_item_page(comments=200, story_id=46000000, seed=0):
+    Returns the HTML of an item page with a nested comment thread.
+
+Example:
+--------
+    from benchmarks.synth import make_page
+
+    html = make_page(rows=10000)
+    thread = make_item_page(comments=5000)
+"""
+
+import random  # Import random to vary the generated values reproducibly.
+
+WORDS = (
+    'rust', 'sqlite', 'compiler', 'show', 'hn', 'why', 'we', 'moved', 'to', 'the', 'unreasonable',
+    'effectiveness', 'of', 'plain', 'text', 'a', 'tiny', 'database', 'in', '100', 'lines', 'postgres',
+    'kernel', 'notes', 'on', 'concurrency', 'webassembly', 'outside', 'browser', 'B-trees', '&amp;', 'LSM',
+)
+SITES = ('github.com', 'example.com', 'blog.example.org', 'lwn.net', 'arxiv.org', None)
+USERS = ('pg', 'dang', 'tptacek', 'patio11', 'jacquesm', 'someone_new')
+
+
+def _title(rng):
+    """
+    Returns a random title of 1 to 12 words, sometimes with a parenthesised year.
+    """
+    title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))).capitalize()
+    return title + ' (2019)' if rng.random() < 0.05 else title
+
+
+def _row(rng, rank, item):
+    """
+    Returns the '.athing' row, subtext row and spacer of one story.
+    """
+    site = rng.choice(SITES)
+    href = f'https://{site}/post/{item}' if site else f'item?id={item}'
+    sitebit = (
+        f'<span class="sitebit comhead"> (<a href="from?site={site}"><span class="sitestr">{site}</span></a>)</span>'
+        if site else ''
+    )
+    if rng.random() < 0.03:
+        subtext = (
+            f'<span class="age" title="2026-10-18T09:12:00"><a href="item?id={item}">3 hours ago</a></span>'
+            f' | <a href="hide?id={item}&amp;goto=news">hide</a>'
+        )
+    else:
+        points = rng.choice((1, 2, 3, 17, 54, 118, 240, 512, 1031))
+        comments = rng.choice((0, 1, 2, 9, 45, 301))
+        comments_link = 'discuss' if comments == 0 else ('1&nbsp;comment' if comments == 1 else f'{comments}&nbsp;comments')
+        user = rng.choice(USERS)
+        subtext = (
+            f'<span class="score" id="score_{item}">{points} {"point" if points == 1 else "points"}</span> by '
+            f'<a href="user?id={user}" class="hnuser">{user}</a> '
+            f'<span class="age" title="2026-10-18T08:00:00"><a href="item?id={item}">1 hour ago</a></span> '
+            f'<span id="unv_{item}"></span> | <a href="hide?id={item}&amp;goto=news">hide</a> | '
+            f'<a href="item?id={item}">{comments_link}</a>'
+        )
+    return (
+        f"<tr class='athing submission' id='{item}'>\n"
+        f'      <td align="right" valign="top" class="title"><span class="rank">{rank}.</span></td>'
+        f'      <td valign="top" class="votelinks"><center><a id=\'up_{item}\' href=\'vote?id={item}&amp;how=up&amp;goto=news\'>'
+        f'<div class=\'votearrow\' title=\'upvote\'></div></a></center></td>'
+        f'<td class="title"><span class="titleline"><a href="{href}">{_title(rng)}</a>{sitebit}</span></td></tr>'
+        f'<tr><td colspan="2"></td><td class="subtext"><span class="subline">\n{subtext}\n      </span>\n'
+        f'              </td></tr>\n      <tr class="spacer" style="height:5px"></tr>\n'
+    )
+
+
+def make_page(rows=30, start=1, seed=0):
+    """
+    Returns the HTML of a listing page with the given number of rows.
+
+    Parameters:
+    -----------
+    rows : int, optional
+        The number of stories on the page (default is 30).
+    start : int, optional
+        The rank of the first story (default is 1).
+    seed : int, optional
+        The random seed; the same arguments always give the same page (default is 0).
+
+    Returns:
+    --------
+    str
+        The HTML content of the page.
+    """
+    rng = random.Random(seed)
+    body = ''.join(_row(rng, start + i, 45000000 + seed * 100000 + i) for i in range(rows))
+    return (
+        '<html lang="en" op="news"><head><title>Hacker News</title></head><body><center>'
+        '<table id="hnmain"><tr id="bigbox"><td><table border="0" cellpadding="0" cellspacing="0">\n'
+        + body
+        + f"<tr class=\"morespace\" style=\"height:10px\"></tr><tr><td colspan=\"2\"></td>"
+        f"<td class='title'><a href='?p={(start + rows) // 30 + 1}' class='morelink' rel='next'>More</a></td></tr>\n"
+        '</table></td></tr></table></center></body></html>\n'
+    )
+
+
+def make_entries(rows, seed=0):
+    """
+    Returns entries in the (number, title, points, comments, item_id) format.
+
+    Parameters:
+    -----------
+    rows : int
+        The number of entries.
+    seed : int, optional
+        The random seed (default is 0).
+
+    Returns:
+    --------
+    list of tuple
+        The generated entries, with unique item ids.
+    """
+    rng = random.Random(seed)
+    return [
+        (str(i % 30 + 1), _title(rng).replace('&amp;', '&'), rng.randint(0, 2000), rng.randint(0, 800), 40000000 + i)
+        for i in range(rows)
+    ]
+
+
+def _comment_row(rng, comment_id, story_id, depth):
+    """
+    Returns the '.comtr' row of one comment, sometimes deleted.
+    """
+    if rng.random() < 0.02:
+        head = '<span class="comhead"> [deleted]</span>'
+        body = '<div class="comment"></div>'
+    else:
+        user = rng.choice(USERS)
+        paragraphs = ['<p>'.join(_title(rng) for _ in range(rng.randint(1, 3)))]
+        if rng.random() < 0.2:
+            paragraphs.append(f'<a href="https://example.com/{comment_id}" rel="nofollow">https://example.com/{comment_id}</a>')
+        head = (
+            f'<span class="comhead"><a href="user?id={user}" class="hnuser">{user}</a> '
+            f'<span class="age" title="2026-10-18T07:{comment_id % 60:02d}:00 1792306800">'
+            f'<a href="item?id={comment_id}">2 hours ago</a></span> <span id="unv_{comment_id}"></span>'
+            f'<span class="navs"> | <a href="#{story_id}" class="clicky" aria-hidden="true">root</a></span></span>'
+        )
+        body = (
+            f'<div class="comment"><div class="commtext c00">{"<p>".join(paragraphs)}</div>'
+            f'<div class="reply"><p><font size="1"><u><a href="reply?id={comment_id}&amp;goto=item%3Fid%3D{story_id}"'
+            f' rel="nofollow">reply</a></u></font></p></div></div>'
+        )
+    return (
+        f'<tr class="athing comtr" id="{comment_id}"><td><table border="0"><tr>'
+        f'<td class="ind" indent="{depth}"><img src="s.gif" height="1" width="{depth * 40}"></td>'
+        f'<td valign="top" class="votelinks"><center><a id="up_{comment_id}" href="vote?id={comment_id}&amp;how=up">'
+        f'<div class="votearrow" title="upvote"></div></a></center></td><td class="default">'
+        f'<div style="margin-top:2px; margin-bottom:-10px;">{head}</div><br>{body}</td></tr></table></td></tr>\n'
+    )
+
+
+def make_item_page(comments=200, story_id=46000000, seed=0):
+    """
+    Returns the HTML of an item page with a nested comment thread.
+
+    Each comment is a reply to the previous one, to one of its ancestors, or a
+    new top-level comment, so threads are up to a dozen levels deep.
+
+    Parameters:
+    -----------
+    comments : int, optional
+        The number of comments (default is 200).
+    story_id : int, optional
+        The item id of the story; the comments get the following ids (default is 46000000).
+    seed : int, optional
+        The random seed; the same arguments always give the same page (default is 0).
+
+    Returns:
+    --------
+    str
+        The HTML content of the page.
+    """
+    rng = random.Random(seed)
+    rows = []
+    depth = -1
+    for number in range(1, comments + 1):
+        roll = rng.random()
+        if roll < 0.1:
+            depth = 0
+        elif roll < 0.6:
+            depth = min(depth + 1, 12)
+        else:
+            depth = rng.randint(0, max(depth, 0))
+        rows.append(_comment_row(rng, story_id + number, story_id, depth))
+    return (
+        '<html lang="en" op="item"><head><title>Hacker News</title></head><body><center><table id="hnmain">'
+        f'<tr id="bigbox"><td><table class="fatitem" border="0"><tr class="athing submission" id="{story_id}">'
+        f'<td class="title"><span class="titleline"><a href="https://example.com/">{_title(rng)}</a></span></td></tr>'
+        '</table><br><table border="0" class="comment-tree">\n'
+        + ''.join(rows)
+        + '</table></td></tr></table></center></body></html>\n'
+    )
@@ -0,0 +1,406 @@
+"""
+This module defines a local, read-only HTTP API that serves the stored entries as
+JSON, for dashboards that poll the filtered views.
+
+Each poll of main.py starts an interpreter and queries SQLite again. The API server
+instead stays up, answers from a pool of read-only connections, and keeps the
+rendered responses in memory:
+
+- GET /filters/comments and GET /filters/points return the views of
+  Filters.filter_by_comments and Filters.filter_by_points;
+- GET /entries returns the stored entries, filtered by the query parameters
+  q (title words), min_points, max_points, min_comments, max_comments,
+  min_words and max_words, and ordered by order=<field> (ascending) or
+  order=-<field> (descending), one of crawler.query.FIELDS (default rank);
+- every route is paged with limit (1 to MAX_LIMIT, default DEFAULT_LIMIT) and
+  offset, and returns {"items": [...], "limit": ..., "offset": ..., "next_offset": ...},
+  where next_offset is null on the last page.
+
+Rendered responses are kept in an LRU keyed by the route and the normalized
+request, and stamped with the generation of the database: the data_version of a
+dedicated read-only connection, which changes whenever another connection (the
+crawler) commits. A response of an older generation is rendered again. Every
+response carries an ETag, the hash of its body, and a request whose
+If-None-Match matches it is answered with 304 Not Modified and no body.
+
+Requests are handled by a fixed pool of threads, one read-only connection each
+(see crawler.connections; no writer connection is opened, so the API never
+changes the database file), so concurrent clients are served in parallel and an
+idle keep-alive connection is closed after `timeout` seconds.
+
+Classes:
+--------
+ApiServer:
+    A JSON API over the stored entries, served by a thread pool.
+
+Functions:
+----------
+main(argv=None):
+    Serves the API from the command line.
+
+Usage:
+------
+Run the module next to a crawler writing to the same database, or use ApiServer
+as a context manager.
+
+Example:
+--------
+    python -m crawler.api --db crawler.db --port 8000 --workers 8
+
+    curl 'http://127.0.0.1:8000/filters/comments?limit=20'
+    curl 'http://127.0.0.1:8000/entries?q=rust&min_points=100&order=-comments&limit=10&offset=10'
+
+    from crawler.api import ApiServer
+
+    with ApiServer('crawler.db', port=0) as server:
+        print(server.url)    # http://127.0.0.1:53117/
+"""
+
+import argparse  # Import argparse to read the server options from the command line.
+import hashlib  # Import hashlib to compute the ETags.
+import json  # Import json to render the responses.
+import threading  # Import threading to serve in the background and guard the cache.
+from collections import OrderedDict  # Import OrderedDict for the LRU order of the rendered responses.
+from concurrent.futures import ThreadPoolExecutor  # Import the pool the requests are handled in.
+from http.server import BaseHTTPRequestHandler, HTTPServer  # Import the standard library HTTP server.
+from urllib.parse import parse_qs, urlsplit  # Import the URL helpers to read the route and parameters.
+from .connections import ConnectionManager  # Import the ConnectionManager for the read-only connections.
+from .filters import Filters  # Import the Filters class for the filtered views.
+from .metrics import REGISTRY  # Import the metrics registry to count cache hits and revalidations.
+from .query import FIELDS, Comments, Points, Query, TitleMatch, Words  # Import the query engine for /entries.
+from .storage import Database  # Import the Database class for the generation connection.
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 500
+FILTER_VIEWS = {'comments': Filters.filter_by_comments, 'points': Filters.filter_by_points}
+RANGE_PARAMETERS = {
+    'points': Points,
+    'comments': Comments,
+    'words': Words,
+}
+
+
+class BadRequest(ValueError):
+    """
+    Raised for a request parameter that is missing, unknown or out of range.
+    """
+
+
+def _integer(params, name, default=None, minimum=0, maximum=None):
+    """
+    Reads an integer query parameter and checks its range.
+    """
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[-1])
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        upper = '' if maximum is None else f" and at most {maximum}"
+        raise BadRequest(f"{name} must be at least {minimum}{upper}")
+    return value
+
+
+def _etag_matches(header, etag):
+    """
+    Returns whether an If-None-Match header lists the ETag (or is *).
+    """
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests with the responses rendered by the ApiServer.
+    """
+    protocol_version = 'HTTP/1.1'  # Keep the connections of polling clients alive.
+
+    def setup(self):
+        """
+        Closes the connection once it has been idle for the server's client timeout.
+        """
+        self.timeout = self.server.client_timeout
+        super().setup()
+
+    def do_GET(self):
+        """
+        Sends the response for the route, or 304 when the client's copy is current.
+        """
+        api = self.server.api
+        status, etag, body = api.respond(self.path)
+        if status == 200 and _etag_matches(self.headers.get('If-None-Match'), etag):
+            REGISTRY.increment('api_not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Clients may keep it but must revalidate.
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Silences the request log.
+        """
+
+
+class _PooledHTTPServer(HTTPServer):
+    """
+    An HTTP server that handles each connection in a fixed pool of threads.
+    """
+
+    def __init__(self, address, workers):
+        super().__init__(address, _ApiHandler)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class ApiServer:
+    """
+    A JSON API over the stored entries, served by a thread pool.
+
+    Attributes:
+    -----------
+    url : str
+        The base URL of the server, ending with a slash.
+    connections : ConnectionManager
+        The read-only connections the requests are answered from.
+
+    Methods:
+    --------
+    __init__(db_path='crawler.db', host='127.0.0.1', port=8000, workers=8, cache_size=256, timeout=5.0):
+        Opens the connections and binds the server; port 0 picks a free port.
+
+    respond(path):
+        Returns the status, ETag and body of the response to a request path.
+
+    generation():
+        Returns a value that changes whenever the database is written.
+
+    start():
+        Starts serving in a background thread.
+
+    serve_forever():
+        Serves in the calling thread until shutdown.
+
+    stop():
+        Stops the server and closes the connections.
+    """
+
+    def __init__(self, db_path='crawler.db', host='127.0.0.1', port=8000, workers=8, cache_size=256, timeout=5.0):
+        """
+        Opens the connections and binds the server; port 0 picks a free port.
+
+        Parameters:
+        -----------
+        db_path : str, optional
+            The path to the database file (default is 'crawler.db').
+        host : str, optional
+            The interface to listen on (default is '127.0.0.1').
+        port : int, optional
+            The port to listen on (default is 8000).
+        workers : int, optional
+            The number of requests handled at once, and of read-only connections (default is 8).
+        cache_size : int, optional
+            The number of rendered responses kept in memory (default is 256).
+        timeout : float, optional
+            The seconds after which an idle client connection is closed (default is 5.0).
+
+        Raises:
+        -------
+        sqlite3.OperationalError
+            If the database does not exist or cannot be read.
+        """
+        # Readers only: serving never creates, migrates or switches the journal mode of the crawler's database.
+        self.connections = ConnectionManager(db_path, readers=workers, writable=False)
+        # Its data_version moves when any other connection commits; reads are serialized by the lock.
+        self._watcher = Database(db_path, readonly=True, check_same_thread=False)
+        self._watcher_lock = threading.Lock()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.httpd = _PooledHTTPServer((host, port), workers)
+        self.httpd.api = self
+        self.httpd.client_timeout = timeout
+        self.url = f'http://{host}:{self.httpd.server_address[1]}/'
+        self._thread = None
+
+    def generation(self):
+        """
+        Returns a value that changes whenever the database is written by another connection.
+        """
+        with self._watcher_lock:
+            return self._watcher.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def respond(self, path):
+        """
+        Returns the status, ETag and body of the response to a request path.
+
+        Parameters:
+        -----------
+        path : str
+            The request path with its query string, e.g. '/filters/points?limit=10'.
+
+        Returns:
+        --------
+        tuple
+            (status, etag, body): the HTTP status, the ETag (None for errors) and the JSON body as bytes.
+        """
+        url = urlsplit(path)
+        params = parse_qs(url.query)
+        try:
+            key, render = self._route(url.path.rstrip('/') or '/', params)
+        except BadRequest as error:
+            return 400, None, self._render({'error': str(error)})
+        if render is None:
+            return 404, None, self._render({'error': f"No route for {url.path}"})
+
+        generation = self.generation()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == generation:
+                self._cache.move_to_end(key)
+                REGISTRY.increment('api_cache_hits')
+                return 200, cached[1], cached[2]
+        REGISTRY.increment('api_cache_misses')
+        with REGISTRY.timer('api.render'):
+            with self.connections.reader() as db:
+                body = self._render(render(db))
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        with self._cache_lock:
+            self._cache[key] = (generation, etag, body)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return 200, etag, body
+
+    def _route(self, path, params):
+        """
+        Returns the cache key and the render function of a route, or (None, None) for an unknown path.
+        """
+        limit = _integer(params, 'limit', DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT)
+        offset = _integer(params, 'offset', 0)
+        if path.startswith('/filters/') and path[len('/filters/'):] in FILTER_VIEWS:
+            name = path[len('/filters/'):]
+            view = FILTER_VIEWS[name]
+            return (name, limit, offset), lambda db: self._page(view(db, limit=limit, offset=offset), limit, offset)
+        if path == '/entries':
+            query = self._entries_query(params).page(limit, offset)
+            return ('entries', query.key()), lambda db: self._page(query.run(db, cache=False), limit, offset)
+        return None, None
+
+    @staticmethod
+    def _entries_query(params):
+        """
+        Builds the query of /entries from its filter and order parameters.
+        """
+        query = Query()
+        for name, predicate in RANGE_PARAMETERS.items():
+            low, high = _integer(params, f'min_{name}'), _integer(params, f'max_{name}')
+            if low is not None or high is not None:
+                query = query.where(predicate(min=low, max=high))
+        if params.get('q') and params['q'][-1].strip():
+            query = query.where(TitleMatch(params['q'][-1]))
+        order = params.get('order', ['rank'])[-1]
+        field = order.removeprefix('-')
+        if field not in FIELDS:
+            raise BadRequest(f"order must be one of {', '.join(FIELDS)}, optionally prefixed with -")
+        return query.order_by(field, descending=order.startswith('-'))
+
+    @staticmethod
+    def _page(entries, limit, offset):
+        """
+        Returns the JSON document of one page of entries.
+        """
+        items = [{'rank': entry.rank, 'title': entry.title, 'points': entry.points, 'comments': entry.comments,
+                  'item_id': entry.item_id} for entry in entries]
+        next_offset = offset + len(items) if len(items) == limit else None
+        return {'items': items, 'limit': limit, 'offset': offset, 'next_offset': next_offset}
+
+    @staticmethod
+    def _render(document):
+        """
+        Renders a JSON document as UTF-8 bytes.
+        """
+        return json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serves in the calling thread until stop() is called from another thread.
+        """
+        self.httpd.serve_forever(poll_interval=0.1)
+
+    def stop(self):
+        """
+        Stops the server and closes the connections.
+        """
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        self._watcher.conn.close()
+        self.connections.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    """
+    Serves the API until interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Serve the stored entries as a read-only JSON API.')
+    parser.add_argument('--db', default='crawler.db', help='the SQLite database file (default crawler.db)')
+    parser.add_argument('--host', default='127.0.0.1', help='the interface to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='the port to listen on (default 8000)')
+    parser.add_argument('--workers', type=int, default=8, help='the requests handled at once (default 8)')
+    parser.add_argument('--cache-size', type=int, default=256, help='the rendered responses kept (default 256)')
+    args = parser.parse_args(argv)
+    server = ApiServer(args.db, args.host, args.port, workers=args.workers, cache_size=args.cache_size)
+    print(f"Serving {args.db} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
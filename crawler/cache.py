@@ -0,0 +1,224 @@
+"""
+This module defines the ResponseCache class, an on-disk cache that sits in front of
+the scraper's HTTP requests. For every URL it remembers the ETag and Last-Modified
+validators, a SHA-256 hash of the body, the body size and when the URL was fetched.
+
+- Within a URL's TTL the page is not requested at all.
+- After the TTL, a conditional request is sent with If-None-Match and
+  If-Modified-Since, and a 304 Not Modified response means the page is unchanged.
+- A 200 response whose body hash matches the stored hash is also unchanged.
+
+Unchanged pages are reported as None, so the caller can skip both parsing and the
+database write. The validators of a new or changed page are only recorded once
+the caller calls commit(url) after storing what it parsed: if parsing or storing
+fails, the next fetch downloads the page again instead of reporting it
+unchanged. Error responses (4xx, 5xx) are reported as None and never cached.
+The cache is stored in its own SQLite file and can be shared by
+the threads of a concurrent crawl.
+
+Classes:
+--------
+ResponseCache:
+    An on-disk HTTP response cache based on conditional requests.
+
+Usage:
+------
+Create a ResponseCache and pass it to the Scraper, or call fetch directly with a
+function that performs the HTTP request.
+
+Example:
+--------
+    from crawler.cache import ResponseCache
+    from crawler.scraper import Scraper
+
+    cache = ResponseCache('http_cache.db', ttl=60, ttls={Scraper.BASE_URL + 'newest': 10})
+    scraper = Scraper(cache=cache)
+    scraper.scrape_and_store()    # Commits the pages it stored.
+    print(cache.stats)
+
+    html = cache.fetch(url, request)
+    if html is not None:
+        store(parse(html))
+        cache.commit(url)
+"""
+
+import hashlib  # Import hashlib to hash the response bodies.
+import sqlite3  # Import the SQLite3 library to store the cache on disk.
+import threading  # Import threading to share the cache between crawler threads.
+import time  # Import time to timestamp the cached responses.
+
+
+class ResponseCache:
+    """
+    An on-disk HTTP response cache based on conditional requests.
+
+    Attributes:
+    -----------
+    stats : dict
+        The cache counters:
+        'hits' (fresh + not_modified + unchanged), 'misses' (new or changed pages),
+        'fresh' (served within the TTL without a request), 'not_modified' (304 responses),
+        'unchanged' (200 responses with an identical body hash), 'bytes_saved'
+        (body bytes that did not have to be downloaded) and 'errors' (error responses).
+
+    Methods:
+    --------
+    __init__(path='http_cache.db', ttl=300, ttls=None):
+        Initializes the cache and creates its table.
+
+    ttl_for(url):
+        Returns the TTL of a URL in seconds.
+
+    fetch(url, request):
+        Fetches a URL through the cache.
+
+    commit(url):
+        Records the validators of the last page fetched from a URL.
+
+    close():
+        Closes the cache database.
+    """
+
+    def __init__(self, path='http_cache.db', ttl=300, ttls=None):
+        """
+        Initializes the cache and creates its table.
+
+        Parameters:
+        -----------
+        path : str, optional
+            The path to the cache database file (default is 'http_cache.db').
+        ttl : float, optional
+            The number of seconds a fetched page is served without a request (default is 300).
+        ttls : dict, optional
+            Per-URL TTLs in seconds that override the default TTL.
+        """
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.stats = dict.fromkeys(
+            ('hits', 'misses', 'fresh', 'not_modified', 'unchanged', 'bytes_saved', 'errors'), 0)
+        self._lock = threading.Lock()
+        self._pending = {}  # url: cache row of a fetched page, written by commit(url).
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,      -- The cached URL
+                    etag TEXT,                 -- The ETag validator of the last response
+                    last_modified TEXT,        -- The Last-Modified validator of the last response
+                    content_hash TEXT,         -- SHA-256 of the last response body
+                    size INTEGER,              -- Size of the last response body in bytes
+                    fetched_at REAL,           -- Unix time of the last request
+                    ttl REAL                   -- Seconds the response is fresh for
+                )
+            ''')
+
+    def ttl_for(self, url):
+        """
+        Returns the TTL of a URL in seconds.
+        """
+        return self.ttls.get(url, self.ttl)
+
+    def fetch(self, url, request):
+        """
+        Fetches a URL through the cache.
+
+        Parameters:
+        -----------
+        url : str
+            The URL to fetch.
+        request : callable
+            Called as request(url, headers) to perform the HTTP request; it must
+            return a requests.Response-like object.
+
+        Returns:
+        --------
+        str or None
+            The response body, or None when the page is unchanged since the last
+            committed fetch or the response is an error. Call commit(url) once the
+            body has been stored.
+        """
+        with self._lock:
+            record = self.conn.execute(
+                'SELECT etag, last_modified, content_hash, size, fetched_at, ttl FROM http_cache WHERE url = ?',
+                (url,)
+            ).fetchone()
+        now = time.time()
+
+        if record is not None:
+            etag, last_modified, content_hash, size, fetched_at, ttl = record
+            if now - fetched_at < ttl:
+                self._count('fresh', size)
+                return None
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        else:
+            content_hash = None
+            headers = {}
+
+        response = request(url, headers)
+        if response.status_code == 304 and record is not None:
+            with self._lock, self.conn:
+                self.conn.execute('UPDATE http_cache SET fetched_at = ?, ttl = ? WHERE url = ?',
+                                  (now, self.ttl_for(url), url))
+            self._count('not_modified', record[3])
+            return None
+
+        if response.status_code != 200:
+            with self._lock:
+                self.stats['errors'] += 1
+            return None
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        if digest == content_hash:
+            with self._lock, self.conn:
+                self.conn.execute('''
+                    UPDATE http_cache SET etag = ?, last_modified = ?, fetched_at = ?, ttl = ? WHERE url = ?
+                ''', (response.headers.get('ETag'), response.headers.get('Last-Modified'), now,
+                      self.ttl_for(url), url))
+            self._count('unchanged', 0)
+            return None
+        with self._lock:
+            self._pending[url] = (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                  digest, len(body), now, self.ttl_for(url))
+            self.stats['misses'] += 1
+        return response.text
+
+    def commit(self, url):
+        """
+        Records the validators of the last page fetched from a URL.
+
+        Until then, the page is fetched again as if it had never been seen. URLs
+        without a pending page are ignored.
+
+        Parameters:
+        -----------
+        url : str
+            The URL whose page has been parsed and stored.
+        """
+        with self._lock:
+            row = self._pending.pop(url, None)
+            if row is not None:
+                with self.conn:
+                    self.conn.execute('''
+                        INSERT OR REPLACE INTO http_cache (url, etag, last_modified, content_hash, size, fetched_at, ttl)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', row)
+
+    def _count(self, kind, bytes_saved):
+        """
+        Records a cache hit of the given kind.
+        """
+        with self._lock:
+            self.stats[kind] += 1
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += bytes_saved or 0
+
+    def close(self):
+        """
+        Closes the cache database.
+        """
+        self.conn.close()
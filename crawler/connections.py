@@ -0,0 +1,213 @@
+"""
+This module defines the ConnectionManager class, which shares one SQLite database
+between threads: a single writer connection and a bounded pool of read-only
+connections.
+
+A sqlite3 connection cannot be used from several threads at once, so a single
+Database would serialize scraping, filtering and serving behind one connection.
+The manager instead opens the database in WAL mode, where readers see the last
+committed snapshot and never wait for a writer, even in the middle of a long
+bulk insert:
+
+- writer() hands out the one writer Database, holding a lock so that only one
+  thread writes at a time (SQLite allows a single writer anyway);
+- reader() hands out one of `readers` read-only Database objects, waiting when
+  all of them are in use, and returns it to the pool afterwards.
+
+A manager created with writable=False opens the reader pool only: it never
+creates, migrates or switches the journal mode of the database, so a process
+that only serves reads (such as crawler.api) leaves the crawler's file as it is.
+
+Classes:
+--------
+ConnectionManager:
+    A single writer connection and a bounded pool of read-only connections.
+
+Usage:
+------
+Create one ConnectionManager per database file and share it between threads.
+
+Example:
+--------
+    from crawler.connections import ConnectionManager
+    from crawler.filters import Filters
+
+    with ConnectionManager('crawler.db', readers=8) as manager:
+        with manager.writer() as db:
+            db.insert_entries(entries)
+        with manager.reader() as db:
+            top = Filters.filter_by_points(db, limit=10)
+"""
+
+import threading  # Import threading to serialize the writer and hand out the readers.
+from collections import deque  # Import deque to hold the idle readers and the waiting threads.
+from contextlib import contextmanager  # Import contextmanager to build the connection API.
+from .metrics import REGISTRY  # Import the metrics registry to time the waits for a connection.
+from .storage import Database  # Import the Database class the connections are wrapped in.
+
+
+class ConnectionManager:
+    """
+    A single writer connection and a bounded pool of read-only connections.
+
+    Methods:
+    --------
+    __init__(db_path, readers=4, timeout=30.0, writable=True):
+        Opens the writer connection in WAL mode and the reader pool.
+
+    writer():
+        Context manager that holds the writer Database.
+
+    reader(timeout=None):
+        Context manager that borrows a read-only Database from the pool.
+
+    close():
+        Closes every connection.
+    """
+
+    def __init__(self, db_path, readers=4, timeout=30.0, writable=True):
+        """
+        Opens the writer connection in WAL mode and the reader pool.
+
+        Parameters:
+        -----------
+        db_path : str
+            The path to the database file. An in-memory database cannot be shared
+            between connections and is rejected.
+        readers : int, optional
+            The number of read-only connections, i.e. the most concurrent readers (default is 4).
+        timeout : float, optional
+            The number of seconds a connection waits for a lock held by another
+            process before failing (default is 30.0).
+        writable : bool, optional
+            Whether to open the writer connection (default is True). Without it,
+            the database must already exist and writer() raises RuntimeError.
+
+        Raises:
+        -------
+        ValueError
+            If db_path is an in-memory database or readers is less than 1.
+        sqlite3.OperationalError
+            If writable is False and the database cannot be opened.
+        """
+        if db_path == ':memory:' or db_path.startswith('file::memory:'):
+            raise ValueError("An in-memory database cannot be shared between connections")
+        if readers < 1:
+            raise ValueError("The pool needs at least one reader connection")
+        self.db_path = db_path
+        self._writer = None
+        self._all = []
+        if writable:
+            # The writer is created first: it creates and migrates the tables and switches the file to WAL.
+            self._writer = Database(db_path, performance=True, check_same_thread=False)
+            self._writer.conn.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+            self._all.append(self._writer)
+        self._write_lock = threading.Lock()
+        self._idle = deque()  # Reused from the right: the most recently used reader has the warmest cache.
+        self._waiting = deque()  # [event, reader] of each waiting thread, oldest first.
+        self._pool_lock = threading.Lock()
+        for _ in range(readers):
+            reader = Database(db_path, performance=True, readonly=True, check_same_thread=False)
+            reader.conn.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+            self._idle.append(reader)
+            self._all.append(reader)
+        self._closed = False
+
+    @contextmanager
+    def writer(self):
+        """
+        Context manager that holds the writer Database.
+
+        Only one thread holds the writer at a time; readers are never blocked by it.
+
+        Raises:
+        -------
+        RuntimeError
+            If the manager was created with writable=False.
+        """
+        if self._writer is None:
+            raise RuntimeError("The connection manager was opened without a writer")
+        with REGISTRY.timer('connections.writer_wait'):
+            self._write_lock.acquire()
+        try:
+            yield self._writer
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """
+        Context manager that borrows a read-only Database from the pool.
+
+        A reader sees the database as of its last committed write. Results that
+        are read lazily (iter_entries, iter_entries_by) must be consumed before
+        the block ends, as the connection then goes back to the pool.
+
+        Parameters:
+        -----------
+        timeout : float, optional
+            The number of seconds to wait for an idle connection (default is None, no limit).
+
+        Raises:
+        -------
+        TimeoutError
+            If no connection became idle within the timeout.
+        """
+        if self._closed:
+            raise RuntimeError("The connection manager is closed")
+        with REGISTRY.timer('connections.reader_wait'):
+            db = self._acquire(timeout)
+        try:
+            yield db
+        finally:
+            if db.conn.in_transaction:
+                db.conn.rollback()
+            self._release(db)
+
+    def _acquire(self, timeout):
+        """
+        Takes an idle reader, or waits for one in first-come, first-served order.
+
+        A released reader is handed directly to the oldest waiting thread, so a
+        thread that reads in a loop cannot take it back before the others.
+        """
+        with self._pool_lock:
+            if self._idle and not self._waiting:
+                return self._idle.pop()
+            waiter = [threading.Event(), None]
+            self._waiting.append(waiter)
+        if not waiter[0].wait(timeout):
+            with self._pool_lock:
+                if waiter[1] is None:  # Not handed a reader between the timeout and the lock.
+                    self._waiting.remove(waiter)
+                    raise TimeoutError(f"No reader connection was idle within {timeout} seconds")
+        return waiter[1]
+
+    def _release(self, db):
+        """
+        Hands a reader to the oldest waiting thread, or returns it to the idle readers.
+        """
+        with self._pool_lock:
+            if self._waiting:
+                waiter = self._waiting.popleft()
+                waiter[1] = db
+                waiter[0].set()
+            else:
+                self._idle.append(db)
+
+    def close(self):
+        """
+        Closes every connection; the manager cannot be used afterwards.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        with self._write_lock:
+            for db in self._all:
+                db.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+This module defines the Entry record that carries a news item through the
+crawler: from the parsers, through the Scraper and the Database, to the Filters.
+
+Entry is an immutable named tuple, so it is as compact as a plain tuple (no
+per-instance dict) and every existing caller that indexes or unpacks entries
+keeps working: entry[0] to entry[4] are still the rank, title, points, comments
+and item id. The rank is an integer, so ranks sort numerically, and the title
+word count is computed once when the entry is created and kept in the record,
+so filters do not split the title again.
+
+Comment is the record of one comment of an item page, with the ids that place
+it in its thread.
+
+Classes:
+--------
+Entry:
+    A news item: rank, title, points, comments, item id and title word count.
+Comment:
+    A comment: its id, story, parent, depth, author, posting time and text.
+
+Functions:
+----------
+word_count(title):
+    Returns the number of whitespace-separated words in a title.
+to_rank(number):
+    Converts a rank such as '12' or '12.' to an integer.
+
+Example:
+--------
+    from crawler.entry import Entry
+
+    entry = Entry(1, 'Show HN: A tiny database', 120, 45, 41000001)
+    entry.word_count                       # 5
+    rank, title, points, comments = entry[:4]
+    Entry.from_tuple(('2', 'Legacy tuple', 10, 3))
+"""
+
+from collections import namedtuple  # Import namedtuple to build the compact record type.
+
+
+def word_count(title):
+    """
+    Returns the number of whitespace-separated words in a title.
+    """
+    return len(title.split()) if title else 0
+
+
+_word_count = word_count  # Entry.__new__ has a word_count argument, which hides the function.
+
+
+def to_rank(number):
+    """
+    Converts a rank such as '12' or '12.' to an integer, using 0 when it is not numeric.
+    """
+    if isinstance(number, int):
+        return number
+    try:
+        return int(str(number).strip().rstrip('.'))
+    except ValueError:
+        return 0
+
+
+class Entry(namedtuple('Entry', ('rank', 'title', 'points', 'comments', 'item_id', 'word_count'))):
+    """
+    A news item: rank, title, points, comments, item id and title word count.
+
+    Attributes:
+    -----------
+    rank : int
+        The position of the item on its listing page.
+    title : str
+        The title of the item.
+    points : int
+        The points (score) of the item.
+    comments : int
+        The number of comments on the item.
+    item_id : int or None
+        The Hacker News item id, or None when it is unknown.
+    word_count : int
+        The number of words in the title, computed once on creation.
+
+    Methods:
+    --------
+    from_tuple(entry):
+        Converts a (number, title, points, comments[, item_id]) tuple to an Entry.
+    """
+    __slots__ = ()
+
+    def __new__(cls, rank, title, points=0, comments=0, item_id=None, word_count=None):
+        """
+        Creates an entry, counting the title words unless the count is given.
+        """
+        if word_count is None:
+            word_count = _word_count(title)
+        return super().__new__(cls, rank, title, points, comments, item_id, word_count)
+
+    @property
+    def number(self):
+        """
+        The rank as a string, as entries carried it before they had a record type.
+        """
+        return str(self.rank)
+
+    @classmethod
+    def from_tuple(cls, entry):
+        """
+        Converts a (number, title, points, comments[, item_id]) tuple to an Entry.
+
+        Entries are returned unchanged, and a string rank is converted to an integer.
+        """
+        if isinstance(entry, cls):
+            return entry
+        number, title, points, comments, *rest = entry
+        return cls(to_rank(number), title, points, comments, rest[0] if rest else None)
+
+    @staticmethod
+    def row_factory(cursor, row):
+        """
+        Builds an Entry from a (rank, title, points, comments, item_id, title_word_count)
+        database row without recounting the title words; use it as a cursor's row_factory.
+        """
+        return tuple.__new__(Entry, row)
+
+
+class Comment(namedtuple('Comment', ('comment_id', 'story_id', 'parent_id', 'depth', 'author', 'posted_at',
+                                     'text'))):
+    """
+    A comment: its id, story, parent, depth, author, posting time and text.
+
+    Attributes:
+    -----------
+    comment_id : int
+        The Hacker News item id of the comment.
+    story_id : int
+        The item id of the story the thread belongs to.
+    parent_id : int
+        The item id of the comment replied to, or the story id for a top-level comment.
+    depth : int
+        The nesting level of the comment, 0 for a top-level comment.
+    author : str or None
+        The user name of the author, or None for a deleted comment.
+    posted_at : str or None
+        The time the comment was posted, in ISO format, when the page gives it.
+    text : str
+        The text of the comment, with paragraphs separated by blank lines.
+    """
+    __slots__ = ()
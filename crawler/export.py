@@ -0,0 +1,302 @@
+"""
+This module archives the entries and usage rows of the database to flat files,
+partitioned by day: gzip-compressed JSON Lines or CSV, or XLSX workbooks.
+
+The rows are read with Database.iter_export in the order of a (time, id) key that
+only grows: the time an entry was last written, or the timestamp of a usage
+event. Each day's rows go to their own directory, in part files of at most
+rows_per_file rows (days are local, the time zone of the usage timestamps, for
+both tables), so the export runs in constant memory: one batch of rows and
+one open file at a time.
+
+Every part file is written under a temporary name and renamed when it is
+complete, and only then is the key of its last row recorded as the export's
+high-water mark in the database. An interrupted export therefore leaves no
+partial file behind, and the next run resumes after the last recorded file: rows
+are exported at least once and never lost.
+
+Rows written less than `settle` seconds ago are left for the next run, so an
+event that is still buffered (see crawler.usage) cannot land behind the mark.
+
+After an export, the exported rows can be deleted from the database and the file
+vacuumed, so the database only holds what has not been archived yet.
+
+Classes:
+--------
+Exporter:
+    Exports tables to day-partitioned files and records a high-water mark.
+
+Functions:
+----------
+main(argv=None):
+    Runs an export from the command line.
+
+Usage:
+------
+Create an Exporter for a Database and call export, or run the module.
+
+Example:
+--------
+    from crawler.export import Exporter
+    from crawler.storage import Database
+
+    exporter = Exporter(Database('crawler.db'), 'archive', format='csv')
+    exporter.export(prune=True, vacuum=True)
+    # archive/usage/2024-05-01/part-00000.csv.gz, archive/entries/2024-05-01/part-00000.csv.gz, ...
+
+    python -m crawler.export --db crawler.db --output archive --format jsonl --prune --vacuum
+"""
+
+import argparse  # Import argparse to read the command-line options.
+import csv  # Import csv to write CSV rows.
+import gzip  # Import gzip to compress the JSON Lines and CSV files.
+import io  # Import io to write text into the compressed files.
+import json  # Import json to write JSON Lines.
+import os  # Import os to create directories and rename the finished files.
+import time  # Import time to compute the settle cutoff.
+from datetime import datetime  # Import datetime to compare usage timestamps with the cutoff.
+from .metrics import REGISTRY  # Import the metrics registry to count the exported rows.
+from .storage import Database  # Import the Database class the rows are read from.
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'xlsx')
+EXTENSIONS = {'jsonl': '.jsonl.gz', 'csv': '.csv.gz', 'xlsx': '.xlsx'}
+TEMPORARY_SUFFIX = '.tmp'
+
+
+class _TextPart:
+    """
+    A gzip-compressed JSON Lines or CSV part file.
+    """
+
+    def __init__(self, path, columns, format):
+        self.columns = columns
+        self.rows = 0
+        self._handle = io.TextIOWrapper(gzip.open(path, 'wb'), encoding='utf-8', newline='')
+        if format == 'csv':
+            self._csv = csv.writer(self._handle, lineterminator='\n')
+            self._csv.writerow(columns)
+        else:
+            self._csv = None
+
+    def write(self, row):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._handle.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n')
+        self.rows += 1
+
+    def close(self):
+        self._handle.close()
+
+
+class _XlsxPart:
+    """
+    An XLSX part file, written with openpyxl in write-only mode so rows are not kept in memory.
+    """
+
+    def __init__(self, path, columns, sheet):
+        # Imported here so the other formats do not need openpyxl.
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        self.path = path
+        self.rows = 0
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(sheet)
+        self._sheet.append(columns)
+
+    def write(self, row):
+        # Control characters are not allowed in XLSX cells.
+        self._sheet.append([self._illegal.sub('', value) if isinstance(value, str) else value for value in row])
+        self.rows += 1
+
+    def close(self):
+        with open(self.path, 'wb') as handle:
+            self._workbook.save(handle)
+
+
+class Exporter:
+    """
+    Exports tables to day-partitioned files and records a high-water mark.
+
+    Methods:
+    --------
+    __init__(db, directory, format='jsonl', name='default', batch_size=1000, rows_per_file=100000, settle=60):
+        Initializes the exporter.
+
+    export(tables=('entries', 'usage'), prune=False, vacuum=False, now=None):
+        Exports the rows written since the last export.
+
+    export_table(table, prune=False, now=None):
+        Exports the rows of one table written since its last export.
+    """
+
+    def __init__(self, db, directory, format='jsonl', name='default', batch_size=1000, rows_per_file=100000,
+                 settle=60):
+        """
+        Initializes the exporter.
+
+        Parameters:
+        -----------
+        db : Database
+            The database to export from.
+        directory : str
+            The directory the files are written to, as <table>/<YYYY-MM-DD>/part-<n><extension>.
+        format : str, optional
+            One of EXPORT_FORMATS (default is 'jsonl'). 'xlsx' needs openpyxl.
+        name : str, optional
+            The name the high-water marks are recorded under, so several exports
+            of the same database can progress independently (default is 'default').
+        batch_size : int, optional
+            The number of rows read from SQLite at a time (default is 1000).
+        rows_per_file : int, optional
+            The largest number of rows in one part file (default is 100000).
+        settle : float, optional
+            Rows written less than this many seconds ago are left for the next run (default is 60).
+
+        Raises:
+        -------
+        ValueError
+            If the format is unknown.
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {format!r}")
+        self.db = db
+        self.directory = directory
+        self.format = format
+        self.name = name
+        self.batch_size = batch_size
+        self.rows_per_file = rows_per_file
+        self.settle = settle
+
+    def export(self, tables=('entries', 'usage'), prune=False, vacuum=False, now=None):
+        """
+        Exports the rows written since the last export.
+
+        Parameters:
+        -----------
+        tables : iterable of str, optional
+            The tables to export, keys of Database.EXPORT_TABLES (default is both).
+        prune : bool, optional
+            Whether to delete the exported rows from the database (default is False).
+        vacuum : bool, optional
+            Whether to vacuum the database afterwards, returning the space of the
+            pruned rows to the file system (default is False).
+        now : float, optional
+            The current time in seconds since the epoch (default is now).
+
+        Returns:
+        --------
+        dict
+            {table: {'rows': int, 'files': list of str, 'pruned': int}}.
+        """
+        results = {table: self.export_table(table, prune, now) for table in tables}
+        if vacuum:
+            self.db.vacuum()
+        return results
+
+    def export_table(self, table, prune=False, now=None):
+        """
+        Exports the rows of one table written since its last export.
+
+        Returns:
+        --------
+        dict
+            {'rows': int, 'files': list of str, 'pruned': int}.
+        """
+        columns = self.db.EXPORT_TABLES[table][0]
+        mark_name = f'{self.name}:{table}'
+        self._remove_unfinished(table)
+        position = self.db.load_export_mark(mark_name)
+        result = {'rows': 0, 'files': [], 'pruned': 0}
+        part = path = day = None
+        for row_day, key, row in self.db.iter_export(table, after=position, before=self._cutoff(table, now),
+                                                     batch_size=self.batch_size):
+            if part is not None and (row_day != day or part.rows >= self.rows_per_file):
+                result['files'].append(self._finish(part, path, mark_name, position))
+                part = None
+            if part is None:
+                day = row_day
+                path = self._next_path(table, day)
+                part = self._open(path + TEMPORARY_SUFFIX, columns, table)
+            part.write(row)
+            position = key
+            result['rows'] += 1
+        if part is not None:
+            result['files'].append(self._finish(part, path, mark_name, position))
+        REGISTRY.increment(f'export_rows_{table}', result['rows'])
+        if prune and position is not None:
+            result['pruned'] = self.db.prune_exported(table, position)
+        return result
+
+    def _cutoff(self, table, now):
+        """
+        Returns the time before which rows are settled, in the table's time format.
+        """
+        cutoff = (time.time() if now is None else now) - self.settle
+        if table == 'usage':
+            return datetime.fromtimestamp(cutoff).isoformat()
+        return int(cutoff)
+
+    def _open(self, path, columns, table):
+        """
+        Opens a part file in the exporter's format.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.format == 'xlsx':
+            return _XlsxPart(path, columns, table)
+        return _TextPart(path, columns, self.format)
+
+    def _finish(self, part, path, mark_name, position):
+        """
+        Closes a part file, gives it its final name and records the key of its last row.
+        """
+        part.close()
+        os.replace(path + TEMPORARY_SUFFIX, path)
+        self.db.save_export_mark(mark_name, position)
+        return path
+
+    def _next_path(self, table, day):
+        """
+        Returns the path of the next part file of a day.
+        """
+        directory = os.path.join(self.directory, table, day)
+        number = len(os.listdir(directory)) if os.path.isdir(directory) else 0
+        return os.path.join(directory, f'part-{number:05d}{EXTENSIONS[self.format]}')
+
+    def _remove_unfinished(self, table):
+        """
+        Removes the temporary files an interrupted export left behind.
+        """
+        for root, _, files in os.walk(os.path.join(self.directory, table)):
+            for file in files:
+                if file.endswith(TEMPORARY_SUFFIX):
+                    os.remove(os.path.join(root, file))
+
+
+def main(argv=None):
+    """
+    Runs an export from the command line and prints the number of rows per table.
+    """
+    parser = argparse.ArgumentParser(description='Archive the stored entries and usage rows to flat files.')
+    parser.add_argument('--db', default='crawler.db', help='the SQLite database file (default crawler.db)')
+    parser.add_argument('--output', default='archive', help='the directory to write to (default archive)')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl', help='the file format (default jsonl)')
+    parser.add_argument('--tables', nargs='+', choices=tuple(Database.EXPORT_TABLES),
+                        default=tuple(Database.EXPORT_TABLES), help='the tables to export (default all)')
+    parser.add_argument('--name', default='default', help='the name of the export high-water mark')
+    parser.add_argument('--rows-per-file', type=int, default=100000, help='the most rows per file (default 100000)')
+    parser.add_argument('--prune', action='store_true', help='delete the exported rows from the database')
+    parser.add_argument('--vacuum', action='store_true', help='vacuum the database after the export')
+    args = parser.parse_args(argv)
+    exporter = Exporter(Database(args.db), args.output, format=args.format, name=args.name,
+                        rows_per_file=args.rows_per_file)
+    results = exporter.export(args.tables, prune=args.prune, vacuum=args.vacuum)
+    for table, result in results.items():
+        print(f"{table}: {result['rows']} rows in {len(result['files'])} files, {result['pruned']} pruned")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
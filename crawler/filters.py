@@ -8,66 +8,222 @@ Filters:
 Usage:
 ------
 To use this module, you can call the static methods of the Filters class directly
-without creating an instance of the class.
+without creating an instance of the class. The methods accept either an iterable of
+entries, which is filtered in Python, or a Database, in which case the filtering,
+sorting and paging run as an indexed SQL query, or an EntryFrame, in which case
+they run as vectorized NumPy operations. With top_k, only the k best entries
+are kept in a bounded heap, so memory stays O(k) however many entries are scanned.
+The two filters are queries of crawler.query (COMMENTS_QUERY and POINTS_QUERY), so
+their Database results are cached until the next write, and Filters.query runs
+any other query on the same sources.
 Example:
 --------
     from filters import Filters
     filtered_by_comments = Filters.filter_by_comments(entries)
     filtered_by_points = Filters.filter_by_points(entries)
+    first_page = Filters.filter_by_comments(database, limit=20)
+    top_ten = Filters.filter_by_points(database.iter_entries(), top_k=10)
+    popular = Filters.query(database, Query(Points(min=100) & TitleMatch('python')).order_by('comments'))
 """
 
+import heapq  # Import heapq to keep the top k entries in a bounded heap.
+from operator import itemgetter  # Import itemgetter for C-level sort keys.
+from .entry import Entry, word_count  # Import the Entry record to reuse its cached title word count.
+from .frame import EntryFrame  # Import the EntryFrame class to run filters on NumPy columns.
+from .metrics import timed  # Import timed to instrument the filters.
+from .query import Query, Words  # Import the query engine the filters are built on.
+from .storage import Database  # Import the Database class to push filters down to SQLite.
+
+
 class Filters:
     """
     A class to contain filtering methods for entries based on specific criteria.
+    Attributes:
+    -----------
+    TITLE_WORDS : int
+        The title word count that separates long titles from short ones.
+    COMMENTS_QUERY, POINTS_QUERY : Query
+        The queries of filter_by_comments and filter_by_points.
     Methods:
     --------
-    filter_by_comments(entries):
+    filter_by_comments(entries, limit=None, offset=0, top_k=None):
         Filters and sorts entries by the number of comments.
-    
-    filter_by_points(entries):
+
+    filter_by_points(entries, limit=None, offset=0, top_k=None):
         Filters and sorts entries by the number of points.
+
+    stream_by_comments(db, limit=None, offset=0, batch_size=500):
+        Streams the entries of filter_by_comments from a Database cursor.
+
+    stream_by_points(db, limit=None, offset=0, batch_size=500):
+        Streams the entries of filter_by_points from a Database cursor.
+
+    query(entries, query):
+        Runs a query of crawler.query on entries, a Database or an EntryFrame.
     """
+    TITLE_WORDS = 5
+    COMMENTS_QUERY = Query(Words(min=TITLE_WORDS + 1)).order_by('comments')
+    POINTS_QUERY = Query(Words(max=TITLE_WORDS)).order_by('points')
 
     @staticmethod
-    def filter_by_comments(entries):
+    @timed('filters.filter_by_comments')
+    def filter_by_comments(entries, limit=None, offset=0, top_k=None):
         """
         Filters and sorts entries by the number of comments.
         This method filters entries where the title has more than 5 words,
         and sorts them by the number of comments in descending order.
         Parameters:
         -----------
-        entries : list of tuple
-            A list of entries, where each entry is a tuple containing details of a news item.
-            The structure of the tuple is assumed to be (number, title, points, comments).
+        entries : iterable of Entry or tuple, Database or EntryFrame
+            An iterable of entries, either Entry records, whose cached title word count is
+            used, or tuples in the (number, title, points, comments) format.
+            When a Database is given, the entries are filtered and sorted by SQLite,
+            and when an EntryFrame is given, by vectorized NumPy operations.
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        top_k : int, optional
+            Only rank the k entries with the most comments (default is None, rank every entry).
         Returns:
         --------
-        list of tuple
+        list of Entry or tuple
             A list of filtered and sorted entries by the number of comments.
         """
-        return sorted(
-            [entry for entry in entries if len(entry[1].split()) > 5], 
-            key=lambda x: x[3], 
-            reverse=True
+        if isinstance(entries, EntryFrame):
+            return entries.filter_by_comments(limit, offset, top_k, Filters.TITLE_WORDS)
+        if isinstance(entries, Database):
+            return Filters.COMMENTS_QUERY.page(Filters._limit(limit, offset, top_k), offset).run(entries)
+        return Filters._rank(
+            (entry for entry in entries if Filters._words(entry) > Filters.TITLE_WORDS),
+            itemgetter(3), limit, offset, top_k
         )
 
     @staticmethod
-    def filter_by_points(entries):
+    @timed('filters.filter_by_points')
+    def filter_by_points(entries, limit=None, offset=0, top_k=None):
         """
         Filters and sorts entries by the number of points.
         This method filters entries where the title has 5 or fewer words,
         and sorts them by the number of points in descending order.
         Parameters:
         -----------
-        entries : list of tuple
-            A list of entries, where each entry is a tuple containing details of a news item.
-            The structure of the tuple is assumed to be (number, title, points, comments).
+        entries : iterable of Entry or tuple, Database or EntryFrame
+            An iterable of entries, either Entry records, whose cached title word count is
+            used, or tuples in the (number, title, points, comments) format.
+            When a Database is given, the entries are filtered and sorted by SQLite,
+            and when an EntryFrame is given, by vectorized NumPy operations.
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        top_k : int, optional
+            Only rank the k entries with the most points (default is None, rank every entry).
         Returns:
         --------
-        list of tuple
+        list of Entry or tuple
             A list of filtered and sorted entries by the number of points.
         """
-        return sorted(
-            [entry for entry in entries if len(entry[1].split()) <= 5], 
-            key=lambda x: x[2],
-            reverse=True
-        )
\ No newline at end of file
+        if isinstance(entries, EntryFrame):
+            return entries.filter_by_points(limit, offset, top_k, Filters.TITLE_WORDS)
+        if isinstance(entries, Database):
+            return Filters.POINTS_QUERY.page(Filters._limit(limit, offset, top_k), offset).run(entries)
+        return Filters._rank(
+            (entry for entry in entries if Filters._words(entry) <= Filters.TITLE_WORDS),
+            itemgetter(2), limit, offset, top_k
+        )
+
+    @staticmethod
+    def stream_by_comments(db, limit=None, offset=0, batch_size=500):
+        """
+        Streams the entries of filter_by_comments from a Database cursor.
+        Rows are yielded as SQLite returns them, so output can start at once
+        and memory stays flat however many entries match.
+        Parameters:
+        -----------
+        db : Database
+            The database to read the entries from.
+        limit : int, optional
+            The maximum number of entries to yield (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        batch_size : int, optional
+            The number of rows read from SQLite at a time (default is 500).
+        Returns:
+        --------
+        iterator of Entry
+            The filtered entries, sorted by the number of comments.
+        """
+        return db.iter_entries_by('comments', min_words=Filters.TITLE_WORDS + 1,
+                                  limit=limit, offset=offset, batch_size=batch_size)
+
+    @staticmethod
+    def stream_by_points(db, limit=None, offset=0, batch_size=500):
+        """
+        Streams the entries of filter_by_points from a Database cursor.
+        Parameters:
+        -----------
+        db : Database
+            The database to read the entries from.
+        limit : int, optional
+            The maximum number of entries to yield (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        batch_size : int, optional
+            The number of rows read from SQLite at a time (default is 500).
+        Returns:
+        --------
+        iterator of Entry
+            The filtered entries, sorted by the number of points.
+        """
+        return db.iter_entries_by('points', max_words=Filters.TITLE_WORDS,
+                                  limit=limit, offset=offset, batch_size=batch_size)
+
+    @staticmethod
+    @timed('filters.query')
+    def query(entries, query):
+        """
+        Runs a query of crawler.query on entries, a Database or an EntryFrame.
+        Parameters:
+        -----------
+        entries : iterable of Entry or tuple, Database or EntryFrame
+            The entries to query. A Database runs the query as SQL and caches the
+            result until its next write; the other sources are queried in Python.
+        query : Query
+            The predicate, sort keys and page to apply.
+        Returns:
+        --------
+        list of Entry
+            The matching entries, sorted and paged.
+        """
+        return query.run(entries)
+
+    @staticmethod
+    def _words(entry):
+        """
+        Returns the title word count of an entry, cached for Entry records.
+        """
+        return entry.word_count if type(entry) is Entry else word_count(entry[1])
+
+    @staticmethod
+    def _rank(entries, key, limit, offset, top_k):
+        """
+        Sorts entries by a key in descending order and returns one page of them.
+        With top_k, a bounded heap keeps only the k best entries while scanning.
+        Both paths keep entries with equal keys in their original order.
+        """
+        if top_k is None:
+            ranked = sorted(entries, key=key, reverse=True)
+        else:
+            ranked = heapq.nlargest(top_k, entries, key=key)
+        return ranked[offset:] if limit is None else ranked[offset:offset + limit]
+
+    @staticmethod
+    def _limit(limit, offset, top_k):
+        """
+        Returns the SQL limit of a page that must not go past the top k entries.
+        """
+        if top_k is None:
+            return limit
+        remaining = max(top_k - offset, 0)
+        return remaining if limit is None else min(limit, remaining)
@@ -0,0 +1,299 @@
+"""
+This module defines the EntryFrame class, a columnar snapshot of entries backed by
+NumPy arrays. Ranks, points, comments, title word counts and item ids are stored
+as parallel integer arrays and titles in a separate string table, so filters and rankings over
+millions of entries run as vectorized array operations instead of per-tuple lambdas.
+
+NumPy is an optional dependency: this module can be imported without it, but
+creating an EntryFrame raises ImportError. It is imported when the first frame
+is built, so importing the filters does not pay for it.
+
+Classes:
+--------
+EntryFrame:
+    A columnar, NumPy-backed snapshot of entries.
+
+Usage:
+------
+Build a frame from a Database in bulk, or from any iterable of entries, and pass it
+to the Filters methods or call its filter methods directly.
+
+Example:
+--------
+    from crawler.frame import EntryFrame
+    from crawler.filters import Filters
+
+    frame = EntryFrame.from_database(db)
+    top_commented = Filters.filter_by_comments(frame, top_k=100)
+    positions = frame.rank_by('points', frame.word_count <= 5)
+"""
+
+import functools  # Import functools to build Entry records from rows at C speed.
+import importlib.util  # Import importlib.util to check for NumPy without importing it.
+from .entry import Entry  # Import the Entry record the frame returns.
+
+MISSING_ITEM_ID = -1  # Stored in the item_id column for entries without an item id.
+_entry_from_row = functools.partial(tuple.__new__, Entry)  # Builds an Entry from a complete row, as-is.
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+np = None  # The numpy module, imported by _numpy() when the first frame is built.
+
+
+def _numpy():
+    """
+    Imports NumPy on first use and returns it.
+
+    Raises:
+    -------
+    ImportError
+        If NumPy is not installed.
+    """
+    global np
+    if np is None:
+        if not HAS_NUMPY:
+            raise ImportError("EntryFrame requires NumPy: pip install numpy")
+        import numpy  # Import NumPy for the column arrays; it is optional.
+        np = numpy
+    return np
+
+
+class EntryFrame:
+    """
+    A columnar, NumPy-backed snapshot of entries.
+
+    Attributes:
+    -----------
+    rank, points, comments, word_count, item_id : numpy.ndarray
+        Parallel int64 arrays with one element per entry; a missing item id is -1.
+    titles : list of str
+        The title of each entry, in the same order as the arrays.
+
+    Methods:
+    --------
+    from_entries(entries):
+        Builds a frame from an iterable of Entry records or (number, title, points, comments) tuples.
+
+    from_database(db, batch_size=100000):
+        Builds a frame from every entry stored in a Database.
+
+    rank_by(column, mask=None):
+        Returns the positions of the entries selected by mask, ordered by a column.
+
+    rows(positions=None):
+        Returns the entries at the given positions as Entry records.
+
+    filter_by_comments(limit=None, offset=0, top_k=None, title_words=5):
+        Vectorized equivalent of Filters.filter_by_comments.
+
+    filter_by_points(limit=None, offset=0, top_k=None, title_words=5):
+        Vectorized equivalent of Filters.filter_by_points.
+    """
+
+    def __init__(self, rank, points, comments, word_count, titles, item_id=None):
+        """
+        Initializes the EntryFrame from its columns.
+
+        Parameters:
+        -----------
+        rank, points, comments, word_count : array-like of int
+            The columns of the frame, all of the same length.
+        titles : list of str
+            The titles, in the same order as the columns.
+        item_id : array-like of int, optional
+            The item ids, -1 where unknown (default is None, every item id unknown).
+
+        Raises:
+        -------
+        ImportError
+            If NumPy is not installed.
+        ValueError
+            If the columns have different lengths.
+        """
+        _numpy()
+        self.rank = np.asarray(rank, dtype=np.int64)
+        self.points = np.asarray(points, dtype=np.int64)
+        self.comments = np.asarray(comments, dtype=np.int64)
+        self.word_count = np.asarray(word_count, dtype=np.int64)
+        self.titles = list(titles)
+        if item_id is None:
+            self.item_id = np.full(len(self.titles), MISSING_ITEM_ID, dtype=np.int64)
+        else:
+            self.item_id = np.asarray(item_id, dtype=np.int64)
+        lengths = {len(self.rank), len(self.points), len(self.comments), len(self.word_count), len(self.titles),
+                   len(self.item_id)}
+        if len(lengths) != 1:
+            raise ValueError("EntryFrame columns must have the same length")
+
+    def __len__(self):
+        """
+        Returns the number of entries in the frame.
+        """
+        return len(self.titles)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Builds a frame from an iterable of Entry records or (number, title, points, comments) tuples.
+
+        Parameters:
+        -----------
+        entries : iterable of Entry or tuple
+            The entries to copy into the frame.
+
+        Returns:
+        --------
+        EntryFrame
+            The frame holding the entries.
+        """
+        rank, titles, points, comments, words, item_ids = [], [], [], [], [], []
+        for entry in entries:
+            entry = Entry.from_tuple(entry)
+            rank.append(entry.rank)
+            titles.append(entry.title)
+            points.append(entry.points)
+            comments.append(entry.comments)
+            words.append(entry.word_count)
+            item_ids.append(MISSING_ITEM_ID if entry.item_id is None else entry.item_id)
+        return cls(rank, points, comments, words, titles, item_ids)
+
+    @classmethod
+    def from_database(cls, db, batch_size=100000):
+        """
+        Builds a frame from every entry stored in a Database.
+
+        Rows are read in batches and each batch is converted to arrays at once,
+        using the title word counts already stored in the database.
+
+        Parameters:
+        -----------
+        db : Database
+            The database to read the entries from.
+        batch_size : int, optional
+            The number of rows converted per batch (default is 100000).
+
+        Returns:
+        --------
+        EntryFrame
+            The frame holding every stored entry, in insertion order.
+        """
+        _numpy()
+        cursor = db.conn.execute('''
+            SELECT rank, points, comments, title_word_count, ifnull(item_id, ?), title FROM entries ORDER BY id
+        ''', (MISSING_ITEM_ID,))
+        columns = ([], [], [], [], [])
+        titles = []
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            *values, batch_titles = zip(*rows)
+            for parts, column in zip(columns, values):
+                parts.append(np.array(column, dtype=np.int64))
+            titles.extend(batch_titles)
+        empty = np.empty(0, dtype=np.int64)
+        rank, points, comments, words, item_ids = (np.concatenate(parts) if parts else empty for parts in columns)
+        return cls(rank, points, comments, words, titles, item_ids)
+
+    def rank_by(self, column, mask=None):
+        """
+        Returns the positions of the entries selected by mask, ordered by a column.
+
+        The ordering is descending and stable, so entries with equal values keep
+        their order in the frame, exactly like sorted(..., reverse=True).
+
+        Parameters:
+        -----------
+        column : str
+            The column to order by: 'rank', 'points', 'comments' or 'word_count'.
+        mask : numpy.ndarray of bool, optional
+            The entries to keep (default is None, every entry).
+
+        Returns:
+        --------
+        numpy.ndarray
+            The positions of the selected entries in ranking order.
+        """
+        values = getattr(self, column)
+        positions = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+        order = np.argsort(-values[positions], kind='stable')
+        return positions[order]
+
+    def rows(self, positions=None):
+        """
+        Returns the entries at the given positions as Entry records.
+
+        Parameters:
+        -----------
+        positions : iterable of int, optional
+            The positions of the entries to return (default is None, every entry in order).
+
+        Returns:
+        --------
+        list of Entry
+            The entries, each with its rank, title, points, comments, item id and title word count.
+        """
+        if positions is None:
+            positions = np.arange(len(self.titles), dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        item_ids = [None if item_id == MISSING_ITEM_ID else item_id for item_id in self.item_id[positions].tolist()]
+        # zip over C-level iterators builds the rows without a Python loop body.
+        return list(map(_entry_from_row, zip(
+            self.rank[positions].tolist(),
+            map(self.titles.__getitem__, positions.tolist()),
+            self.points[positions].tolist(),
+            self.comments[positions].tolist(),
+            item_ids,
+            self.word_count[positions].tolist(),
+        )))
+
+    def _page(self, positions, limit, offset, top_k):
+        """
+        Returns one page of ranked positions as tuples, within the top k.
+        """
+        if top_k is not None:
+            positions = positions[:top_k]
+        end = None if limit is None else offset + limit
+        return self.rows(positions[offset:end])
+
+    def filter_by_comments(self, limit=None, offset=0, top_k=None, title_words=5):
+        """
+        Vectorized equivalent of Filters.filter_by_comments.
+
+        Parameters:
+        -----------
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        top_k : int, optional
+            Only rank the k entries with the most comments (default is None).
+        title_words : int, optional
+            Titles with more than this many words are kept (default is 5).
+
+        Returns:
+        --------
+        list of Entry
+            A list of filtered and sorted entries by the number of comments.
+        """
+        return self._page(self.rank_by('comments', self.word_count > title_words), limit, offset, top_k)
+
+    def filter_by_points(self, limit=None, offset=0, top_k=None, title_words=5):
+        """
+        Vectorized equivalent of Filters.filter_by_points.
+
+        Parameters:
+        -----------
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        top_k : int, optional
+            Only rank the k entries with the most points (default is None).
+        title_words : int, optional
+            Titles with this many words or fewer are kept (default is 5).
+
+        Returns:
+        --------
+        list of Entry
+            A list of filtered and sorted entries by the number of points.
+        """
+        return self._page(self.rank_by('points', self.word_count <= title_words), limit, offset, top_k)
@@ -0,0 +1,325 @@
+"""
+This module defines the crawl frontier used to follow links beyond the listing
+pages: a priority queue of URLs to visit, a Bloom filter that remembers every URL
+already discovered, and the per-URL-pattern handlers that process fetched pages.
+
+The Bloom filter answers "seen before?" in a fixed number of bits, whatever the
+number of discovered URLs, at the cost of a small, configurable false positive
+rate (a few new URLs may be skipped, but no URL is visited twice). The queue is
+bounded too: when it is full, the lowest-priority URLs are dropped. The state of
+both can be saved to and restored from the SQLite database, so a crawl can be
+resumed.
+
+Classes:
+--------
+BloomFilter:
+    A fixed-size Bloom filter of strings.
+Frontier:
+    A bounded priority queue of URLs with Bloom-filter deduplication.
+
+Functions:
+----------
+extract_links(url, html):
+    Returns the item, user and site links of a page with their priorities.
+handle_listing(scraper, url, html, depth):
+    Stores the entries of a listing page and returns its links.
+handle_item(scraper, url, html, depth):
+    Stores the comment thread of a story's page and returns its links.
+handle_page(scraper, url, html, depth):
+    Returns the links of a page without storing anything.
+
+Usage:
+------
+Call Scraper.crawl, which drives a Frontier with DEFAULT_HANDLERS, or build a
+Frontier with your own handlers.
+
+Example:
+--------
+    from crawler.frontier import Frontier
+    from crawler.scraper import Scraper
+
+    scraper = Scraper()
+    frontier = Frontier.load(scraper.db) or Frontier(capacity=10_000_000)
+    scraper.crawl(max_depth=2, max_pages=500, frontier=frontier)
+    frontier.save(scraper.db)
+"""
+
+import hashlib  # Import hashlib to derive the Bloom filter bit positions.
+import heapq  # Import heapq for the priority queue.
+import html as html_lib  # Import the html module to unescape link URLs.
+import itertools  # Import itertools to number the queued URLs.
+import math  # Import math to size the Bloom filter.
+import re  # Import the regular expressions library to find and route links.
+from urllib.parse import urljoin  # Import urljoin to resolve relative links.
+from .parser import is_story_page, parse_comments  # Import the comment parser for the item pages.
+
+_LINK_RE = re.compile(r'href=["\']((?:item\?id=\d+|user\?id=[^"\'&]+|from\?site=[^"\'&]+))["\']')
+LINK_PRIORITIES = (
+    ('item?id=', 2),
+    ('user?id=', 1),
+    ('from?site=', 0),
+)
+SEED_PRIORITY = 3  # Seeds are visited before any discovered link.
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter of strings.
+
+    Attributes:
+    -----------
+    size : int
+        The number of bits.
+    hashes : int
+        The number of bit positions set per item.
+    count : int
+        The number of items added.
+
+    Methods:
+    --------
+    __init__(capacity=1000000, error_rate=0.001):
+        Sizes the filter for a number of items and a false positive rate.
+
+    add(item):
+        Adds an item and returns whether it was new.
+
+    from_state(size, hashes, count, bits):
+        Rebuilds a filter from its saved state.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Sizes the filter for a number of items and a false positive rate.
+
+        Parameters:
+        -----------
+        capacity : int, optional
+            The number of items the filter is sized for (default is 1000000).
+        error_rate : float, optional
+            The false positive rate at capacity (default is 0.001, about 1.8 MB per million items).
+        """
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_state(cls, size, hashes, count, bits):
+        """
+        Rebuilds a filter from its saved state.
+        """
+        bloom = cls.__new__(cls)
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom.count = count
+        bloom.bits = bytearray(bits)
+        return bloom
+
+    def _positions(self, item):
+        """
+        Returns the bit positions of an item, using double hashing of one digest.
+        """
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        """
+        Returns whether an item may have been added (never False for an added item).
+        """
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def add(self, item):
+        """
+        Adds an item and returns whether it was new.
+        """
+        new = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+
+class Frontier:
+    """
+    A bounded priority queue of URLs with Bloom-filter deduplication.
+
+    URLs with a higher priority are popped first; among equal priorities, the
+    shallower and then the older URL comes first.
+
+    Methods:
+    --------
+    __init__(capacity=1000000, error_rate=0.001, max_size=100000, seen=None):
+        Initializes an empty frontier.
+
+    push(url, depth=0, priority=0):
+        Queues a URL unless it has been seen before.
+
+    pop():
+        Removes and returns the next (url, depth) to visit.
+
+    save(db, name='default'):
+        Saves the seen-set and the queue to the database.
+
+    load(db, name='default'):
+        Restores a saved frontier, or returns None.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001, max_size=100000, seen=None):
+        """
+        Initializes an empty frontier.
+
+        Parameters:
+        -----------
+        capacity : int, optional
+            The number of URLs the seen-set is sized for (default is 1000000).
+        error_rate : float, optional
+            The false positive rate of the seen-set at capacity (default is 0.001).
+        max_size : int, optional
+            The maximum number of queued URLs (default is 100000).
+        seen : BloomFilter, optional
+            An existing seen-set to use instead of a new one.
+        """
+        self.seen = seen if seen is not None else BloomFilter(capacity, error_rate)
+        self.max_size = max_size
+        self.dropped = 0
+        self._queue = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """
+        Returns the number of queued URLs.
+        """
+        return len(self._queue)
+
+    def push(self, url, depth=0, priority=0):
+        """
+        Queues a URL unless it has been seen before.
+
+        Parameters:
+        -----------
+        url : str
+            The absolute URL to visit.
+        depth : int, optional
+            The number of links followed from a seed to reach the URL (default is 0).
+        priority : int, optional
+            Higher priorities are visited first (default is 0).
+
+        Returns:
+        --------
+        bool
+            True if the URL was queued, False if it had been seen before.
+        """
+        if not self.seen.add(url):
+            return False
+        heapq.heappush(self._queue, (-priority, depth, next(self._counter), url))
+        if len(self._queue) > self.max_size:
+            # Keep the best three quarters, so trimming is rare and its cost amortized.
+            self._queue = heapq.nsmallest(self.max_size * 3 // 4, self._queue)
+            heapq.heapify(self._queue)
+            self.dropped += self.max_size + 1 - len(self._queue)
+        return True
+
+    def pop(self):
+        """
+        Removes and returns the next (url, depth) to visit.
+
+        Raises:
+        -------
+        IndexError
+            If the frontier is empty.
+        """
+        _, depth, _, url = heapq.heappop(self._queue)
+        return url, depth
+
+    def save(self, db, name='default'):
+        """
+        Saves the seen-set and the queue to the database.
+        """
+        state = (self.seen.size, self.seen.hashes, self.seen.count, bytes(self.seen.bits))
+        queue = [(url, depth, -negated) for negated, depth, _, url in sorted(self._queue)]
+        db.save_frontier(name, state, queue, self.max_size)
+
+    @classmethod
+    def load(cls, db, name='default'):
+        """
+        Restores a saved frontier, or returns None when none was saved under this name.
+        """
+        saved = db.load_frontier(name)
+        if saved is None:
+            return None
+        state, queue, max_size = saved
+        frontier = cls(max_size=max_size, seen=BloomFilter.from_state(*state))
+        for url, depth, priority in queue:
+            heapq.heappush(frontier._queue, (-priority, depth, next(frontier._counter), url))
+        return frontier
+
+
+def extract_links(url, html):
+    """
+    Returns the item, user and site links of a page with their priorities.
+
+    Parameters:
+    -----------
+    url : str
+        The URL of the page, used to resolve relative links.
+    html : str
+        The HTML content of the page.
+
+    Returns:
+    --------
+    list of tuple
+        A list of (absolute URL, priority) tuples, in page order.
+    """
+    links = []
+    for match in _LINK_RE.finditer(html):
+        link = html_lib.unescape(match.group(1))
+        priority = next(value for prefix, value in LINK_PRIORITIES if link.startswith(prefix))
+        links.append((urljoin(url, link), priority))
+    return links
+
+
+def handle_listing(scraper, url, html, depth):
+    """
+    Stores the entries of a listing page and returns its links.
+    """
+    entries = scraper.parse_entries(html, limit=None)
+    if entries:
+        scraper.store_entries(entries)
+    return extract_links(url, html)
+
+
+def handle_item(scraper, url, html, depth):
+    """
+    Stores the comment thread of a story's page and returns its links.
+
+    The page of a comment only shows part of a thread, so its comments are left
+    to the crawl of the story's page.
+    """
+    if is_story_page(html):
+        story_id = int(url.rsplit('=', 1)[1])
+        comments = parse_comments(html, story_id)
+        if comments:
+            scraper.db.store_comments(story_id, comments)
+    return extract_links(url, html)
+
+
+def handle_page(scraper, url, html, depth):
+    """
+    Returns the links of a page without storing anything.
+    """
+    return extract_links(url, html)
+
+
+# Handlers are tried in order; the first pattern that matches the URL handles the page.
+DEFAULT_HANDLERS = [
+    (re.compile(r'^https?://[^/]+/(?:news|newest|ask|show)?(?:\?p=\d+)?$'), handle_listing),
+    (re.compile(r'/item\?id=\d+$'), handle_item),
+    (re.compile(r'/user\?id='), handle_page),
+    (re.compile(r'/from\?site='), handle_page),
+]
@@ -0,0 +1,296 @@
+"""
+This module defines the crawler's operation metrics: call counters and latency
+histograms for the instrumented methods of the Scraper, the Database and the
+Filters, plus free-form counters such as the number of stored entries. The data
+can be read as a JSON-serializable snapshot or in the Prometheus text format.
+
+Instrumentation is disabled by default. While it is disabled, an instrumented
+call costs one attribute check on top of the call itself, and nothing is recorded.
+
+Classes:
+--------
+Histogram:
+    A latency histogram with fixed bucket bounds.
+Registry:
+    A thread-safe collection of histograms and counters.
+
+Functions:
+----------
+timed(name):
+    Decorator that records the latency of every call of a function under a name.
+
+Usage:
+------
+Enable the global REGISTRY, run the crawler, then read the snapshot or the
+Prometheus text.
+
+Example:
+--------
+    from crawler import metrics
+
+    metrics.REGISTRY.enable()
+    scraper.scrape_and_store()
+    print(metrics.REGISTRY.to_prometheus())
+    with open('metrics.json', 'w') as handle:
+        json.dump(metrics.REGISTRY.snapshot(), handle)
+"""
+
+import bisect  # Import bisect to find the bucket of a latency.
+import functools  # Import functools to keep the metadata of instrumented functions.
+import threading  # Import threading to record metrics from crawler threads.
+import time  # Import time to measure latency.
+from contextlib import contextmanager  # Import contextmanager to build the timer.
+
+# Upper bounds of the latency buckets in seconds, from 100 µs to 30 s.
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    A latency histogram with fixed bucket bounds.
+
+    Attributes:
+    -----------
+    counts : list of int
+        The number of observations per bucket; the last one is above every bound.
+    count : int
+        The number of observations.
+    total : float
+        The sum of the observations in seconds.
+    errors : int
+        The number of observed calls that raised an exception.
+    """
+
+    def __init__(self, bounds=BUCKETS):
+        """
+        Initializes an empty histogram.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds):
+        """
+        Records one observation.
+        """
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, fraction):
+        """
+        Returns an estimate of a quantile: the upper bound of the bucket that holds it.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Registry:
+    """
+    A thread-safe collection of histograms and counters.
+
+    Attributes:
+    -----------
+    enabled : bool
+        Whether instrumented calls are recorded.
+
+    Methods:
+    --------
+    enable() / disable():
+        Starts or stops recording.
+
+    observe(name, seconds, error=False):
+        Records the latency of one call of an operation.
+
+    increment(name, amount=1):
+        Adds to a counter.
+
+    timer(name):
+        Context manager that records the latency of a block.
+
+    snapshot():
+        Returns the metrics as a JSON-serializable dict.
+
+    to_prometheus(prefix='crawler'):
+        Returns the metrics in the Prometheus text exposition format.
+
+    reset():
+        Forgets every recorded value.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty, disabled registry.
+        """
+        self.enabled = False
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """
+        Starts recording.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops recording; the values recorded so far are kept.
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forgets every recorded value.
+        """
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def observe(self, name, seconds, error=False):
+        """
+        Records the latency of one call of an operation.
+
+        Parameters:
+        -----------
+        name : str
+            The operation, e.g. 'database.insert_entries'.
+        seconds : float
+            The latency of the call.
+        error : bool, optional
+            Whether the call raised an exception (default is False).
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if error:
+                histogram.errors += 1
+
+    def increment(self, name, amount=1):
+        """
+        Adds to a counter, when recording is enabled.
+        """
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Context manager that records the latency of a block, when recording is enabled.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self.observe(name, time.perf_counter() - start, error)
+
+    def snapshot(self):
+        """
+        Returns the metrics as a JSON-serializable dict.
+
+        Returns:
+        --------
+        dict
+            {'counters': {name: value}, 'operations': {name: {'count', 'errors',
+            'total_seconds', 'mean_seconds', 'p50_seconds', 'p99_seconds',
+            'max_seconds', 'buckets'}}}, where 'buckets' maps each upper bound to
+            the cumulative number of observations.
+        """
+        with self._lock:
+            operations = {}
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                operations[name] = {
+                    'count': histogram.count,
+                    'errors': histogram.errors,
+                    'total_seconds': histogram.total,
+                    'mean_seconds': histogram.total / histogram.count,
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p99_seconds': histogram.quantile(0.99),
+                    'max_seconds': histogram.max,
+                    'buckets': buckets,
+                }
+            return {'counters': dict(sorted(self.counters.items())), 'operations': operations}
+
+    def to_prometheus(self, prefix='crawler'):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Operations are exposed as the histogram {prefix}_operation_seconds and the
+        counter {prefix}_operation_errors_total, labelled by operation; every
+        counter is exposed as {prefix}_{name}_total.
+        """
+        snapshot = self.snapshot()
+        histogram = f'{prefix}_operation_seconds'
+        errors = f'{prefix}_operation_errors_total'
+        lines = [
+            f'# HELP {histogram} Latency of instrumented crawler operations.',
+            f'# TYPE {histogram} histogram',
+        ]
+        for name, operation in snapshot['operations'].items():
+            for bound, count in operation['buckets'].items():
+                lines.append(f'{histogram}_bucket{{operation="{name}",le="{bound}"}} {count}')
+            lines.append(f'{histogram}_sum{{operation="{name}"}} {operation["total_seconds"]!r}')
+            lines.append(f'{histogram}_count{{operation="{name}"}} {operation["count"]}')
+        lines += [f'# HELP {errors} Instrumented crawler operations that raised.', f'# TYPE {errors} counter']
+        for name, operation in snapshot['operations'].items():
+            lines.append(f'{errors}{{operation="{name}"}} {operation["errors"]}')
+        for name, value in snapshot['counters'].items():
+            metric = f'{prefix}_{name.replace(".", "_")}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()  # The registry the crawler's instrumented methods record to.
+
+
+def timed(name):
+    """
+    Decorator that records the latency of every call of a function under a name.
+
+    When REGISTRY is disabled, the wrapper only checks the flag and calls the
+    function.
+
+    Parameters:
+    -----------
+    name : str
+        The operation name, e.g. 'scraper.fetch_entries'.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = function(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                REGISTRY.observe(name, time.perf_counter() - start, error)
+        return wrapper
+    return decorate
@@ -0,0 +1,100 @@
+"""
+This module writes entries to a text stream in the formats supported by the
+command line: a tabulate grid, JSON Lines and CSV.
+
+The JSONL and CSV writers consume their rows one at a time and write each row as
+soon as it arrives, so they can be fed directly from a database cursor: output
+starts immediately and memory does not grow with the number of rows. The grid
+has to measure every row before drawing the table, so it holds them all.
+
+Functions:
+----------
+write_grid(rows, stream):
+    Writes the rows as a tabulate grid.
+write_jsonl(rows, stream):
+    Writes one JSON object per row.
+write_csv(rows, stream):
+    Writes the rows as CSV with a header line.
+write_rows(rows, format, stream):
+    Writes the rows in one of FORMATS.
+
+Example:
+--------
+    import sys
+    from crawler.output import write_rows
+
+    write_rows(Filters.stream_by_points(db), 'jsonl', sys.stdout)
+"""
+
+import csv  # Import csv to write CSV rows.
+import json  # Import json to write JSON Lines.
+
+FIELDS = ('number', 'title', 'points', 'comments')
+HEADERS = ('Number', 'Title', 'Points', 'Comments')
+
+
+def write_grid(rows, stream):
+    """
+    Writes the rows as a tabulate grid and returns the number of rows.
+    """
+    from tabulate import tabulate  # Imported here so the streaming formats do not need tabulate.
+
+    rows = [row[:len(FIELDS)] for row in rows]
+    stream.write(tabulate(rows, headers=HEADERS, tablefmt="grid") + '\n')
+    return len(rows)
+
+
+def write_jsonl(rows, stream):
+    """
+    Writes one JSON object per row and returns the number of rows.
+    """
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def write_csv(rows, stream):
+    """
+    Writes the rows as CSV with a header line and returns the number of rows.
+    """
+    writer = csv.writer(stream, lineterminator='\n')
+    writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(row[:len(FIELDS)])
+        count += 1
+    return count
+
+
+FORMATS = {'grid': write_grid, 'jsonl': write_jsonl, 'csv': write_csv}
+STREAMING_FORMATS = ('jsonl', 'csv')
+
+
+def write_rows(rows, format, stream):
+    """
+    Writes the rows in one of FORMATS.
+
+    Parameters:
+    -----------
+    rows : iterable of Entry or tuple
+        The entries to write; only their number, title, points and comments are written.
+    format : str
+        'grid', 'jsonl' or 'csv'.
+    stream : file-like object
+        The text stream to write to.
+
+    Returns:
+    --------
+    int
+        The number of rows written.
+
+    Raises:
+    -------
+    ValueError
+        If the format is unknown.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown output format {format!r}; expected one of {tuple(FORMATS)}")
+    return FORMATS[format](rows, stream)
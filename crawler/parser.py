@@ -0,0 +1,298 @@
+"""
+This module defines the parsers that turn a Hacker News listing page into
+entries. Two interchangeable parsers are provided:
+
+- parse_listing: a fast single-pass parser built on precompiled regular
+  expressions. It walks the page once, without building a DOM, and pairs
+  each '.athing' row with its '.subtext' row by item id.
+- parse_listing_bs4: the BeautifulSoup parser, kept as a fallback for pages
+  whose markup the fast parser does not recognise.
+
+Both parsers return the same entries for the same page, and both reset the
+comment count for every row, so a row without a comments link gets 0. Entries
+are returned as Entry records with an integer rank and the Hacker News item id,
+taken from the id of its '.athing' row.
+
+parse_comments reads the comment thread of an item page in the same single-pass
+style. Hacker News renders a thread as a flat list of '.comtr' rows in display
+order, each with its indent level; the parent of a comment is the closest
+preceding comment one level up, so the whole tree is rebuilt with a stack. The page of a comment lists the replies
+to that comment in the same markup, so is_story_page tells a story's page (whose
+thread is the whole discussion) from a comment's.
+
+Functions:
+----------
+parse_listing(html, limit=None):
+    Parses a listing page in a single pass without building a DOM.
+parse_listing_bs4(html, limit=None):
+    Parses a listing page with BeautifulSoup.
+parse_raw(data, parser='fast', limit=None):
+    Parses a listing page given as raw bytes, e.g. in a worker process.
+parse_comments(html, story_id):
+    Parses the comment thread of an item page.
+is_story_page(html):
+    Returns whether an item page is the page of a story rather than of a comment.
+
+Usage:
+------
+Pick a parser from the PARSERS mapping by name, or call one directly.
+
+Example:
+--------
+    from crawler.parser import PARSERS
+
+    entries = PARSERS['fast'](html, limit=30)
+    comments = parse_comments(item_html, story_id=41000001)
+"""
+
+import html as html_lib  # Import the html module to unescape character references.
+import re  # Import the regular expressions library for string matching.
+from .entry import Comment, Entry, to_rank  # Import the records the parsers return.
+
+# Matches either a whole '.athing' row or the contents of a '.subtext' cell,
+# in document order, so both kinds of row are seen in one pass over the page.
+_TOKEN_RE = re.compile(
+    r'<tr\b(?=[^>]*\bclass=["\'][^"\']*\bathing\b)(?=[^>]*\bid=["\'](?P<id>\d+)["\'])[^>]*>(?P<row>.*?)</tr>'
+    r'|<td\b(?=[^>]*\bclass=["\']subtext["\'])[^>]*>(?P<sub>.*?)</td>',
+    re.S
+)
+_RANK_RE = re.compile(r'<span class=["\']rank["\']>([^<]*)</span>')
+# Greedy on purpose: the titleline span is the last span of the row and contains nested spans.
+_TITLE_RE = re.compile(r'<span class=["\']titleline["\']>(.*)</span>', re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+_ITEM_ID_RE = re.compile(r'item\?id=(\d+)')
+_SCORE_RE = re.compile(r'<span class=["\']score["\'][^>]*>(\d+)\s+points?</span>')
+_COMMENTS_RE = re.compile(r'>(\d+)(?:&nbsp;|\s)+comments?</a>')
+# Removes the parenthesised parts of a title, such as the " (example.com)" site suffix.
+_PAREN_RE = re.compile(r'\s*\([^)]*\)')
+_POINTS_TEXT_RE = re.compile(r'(\d+)\spoints?')
+_COMMENTS_TEXT_RE = re.compile(r'(\d+)\scomments?')
+# The start of each comment row of an item page; a row's markup runs to the start of the next one.
+_COMMENT_ROW_RE = re.compile(
+    r'<tr\b(?=[^>]*\bclass=["\'][^"\']*\bcomtr\b)(?=[^>]*\bid=["\'](\d+)["\'])[^>]*>'
+)
+_INDENT_RE = re.compile(r'<td\b[^>]*\bindent=["\']?(\d+)')
+# Older pages indent with a spacer image 40 pixels wide per level.
+_INDENT_WIDTH_RE = re.compile(r'class=["\']ind["\'][^>]*>\s*<img\b[^>]*\bwidth=["\']?(\d+)')
+_USER_RE = re.compile(r'\bclass=["\']hnuser["\'][^>]*>([^<]+)</a>')
+# The title of the age span is the ISO time, optionally followed by the Unix time.
+_AGE_RE = re.compile(r'<span class=["\']age["\'] title=["\']([^"\'\s]+)')
+_COMMTEXT_RE = re.compile(r'<div class=["\']commtext[^"\']*["\']>(.*?)</div>', re.S)
+_PARAGRAPH_RE = re.compile(r'\s*<p>\s*')
+# The item at the top of an item page; a comment's has links to its parent and to its story ("on:").
+_FATITEM_RE = re.compile(r'<table\b[^>]*\bclass=["\']fatitem["\'][^>]*>(.*?)</table>', re.S)
+_SUBITEM_RE = re.compile(r'\bclass=["\']onstory["\']|>\s*parent\s*</a>|\|\s*on:\s*<a')
+
+
+def _text(fragment):
+    """
+    Returns the text content of an HTML fragment.
+    """
+    return html_lib.unescape(_TAG_RE.sub('', fragment))
+
+
+def parse_listing(html, limit=None):
+    """
+    Parses a listing page in a single pass without building a DOM.
+
+    Parameters:
+    -----------
+    html : str
+        The HTML content of a Hacker News listing page.
+    limit : int, optional
+        The maximum number of entries to parse (default is None, every entry).
+
+    Returns:
+    --------
+    list of Entry
+        The entries of the page, each with its rank, title, points, comments, and item id.
+    """
+    entries = []
+    pending = {}  # Rows waiting for their subtext, keyed by item id.
+
+    for match in _TOKEN_RE.finditer(html):
+        item_id = match.group('id')
+        if item_id is not None:
+            if limit is not None and len(entries) >= limit:
+                break
+            row = match.group('row')
+            rank = _RANK_RE.search(row)
+            title = _TITLE_RE.search(row)
+            entry = [
+                to_rank(html_lib.unescape(rank.group(1))) if rank else 0,
+                _PAREN_RE.sub('', _text(title.group(1))) if title else '',
+                0,
+                0,
+                int(item_id),
+            ]
+            entries.append(entry)
+            pending[item_id] = entry
+            continue
+
+        subtext = match.group('sub')
+        owner = _ITEM_ID_RE.search(subtext)
+        entry = pending.pop(owner.group(1), None) if owner else None
+        if entry is None:
+            continue
+        score = _SCORE_RE.search(subtext)
+        if score:
+            entry[2] = int(score.group(1))
+        comments = _COMMENTS_RE.search(subtext)
+        if comments:
+            entry[3] = int(comments.group(1))
+
+    return [Entry(*entry) for entry in entries]
+
+
+def parse_listing_bs4(html, limit=None):
+    """
+    Parses a listing page with BeautifulSoup.
+
+    Rows are paired with their subtext by item id rather than by position,
+    so pages with missing subtexts do not shift the points and comments.
+
+    Parameters:
+    -----------
+    html : str
+        The HTML content of a Hacker News listing page.
+    limit : int, optional
+        The maximum number of entries to parse (default is None, every entry).
+
+    Returns:
+    --------
+    list of Entry
+        The entries of the page, each with its rank, title, points, comments, and item id.
+    """
+    # Imported here so the fast parser, and everything that imports this module, does not load bs4.
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    items = soup.select('.athing')
+    if limit is not None:
+        items = items[:limit]
+
+    subtexts = {}
+    for subtext in soup.select('.subtext'):
+        link = subtext.find('a', href=_ITEM_ID_RE)
+        if link:
+            subtexts.setdefault(_ITEM_ID_RE.search(link['href']).group(1), subtext)
+
+    entries = []
+    for item in items:
+        rank = to_rank(item.select_one('.rank').text)
+        title = item.select_one('.titleline').text
+        clean_title = _PAREN_RE.sub('', title)
+        points = 0
+        comments = 0
+
+        subtext = subtexts.get(item.get('id'))
+        if subtext is not None:
+            if subtext.select_one('.score'):
+                points = int(_POINTS_TEXT_RE.search(subtext.select_one('.score').text).group(1))
+            comments_link = subtext.find_all('a', string=_COMMENTS_TEXT_RE)
+            if comments_link:
+                comments = int(_COMMENTS_TEXT_RE.search(comments_link[0].text).group(1))
+
+        entries.append(Entry(rank, clean_title, points, comments, int(item['id'])))
+
+    return entries
+
+
+def parse_raw(data, parser='fast', limit=None):
+    """
+    Parses a listing page given as raw bytes, e.g. in a worker process.
+
+    This is a module-level function so it can be sent to a ProcessPoolExecutor:
+    the worker receives the undecoded body and returns Entry records (plain
+    named tuples), which keeps the data pickled between processes small.
+
+    Parameters:
+    -----------
+    data : bytes or None
+        The UTF-8 encoded HTML content of a listing page, or None for no page.
+    parser : str, optional
+        The name of the parser in PARSERS (default is 'fast').
+    limit : int, optional
+        The maximum number of entries to parse (default is None, every entry).
+
+    Returns:
+    --------
+    list of Entry
+        The entries of the page, each with its rank, title, points, comments, and item id.
+    """
+    if data is None:
+        return []
+    return PARSERS[parser](data.decode('utf-8', errors='replace'), limit)
+
+
+def parse_comments(html, story_id):
+    """
+    Parses the comment thread of an item page.
+
+    Parameters:
+    -----------
+    html : str
+        The HTML content of a Hacker News item page.
+    story_id : int
+        The item id of the page's story, the parent of the top-level comments.
+
+    Returns:
+    --------
+    list of Comment
+        The comments in display order (each reply after its parent), with their
+        parent and depth. Deleted comments are kept, without author or text, so
+        their replies keep their place in the tree.
+    """
+    comments = []
+    path = []  # The ids of the comments from the top level down to the previous comment.
+    starts = list(_COMMENT_ROW_RE.finditer(html))
+    for index, start in enumerate(starts):
+        end = starts[index + 1].start() if index + 1 < len(starts) else len(html)
+        row = html[start.end():end]
+        indent = _INDENT_RE.search(row)
+        if indent:
+            depth = int(indent.group(1))
+        else:
+            width = _INDENT_WIDTH_RE.search(row)
+            depth = int(width.group(1)) // 40 if width else 0
+        depth = min(depth, len(path))  # A row cannot be nested deeper than one level below the previous one.
+        del path[depth:]
+        comment_id = int(start.group(1))
+        author = _USER_RE.search(row)
+        age = _AGE_RE.search(row)
+        text = _COMMTEXT_RE.search(row)
+        comments.append(Comment(
+            comment_id,
+            story_id,
+            path[-1] if path else story_id,
+            depth,
+            html_lib.unescape(author.group(1)) if author else None,
+            age.group(1) if age else None,
+            _text(_PARAGRAPH_RE.sub('\n\n', text.group(1))).strip() if text else '',
+        ))
+        path.append(comment_id)
+    return comments
+
+
+def is_story_page(html):
+    """
+    Returns whether an item page is the page of a story rather than of a comment.
+
+    Parameters:
+    -----------
+    html : str
+        The HTML content of a Hacker News item page.
+
+    Returns:
+    --------
+    bool
+        True when the item at the top of the page has no parent and story links.
+    """
+    item = _FATITEM_RE.search(html)
+    return item is not None and not _SUBITEM_RE.search(item.group(1))
+
+
+PARSERS = {
+    'fast': parse_listing,
+    'bs4': parse_listing_bs4,
+}
@@ -0,0 +1,341 @@
+"""
+This module defines the AsyncScraper class, which crawls listing pages through a
+staged asyncio pipeline: fetch, parse and store run at the same time, each with
+its own number of workers, connected by bounded queues.
+
+Scraper.scrape_and_store runs its stages one after another: every page is
+fetched before the first one is parsed, and every entry is parsed before the
+first one is written. In the pipeline, a page moves to the next stage as soon as
+it is ready:
+
+- fetch: `fetch_concurrency` workers download pages as raw bytes with the
+  blocking requests session, in a thread pool;
+- parse: `parse_concurrency` workers parse the pages, in a process pool (or a
+  thread pool when parse_workers is 0);
+- store: a single worker writes the parsed entries, up to `store_batch` pages
+  per transaction, on a dedicated thread (SQLite has a single writer anyway).
+
+Every queue holds at most `queue_size` items. When a stage falls behind, its
+queue fills up and the workers of the stage before it wait to hand over their
+results, so slow storage slows fetching down instead of filling memory. The
+time spent waiting is reported as 'blocked', next to each stage's queue depth
+and utilization (the share of its workers' time spent working), so the stage
+that limits the crawl is the one with the highest utilization: see bottleneck().
+
+A page that fails in a stage is counted in that stage's 'failed' statistic and
+recorded in `errors`; the other pages carry on.
+
+Classes:
+--------
+AsyncScraper:
+    A Scraper whose crawl runs as a pipeline of concurrent stages.
+
+Usage:
+------
+Create an AsyncScraper like a Scraper and call scrape_and_store, or await run
+from a running event loop.
+
+Example:
+--------
+    from crawler.pipeline import AsyncScraper
+
+    scraper = AsyncScraper(fetch_concurrency=8, parse_workers=2, queue_size=16)
+    scraper.scrape_and_store(pages=20, sections=('', 'newest'))
+    print(scraper.bottleneck())    # 'fetch'
+    print(scraper.stats()['fetch'])
+    # {'workers': 8, 'processed': 40, 'failed': 0, 'busy': 9.6, 'blocked': 0.0, 'utilization': 0.93,
+    #  'queue_depth': 0, 'max_queue_depth': 16, 'mean_queue_depth': 11.2}
+"""
+
+import asyncio  # Import asyncio to run the stages concurrently.
+import time  # Import time to measure the busy and blocked time of the stages.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # Import the pools the blocking work runs in.
+from .metrics import REGISTRY  # Import the metrics registry to count the failed pages.
+from .parser import parse_raw  # Import the raw page parser the parse stage runs.
+from .scraper import Scraper  # Import the Scraper class the pipeline extends.
+from .storage import Database  # Import the Database class the store stage writes to.
+
+_DONE = object()  # Queued once per worker when the previous stage has finished.
+
+
+class _Stage:
+    """
+    The input queue, workers and statistics of one pipeline stage.
+    """
+
+    def __init__(self, name, workers, queue_size):
+        self.name = name
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    async def put(self, item):
+        """
+        Queues an item, waiting while the queue is full, and samples the queue depth.
+        """
+        await self.queue.put(item)
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.depth_samples += 1
+
+    def stats(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'busy': self.busy,
+            'blocked': self.blocked,
+            'utilization': self.busy / (self.workers * elapsed) if elapsed > 0 else 0.0,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'mean_queue_depth': self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+        }
+
+
+class AsyncScraper(Scraper):
+    """
+    A Scraper whose crawl runs as a pipeline of concurrent stages.
+
+    Attributes:
+    -----------
+    errors : list of tuple
+        The (stage, item, exception) of every page that failed in the last run.
+
+    Methods:
+    --------
+    __init__(db_path='crawler.db', fetch_concurrency=None, parse_concurrency=None, queue_size=None,
+             store_batch=8, **options):
+        Initializes the scraper and the limits of the stages.
+
+    run(urls, limit=None):
+        Coroutine that fetches, parses and stores the pages of the URLs.
+
+    scrape_and_store(pages=1, sections=('',)):
+        Crawls the listing pages through the pipeline and logs the usage.
+
+    stats():
+        Returns the statistics of every stage.
+
+    bottleneck():
+        Returns the name of the busiest stage.
+    """
+
+    def __init__(self, db_path='crawler.db', fetch_concurrency=None, parse_concurrency=None, queue_size=None,
+                 store_batch=8, **options):
+        """
+        Initializes the scraper and the limits of the stages.
+
+        Parameters:
+        -----------
+        db_path : str, optional
+            The path to the database file (default is 'crawler.db').
+        fetch_concurrency : int, optional
+            The number of pages downloaded at once (default is the Scraper's workers).
+        parse_concurrency : int, optional
+            The number of pages parsed at once (default is parse_workers, or 1 when
+            pages are parsed in threads).
+        queue_size : int, optional
+            The largest number of items waiting in front of a stage (default is
+            twice the largest number of workers of a stage).
+        store_batch : int, optional
+            The largest number of pages written in one transaction (default is 8).
+        **options
+            The other Scraper options: workers, parser, cache, rate_limiter, retry,
+            parse_workers, usage_logger, snapshots and compact_interval.
+        """
+        super().__init__(db_path, **options)
+        # The store stage writes from its own thread; it is the only user of the
+        # connection while the pipeline runs.
+        self.db.conn.close()
+        self.db = Database(db_path, check_same_thread=False)
+        self.fetch_concurrency = fetch_concurrency or self.workers
+        self.parse_concurrency = parse_concurrency or max(1, self.parse_workers)
+        self.queue_size = queue_size or 2 * max(self.fetch_concurrency, self.parse_concurrency)
+        self.store_batch = store_batch
+        self.errors = []
+        self._stages = {}
+
+    async def run(self, urls, limit=None):
+        """
+        Coroutine that fetches, parses and stores the pages of the URLs.
+
+        Parameters:
+        -----------
+        urls : iterable of str
+            The URLs of the listing pages. They are read as the fetch stage
+            accepts them, so a generator is consumed gradually.
+        limit : int, optional
+            The maximum number of entries parsed per page (default is None, every entry).
+
+        Returns:
+        --------
+        int
+            The number of entries stored.
+        """
+        loop = asyncio.get_running_loop()
+        fetch = _Stage('fetch', self.fetch_concurrency, self.queue_size)
+        parse = _Stage('parse', self.parse_concurrency, self.queue_size)
+        store = _Stage('store', 1, self.queue_size)
+        self._stages = {'fetch': fetch, 'parse': parse, 'store': store}
+        self.errors = []
+        stored = 0
+
+        fetchers = ThreadPoolExecutor(max_workers=fetch.workers, thread_name_prefix='fetch')
+        if self.parse_workers:
+            parsers = ProcessPoolExecutor(max_workers=min(parse.workers, self.parse_workers))
+        else:
+            parsers = ThreadPoolExecutor(max_workers=parse.workers, thread_name_prefix='parse')
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='store')
+
+        async def fetch_page(url):
+            page = await loop.run_in_executor(fetchers, self.fetch_raw, url)
+            return None if page is None else (url, page)
+
+        async def parse_page(item):
+            url, page = item
+            entries = await loop.run_in_executor(parsers, parse_raw, page, self.parser, limit)
+            # A page without entries still goes on to the store stage, which commits it.
+            return url, entries
+
+        def write(pages):
+            entries = [entry for _, page in pages for entry in page]
+            if entries:
+                self.store_entries(entries)
+            self._commit_pages(url for url, _ in pages)
+            return len(entries)
+
+        async def store_pages(pages):
+            nonlocal stored
+            stored += await loop.run_in_executor(writer, write, pages)
+
+        tasks = [asyncio.create_task(self._work(fetch, fetch_page, parse)) for _ in range(fetch.workers)]
+        tasks += [asyncio.create_task(self._work(parse, parse_page, store)) for _ in range(parse.workers)]
+        tasks.append(asyncio.create_task(self._store(store, store_pages)))
+        try:
+            for url in urls:
+                await fetch.put(url)
+            await self._finish(fetch, tasks[:fetch.workers])
+            await self._finish(parse, tasks[fetch.workers:-1])
+            await self._finish(store, tasks[-1:])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in (fetchers, parsers, writer):
+                executor.shutdown(wait=True, cancel_futures=True)
+        return stored
+
+    async def _finish(self, stage, tasks):
+        """
+        Stops the workers of a stage once its queue is drained, then stops the clock of the stage.
+        """
+        for _ in tasks:
+            await stage.put(_DONE)
+        await asyncio.gather(*tasks)
+        stage.finished = time.monotonic()
+
+    async def _work(self, stage, handle, downstream):
+        """
+        Runs one worker of a stage: handles items until _DONE and hands the results to the next stage.
+
+        Unchanged and failed pages (None) are not handed over.
+        """
+        while True:
+            item = await stage.queue.get()
+            if item is _DONE:
+                return
+            result = await self._handle(stage, handle, item)
+            if result:
+                start = time.monotonic()
+                await downstream.put(result)
+                stage.blocked += time.monotonic() - start
+
+    async def _store(self, stage, handle):
+        """
+        Runs the store worker: writes the queued pages in batches of up to store_batch pages.
+        """
+        done = False
+        while not done:
+            pages = [await stage.queue.get()]
+            while len(pages) < self.store_batch and not stage.queue.empty():
+                pages.append(stage.queue.get_nowait())
+            if pages[-1] is _DONE:
+                pages.pop()
+                done = True
+            if pages:
+                await self._handle(stage, handle, pages)
+
+    async def _handle(self, stage, handle, item):
+        """
+        Handles one item, recording the busy time of the stage and any failure.
+        """
+        start = time.monotonic()
+        try:
+            result = await handle(item)
+        except Exception as error:
+            stage.failed += 1
+            self.errors.append((stage.name, item, error))
+            REGISTRY.increment(f'pipeline_{stage.name}_failed')
+            return None
+        finally:
+            stage.busy += time.monotonic() - start
+        stage.processed += 1
+        return result
+
+    def scrape_and_store(self, pages=1, sections=('',)):
+        """
+        Crawls the listing pages through the pipeline and logs the usage.
+
+        Parameters:
+        -----------
+        pages : int, optional
+            The number of pages to crawl in each section (default is 1).
+        sections : iterable of str, optional
+            The sections to crawl (default is the front page).
+
+        Returns:
+        --------
+        int
+            The number of entries stored.
+        """
+        stored = asyncio.run(self.run(self.page_urls(pages, sections)))
+        self.log_usage('scrape')
+        return stored
+
+    def stats(self):
+        """
+        Returns the statistics of every stage, during or after a run.
+
+        Returns:
+        --------
+        dict
+            {stage: {'workers', 'processed', 'failed', 'busy', 'blocked', 'utilization',
+            'queue_depth', 'max_queue_depth', 'mean_queue_depth'}}. busy and blocked are
+            the seconds the workers spent working and waiting for the next stage's queue;
+            the queue depths are those of the stage's input queue.
+        """
+        return {name: stage.stats() for name, stage in self._stages.items()}
+
+    def bottleneck(self):
+        """
+        Returns the name of the busiest stage, the one that limits the crawl.
+
+        Returns:
+        --------
+        str or None
+            The stage with the highest utilization, or None before the first run.
+        """
+        stats = self.stats()
+        if not stats:
+            return None
+        return max(stats, key=lambda name: stats[name]['utilization'])
@@ -0,0 +1,152 @@
+"""
+This module wraps a run of the crawler in a profiler and writes the profile to disk.
+
+- 'cprofile' uses the standard library's deterministic cProfile and writes a
+  pstats file, readable with `python -m pstats` or snakeviz.
+- 'sampling' uses SamplingProfiler, which records the stack of the profiled
+  thread at a fixed interval from a background thread. Its overhead does not grow
+  with the number of function calls, so it suits long crawls. It writes one
+  "frame;frame;frame count" line per distinct stack (the collapsed format read by
+  flamegraph.pl and speedscope).
+
+Classes:
+--------
+SamplingProfiler:
+    A statistical profiler of one thread.
+
+Functions:
+----------
+profile(path, mode='cprofile', interval=0.005):
+    Context manager that profiles the enclosed block and writes the profile to path.
+
+Example:
+--------
+    from crawler.profiling import profile
+
+    with profile('crawl.prof'):
+        scraper.scrape_and_store()
+
+    python -m pstats crawl.prof
+"""
+
+import cProfile  # Import cProfile for deterministic profiling.
+import collections  # Import collections to count the sampled stacks.
+import sys  # Import sys to read the stacks of running threads.
+import threading  # Import threading to sample from a background thread.
+from contextlib import contextmanager  # Import contextmanager to build the profile block.
+
+PROFILERS = ('cprofile', 'sampling')
+
+
+class SamplingProfiler:
+    """
+    A statistical profiler of one thread.
+
+    Attributes:
+    -----------
+    samples : collections.Counter
+        The number of samples per stack, each stack a tuple of "function (file:line)"
+        frames from the outermost to the innermost.
+
+    Methods:
+    --------
+    __init__(interval=0.005, thread_id=None):
+        Initializes the profiler for a thread (default is the calling thread).
+
+    start() / stop():
+        Starts or stops sampling.
+
+    write(path):
+        Writes the samples in the collapsed stack format.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        """
+        Initializes the profiler for a thread (default is the calling thread).
+
+        Parameters:
+        -----------
+        interval : float, optional
+            The number of seconds between two samples (default is 0.005).
+        thread_id : int, optional
+            The ident of the thread to profile.
+        """
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        """
+        Records the stack of the profiled thread until stopped.
+        """
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def start(self):
+        """
+        Starts sampling in a background thread.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path):
+        """
+        Writes the samples in the collapsed stack format, most frequent first.
+        """
+        with open(path, 'w') as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{';'.join(stack)} {count}\n")
+
+
+@contextmanager
+def profile(path, mode='cprofile', interval=0.005):
+    """
+    Context manager that profiles the enclosed block and writes the profile to path.
+
+    Parameters:
+    -----------
+    path : str
+        The file to write the profile to.
+    mode : str, optional
+        'cprofile' for a pstats file or 'sampling' for collapsed stacks (default is 'cprofile').
+    interval : float, optional
+        The sampling interval in seconds, for the 'sampling' mode (default is 0.005).
+
+    Raises:
+    -------
+    ValueError
+        If the mode is unknown.
+    """
+    if mode not in PROFILERS:
+        raise ValueError(f"Unknown profiler {mode!r}; expected one of {PROFILERS}")
+    profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler(interval)
+    if mode == 'cprofile':
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        yield profiler
+    finally:
+        if mode == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            profiler.write(path)
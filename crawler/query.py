@@ -0,0 +1,463 @@
+"""
+This module defines a small query engine over entries: composable predicates,
+sort keys and paging, compiled to one SQL query when the entries come from a
+Database and evaluated in Python otherwise, with a result cache.
+
+Predicates are built from Words, Points, Comments (inclusive ranges) and
+TitleMatch (every word appears in the title), and combined with & (and), | (or)
+and ~ (not). A Query holds a predicate, its sort keys and a page; it is immutable,
+and where, order_by and page return new queries, so a base query can be shared.
+
+Results read from a Database are cached under the normalized query, so queries
+that only differ in how they were written share an entry. Each cached result is
+stamped with the database's write generation (Database.generation), which
+changes with every write through its connection and every commit by another
+connection, so a repeated query costs a dictionary lookup until the next crawl.
+
+Classes:
+--------
+Predicate:
+    The base class of the predicates, with the & | ~ operators.
+Words, Points, Comments:
+    Inclusive ranges of the title word count, points and comments.
+TitleMatch:
+    Entries whose title contains every word of a text.
+Query:
+    A predicate, sort keys and a page, run against any source of entries.
+QueryCache:
+    A per-database LRU cache of query results, invalidated by the write generation.
+
+Example:
+--------
+    from crawler.query import Comments, Points, Query, TitleMatch, Words
+
+    rising = Query(Words(min=6) & Points(min=100) & ~TitleMatch('hiring')).order_by('comments')
+    rising.page(limit=20).run(db)          # SQL, cached until the next write
+    rising.run(entries)                    # Python, over any iterable of entries
+    Query(TitleMatch('rust') | TitleMatch('zig')).order_by('points').order_by('comments').run(db)
+"""
+
+import re  # Import the regular expressions library to split titles into words.
+import threading  # Import threading to share the cache between threads.
+import unicodedata  # Import unicodedata to match titles without accents.
+import weakref  # Import weakref so the cache does not keep databases alive.
+from collections import OrderedDict  # Import OrderedDict for the LRU order of the cache.
+from .entry import Entry  # Import the Entry record the queries return.
+from .frame import EntryFrame  # Import the EntryFrame class to query its rows.
+from .metrics import REGISTRY  # Import the metrics registry to count cache hits and misses.
+from .storage import Database  # Import the Database class to compile queries to SQL.
+
+# The fields a query can filter and sort on: their SQL column and their Entry value.
+FIELDS = {
+    'rank': ('entries.rank', lambda entry: entry.rank),
+    'title': ('entries.title', lambda entry: entry.title),
+    'points': ('entries.points', lambda entry: entry.points),
+    'comments': ('entries.comments', lambda entry: entry.comments),
+    'words': ('entries.title_word_count', lambda entry: entry.word_count),
+}
+_WORD_RE = re.compile(r'\w+')
+
+
+def _fold(text):
+    """
+    Returns a text lowercased and without accents, as the title index compares words.
+    """
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class Predicate:
+    """
+    The base class of the predicates, with the & (and), | (or) and ~ (not) operators.
+
+    Methods:
+    --------
+    key():
+        Returns a hashable normal form of the predicate.
+
+    sql(db):
+        Returns the SQL condition of the predicate and its parameters.
+
+    matches(entry):
+        Returns whether an Entry satisfies the predicate.
+    """
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __eq__(self, other):
+        return isinstance(other, Predicate) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f'{type(self).__name__}{self.key()[1:]}'
+
+
+class _Range(Predicate):
+    """
+    An inclusive range of one field; a missing bound is not checked.
+    """
+    FIELD = None
+
+    def __init__(self, min=None, max=None):
+        self.min = min
+        self.max = max
+
+    def key(self):
+        return ('range', self.FIELD, self.min, self.max)
+
+    def sql(self, db):
+        column = FIELDS[self.FIELD][0]
+        conditions, params = [], []
+        if self.min is not None:
+            conditions.append(f'{column} >= ?')
+            params.append(self.min)
+        if self.max is not None:
+            conditions.append(f'{column} <= ?')
+            params.append(self.max)
+        return ' AND '.join(conditions) or '1', params
+
+    def matches(self, entry):
+        value = FIELDS[self.FIELD][1](entry)
+        return (self.min is None or value >= self.min) and (self.max is None or value <= self.max)
+
+
+class Words(_Range):
+    """
+    Entries whose title has between min and max words, inclusive.
+    """
+    FIELD = 'words'
+
+
+class Points(_Range):
+    """
+    Entries with between min and max points, inclusive.
+    """
+    FIELD = 'points'
+
+
+class Comments(_Range):
+    """
+    Entries with between min and max comments, inclusive.
+    """
+    FIELD = 'comments'
+
+
+class TitleMatch(Predicate):
+    """
+    Entries whose title contains every word of a text, ignoring case and accents.
+
+    With a Database, the words are looked up in the FTS5 index of titles; without
+    the index they are matched with LIKE, which also accepts words that only
+    contain the searched word.
+    """
+
+    def __init__(self, text):
+        self.words = tuple(sorted(set(_WORD_RE.findall(_fold(text)))))
+        if not self.words:
+            raise ValueError("The title match has no words")
+
+    def key(self):
+        return ('title',) + self.words
+
+    def sql(self, db):
+        if db.has_title_index():
+            phrases = ' '.join(f'"{word}"' for word in self.words)
+            return 'entries.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)', [phrases]
+        conditions = ' AND '.join("entries.title LIKE ? ESCAPE '\\'" for _ in self.words)
+        return conditions, ['%' + word.replace('_', '\\_') + '%' for word in self.words]
+
+    def matches(self, entry):
+        title = set(_WORD_RE.findall(_fold(entry.title or '')))
+        return all(word in title for word in self.words)
+
+
+class And(Predicate):
+    """
+    Entries that satisfy every part.
+    """
+    OPERATOR = 'AND'
+
+    def __init__(self, *parts):
+        flat = []
+        for part in parts:
+            flat.extend(part.parts if type(part) is type(self) else (part,))
+        # Sorted by their normal form, so the order the parts were written in does not matter.
+        self.parts = tuple(sorted(set(flat), key=lambda part: repr(part.key())))
+
+    def key(self):
+        return (self.OPERATOR.lower(),) + tuple(part.key() for part in self.parts)
+
+    def sql(self, db):
+        conditions, params = [], []
+        for part in self.parts:
+            condition, part_params = part.sql(db)
+            conditions.append(f'({condition})')
+            params.extend(part_params)
+        return f' {self.OPERATOR} '.join(conditions), params
+
+    def matches(self, entry):
+        return all(part.matches(entry) for part in self.parts)
+
+
+class Or(And):
+    """
+    Entries that satisfy at least one part.
+    """
+    OPERATOR = 'OR'
+
+    def matches(self, entry):
+        return any(part.matches(entry) for part in self.parts)
+
+
+class Not(Predicate):
+    """
+    Entries that do not satisfy a predicate.
+    """
+
+    def __init__(self, part):
+        self.part = part
+
+    def key(self):
+        return ('not', self.part.key())
+
+    def sql(self, db):
+        condition, params = self.part.sql(db)
+        return f'NOT ({condition})', params
+
+    def matches(self, entry):
+        return not self.part.matches(entry)
+
+
+class Query:
+    """
+    A predicate, sort keys and a page, run against any source of entries.
+
+    Methods:
+    --------
+    __init__(where=None, order=(), limit=None, offset=0):
+        Initializes the query.
+
+    where(predicate):
+        Returns a copy of the query that also requires a predicate.
+
+    order_by(field, descending=True):
+        Returns a copy of the query with one more sort key.
+
+    page(limit=None, offset=0):
+        Returns a copy of the query that returns one page of entries.
+
+    key():
+        Returns a hashable normal form of the query.
+
+    run(source, cache=None):
+        Runs the query and returns the matching entries.
+    """
+
+    def __init__(self, where=None, order=(), limit=None, offset=0):
+        """
+        Initializes the query.
+
+        Parameters:
+        -----------
+        where : Predicate, optional
+            The condition the entries must satisfy (default is None, every entry).
+        order : iterable of tuple, optional
+            The (field, descending) sort keys, most significant first (default is
+            none: the order the entries were stored or given in).
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+
+        Raises:
+        -------
+        ValueError
+            If a sort field is not one of FIELDS.
+        """
+        self.predicate = where
+        self.order = tuple((field, bool(descending)) for field, descending in order)
+        for field, _ in self.order:
+            if field not in FIELDS:
+                raise ValueError(f"Cannot order entries by {field!r}")
+        self.limit = limit
+        self.offset = offset
+
+    def where(self, predicate):
+        """
+        Returns a copy of the query that also requires a predicate.
+        """
+        where = predicate if self.predicate is None else self.predicate & predicate
+        return Query(where, self.order, self.limit, self.offset)
+
+    def order_by(self, field, descending=True):
+        """
+        Returns a copy of the query with one more sort key, less significant than the existing ones.
+        """
+        return Query(self.predicate, self.order + ((field, descending),), self.limit, self.offset)
+
+    def page(self, limit=None, offset=0):
+        """
+        Returns a copy of the query that returns one page of entries.
+        """
+        return Query(self.predicate, self.order, limit, offset)
+
+    def key(self):
+        """
+        Returns a hashable normal form of the query.
+        """
+        return (None if self.predicate is None else self.predicate.key(), self.order, self.limit, self.offset)
+
+    def __eq__(self, other):
+        return isinstance(other, Query) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f'Query{self.key()}'
+
+    def run(self, source, cache=None):
+        """
+        Runs the query and returns the matching entries.
+
+        Parameters:
+        -----------
+        source : Database, EntryFrame or iterable of Entry or tuple
+            Where the entries come from. A Database runs the query as one SQL
+            query; anything else is filtered and sorted in Python, with ties kept
+            in the order the entries are given in.
+        cache : QueryCache, optional
+            The cache for Database results (default is the module's CACHE; pass
+            False to always run the query).
+
+        Returns:
+        --------
+        list of Entry
+            The matching entries, sorted and paged.
+        """
+        if isinstance(source, Database):
+            cache = CACHE if cache is None else cache
+            if not cache:
+                return self._run_sql(source)
+            return cache.fetch(source, self, self._run_sql)
+        if isinstance(source, EntryFrame):
+            source = source.rows()
+        return self._run_python(source)
+
+    def _run_sql(self, db):
+        """
+        Compiles the query to SQL and runs it on a Database.
+        """
+        where, params = self.predicate.sql(db) if self.predicate is not None else ('', [])
+        order = [f"{FIELDS[field][0]}{' DESC' if descending else ''}" for field, descending in self.order]
+        return db.select_entries(where, params, order, self.limit, self.offset)
+
+    def _run_python(self, entries):
+        """
+        Filters, sorts and pages entries in Python.
+        """
+        entries = (entry if type(entry) is Entry else Entry.from_tuple(entry) for entry in entries)
+        if self.predicate is not None:
+            entries = filter(self.predicate.matches, entries)
+        entries = list(entries)
+        # Stable sorts from the least to the most significant key give the combined order.
+        for field, descending in reversed(self.order):
+            entries.sort(key=FIELDS[field][1], reverse=descending)
+        return entries[self.offset:] if self.limit is None else entries[self.offset:self.offset + self.limit]
+
+
+class QueryCache:
+    """
+    A per-database LRU cache of query results, invalidated by the write generation.
+
+    Attributes:
+    -----------
+    hits, misses : int
+        The number of lookups answered from the cache and run on the database.
+
+    Methods:
+    --------
+    __init__(maxsize=256):
+        Initializes an empty cache.
+
+    fetch(db, query, run):
+        Returns the cached result of a query, or runs it and caches the result.
+
+    clear():
+        Empties the cache.
+    """
+
+    def __init__(self, maxsize=256):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+        -----------
+        maxsize : int, optional
+            The number of results kept per database (default is 256).
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return True
+
+    def fetch(self, db, query, run):
+        """
+        Returns the cached result of a query, or runs it and caches the result.
+
+        Parameters:
+        -----------
+        db : Database
+            The database the query runs on.
+        query : Query
+            The query; its normal form is the cache key.
+        run : callable
+            Called with the database to compute the result on a miss.
+
+        Returns:
+        --------
+        list of Entry
+            A new list of the result, so callers may modify it.
+        """
+        key = query.key()
+        generation = db.generation
+        with self._lock:
+            results = self._results.setdefault(db, OrderedDict())
+            cached = results.get(key)
+            if cached is not None and cached[0] == generation:
+                results.move_to_end(key)
+                self.hits += 1
+                REGISTRY.increment('query_cache_hits')
+                return list(cached[1])
+            self.misses += 1
+        REGISTRY.increment('query_cache_misses')
+        result = run(db)
+        with self._lock:
+            results[key] = (generation, tuple(result))
+            results.move_to_end(key)
+            while len(results) > self.maxsize:
+                results.popitem(last=False)
+        return list(result)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._results.clear()
+
+
+CACHE = QueryCache()
@@ -0,0 +1,333 @@
+"""
+This module defines the rate limiting and retry policies used by the Scraper to
+stay under a site's limits without giving up throughput.
+
+- TokenBucket caps the request rate of a host, allowing short bursts.
+- HostLimiter combines a token bucket with an AIMD concurrency limit: every
+  healthy response raises the number of concurrent requests a little (additive
+  increase), while a 429, a 5xx, a connection error or a latency spike cuts it
+  (multiplicative decrease).
+- RateLimiter keeps one HostLimiter per host.
+- RetryPolicy decides which responses are retried and how long to wait, using
+  the Retry-After header when the server sends one and jittered exponential
+  backoff otherwise.
+
+Classes:
+--------
+TokenBucket:
+    A thread-safe token bucket.
+HostLimiter:
+    The rate and AIMD concurrency limiter of a single host.
+RateLimiter:
+    A registry of per-host limiters.
+RetryPolicy:
+    Bounded retries with jittered exponential backoff.
+
+Usage:
+------
+Pass a RateLimiter and a RetryPolicy to the Scraper.
+
+Example:
+--------
+    from crawler.ratelimit import RateLimiter, RetryPolicy
+    from crawler.scraper import Scraper
+
+    scraper = Scraper(
+        workers=8,
+        rate_limiter=RateLimiter(rate=4, burst=8, max_concurrency=8),
+        retry=RetryPolicy(max_retries=5),
+    )
+"""
+
+import random  # Import random to jitter the backoff delays.
+import threading  # Import threading to share the limiters between crawler threads.
+import time  # Import time to measure latency and to wait.
+from contextlib import contextmanager  # Import contextmanager to build the request slot.
+from datetime import datetime, timezone  # Import datetime to read HTTP-date Retry-After values.
+from email.utils import parsedate_to_datetime  # Import parsedate_to_datetime to parse HTTP dates.
+from urllib.parse import urlsplit  # Import urlsplit to find the host of a URL.
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+
+    Tokens are added at a constant rate up to the bucket capacity, and each
+    request takes one token, waiting for it when the bucket is empty.
+
+    Methods:
+    --------
+    __init__(rate, capacity=1):
+        Initializes a full bucket.
+
+    acquire():
+        Takes one token, waiting until one is available.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initializes a full bucket.
+
+        Parameters:
+        -----------
+        rate : float
+            The number of tokens added per second.
+        capacity : float, optional
+            The maximum number of tokens, i.e. the largest burst (default is 1).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, waiting until one is available.
+
+        Returns:
+        --------
+        float
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class HostLimiter:
+    """
+    The rate and AIMD concurrency limiter of a single host.
+
+    Attributes:
+    -----------
+    limit : float
+        The current concurrency limit; int(limit) requests may run at once.
+
+    Methods:
+    --------
+    __init__(rate=None, burst=1, initial_concurrency=1, max_concurrency=8, ...):
+        Initializes the limiter.
+
+    slot():
+        Context manager that holds a request slot.
+
+    record(status_code, latency):
+        Adjusts the concurrency limit after a response.
+    """
+
+    def __init__(self, rate=None, burst=1, initial_concurrency=1, max_concurrency=8,
+                 increase=1.0, decrease=0.5, spike_factor=3.0, cooldown=1.0):
+        """
+        Initializes the limiter.
+
+        Parameters:
+        -----------
+        rate : float, optional
+            The maximum number of requests per second (default is None, no rate limit).
+        burst : float, optional
+            The largest burst of requests allowed by the token bucket (default is 1).
+        initial_concurrency : int, optional
+            The starting concurrency limit (default is 1).
+        max_concurrency : int, optional
+            The highest concurrency limit (default is 8).
+        increase : float, optional
+            The limit gained per window of healthy responses (default is 1.0).
+        decrease : float, optional
+            The factor the limit is multiplied by on a backoff signal (default is 0.5).
+        spike_factor : float, optional
+            A response slower than this multiple of the average healthy latency is
+            treated as a backoff signal (default is 3.0).
+        cooldown : float, optional
+            The minimum number of seconds between two decreases, so one burst of
+            failures only cuts the limit once (default is 1.0).
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.baseline = None  # Exponentially weighted average of healthy latencies.
+        self.last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Context manager that holds a request slot.
+
+        Waits until fewer than int(limit) requests are in flight, then for a
+        token from the bucket.
+        """
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, status_code, latency):
+        """
+        Adjusts the concurrency limit after a response.
+
+        Parameters:
+        -----------
+        status_code : int or None
+            The HTTP status code, or None when the request failed without a response.
+        latency : float
+            The response time in seconds.
+        """
+        with self._condition:
+            throttled = status_code is None or status_code == 429 or status_code >= 500
+            spike = self.baseline is not None and latency > self.spike_factor * self.baseline
+            if spike:
+                # Spikes move the baseline too, more slowly, so that a lasting slowdown
+                # becomes the new normal instead of a backoff signal forever.
+                self.baseline = 0.95 * self.baseline + 0.05 * latency
+            if throttled or spike:
+                now = time.monotonic()
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(1.0, self.limit * self.decrease)
+                    self.last_decrease = now
+                return
+            self.baseline = latency if self.baseline is None else 0.8 * self.baseline + 0.2 * latency
+            # Additive increase: about `increase` more slots per window of `limit` responses.
+            self.limit = min(float(self.max_concurrency), self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """
+    A registry of per-host limiters.
+
+    Methods:
+    --------
+    __init__(**options):
+        Initializes the registry; the options are passed to every HostLimiter.
+
+    for_url(url):
+        Returns the limiter of the host of a URL.
+    """
+
+    def __init__(self, **options):
+        """
+        Initializes the registry; the options are passed to every HostLimiter.
+        """
+        self.options = options
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        """
+        Returns the limiter of the host of a URL, creating it on first use.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostLimiter(**self.options)
+            return self.hosts[host]
+
+
+class RetryPolicy:
+    """
+    Bounded retries with jittered exponential backoff.
+
+    Methods:
+    --------
+    __init__(max_retries=3, backoff=0.5, max_delay=60.0, statuses=(429, 500, 502, 503, 504)):
+        Initializes the policy.
+
+    should_retry(status_code):
+        Returns whether a response with this status is retried.
+
+    delay(attempt, response=None):
+        Returns the number of seconds to wait before the next attempt.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_delay=60.0, statuses=(429, 500, 502, 503, 504)):
+        """
+        Initializes the policy.
+
+        Parameters:
+        -----------
+        max_retries : int, optional
+            The number of retries after the first attempt (default is 3).
+        backoff : float, optional
+            The base delay in seconds, doubled on every attempt (default is 0.5).
+        max_delay : float, optional
+            The longest delay in seconds, also applied to Retry-After (default is 60.0).
+        statuses : tuple of int, optional
+            The HTTP statuses that are retried (default is 429 and the usual 5xx).
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+        self.random = random.Random()
+
+    def should_retry(self, status_code):
+        """
+        Returns whether a response with this status is retried.
+        """
+        return status_code in self.statuses
+
+    def delay(self, attempt, response=None):
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        A Retry-After header, in seconds or as an HTTP date, takes precedence.
+        Otherwise the delay is drawn uniformly between 0 and backoff * 2 ** attempt
+        ("full jitter"), so concurrent clients do not retry in lockstep.
+
+        Parameters:
+        -----------
+        attempt : int
+            The number of the attempt that just failed, starting at 0.
+        response : requests.Response, optional
+            The failed response, if there was one.
+
+        Returns:
+        --------
+        float
+            The delay in seconds.
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            seconds = self._parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(self.max_delay, seconds)
+        return self.random.uniform(0, min(self.max_delay, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _parse_retry_after(value):
+        """
+        Returns the seconds requested by a Retry-After header, or None if it cannot be read.
+        """
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
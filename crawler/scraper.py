@@ -1,9 +1,29 @@
 """
 This module defines the Scraper class for scraping data from Hacker News
-and storing it in a database. It utilizes the BeautifulSoup library for
-parsing HTML content, the requests library for making HTTP requests, 
-and a custom Database class for database operations. Regular expressions 
-are used for string matching to extract specific parts of the HTML content.
+and storing it in a database. It utilizes the listing parsers from the
+parser module (a fast single-pass parser, with BeautifulSoup as a fallback)
+for parsing HTML content, the requests library for making HTTP requests, 
+and a custom Database class for database operations.
+
+Listing pages are fetched over a shared keep-alive requests.Session, and
+several pages can be fetched concurrently with a thread pool. An optional
+ResponseCache in front of the HTTP requests skips unchanged pages. Requests
+are retried with backoff on throttling and server errors, and an optional
+per-host RateLimiter keeps the crawl under the site's limits. A page's cache
+validators are committed only once what was parsed from it has been stored, so a
+failed write does not leave the page marked as unchanged.
+
+For large backfills, fetching and parsing run as separate stages: pages are
+downloaded as raw bytes by a thread pool and parsed by a process pool, so
+parsing uses every core while the network stays busy.
+
+Comment threads are crawled from the item pages: scrape_comments fetches the
+pages of several stories concurrently, parses their nested comments and replaces
+each story's thread in the adjacency table of the database.
+
+Beyond the listing pages, crawl follows item, user and site links up to a
+configurable depth through a Frontier, handing every fetched page to the
+handler registered for its URL pattern.
 
 Classes:
 --------
@@ -24,12 +44,31 @@ Example:
     entries = scraper.fetch_entries()
     scraper.store_entries(entries)
     scraper.log_usage('example_filter')
+
+    # Crawl the first three pages of the front page and /newest concurrently.
+    entries = scraper.fetch_pages(pages=3, sections=('', 'newest'))
+
+    # Download archived pages with threads and parse them on every core.
+    pages = scraper.fetch_and_parse([Scraper.BASE_URL + f'?p={page}' for page in range(1, 101)])
+
+    # Follow links from the front page two levels deep.
+    scraper.crawl(max_depth=2, max_pages=200)
+
+    # Store the comment threads of the ten stories with the most points.
+    scraper.scrape_comments(top=10)
+    thread = scraper.db.fetch_thread(item_id)
 """
 
-import re  # Import the regular expressions library for string matching.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed  # Import the pools used for fetching and parsing.
+import os  # Import os to count the available cores.
+import time  # Import time to measure latency and to wait between retries.
 from datetime import datetime  # Import datetime for handling date and time.
 import requests  # Import the requests library to handle HTTP requests.
-from bs4 import BeautifulSoup  # Import BeautifulSoup from bs4 to parse HTML content.
+from requests.adapters import HTTPAdapter  # Import HTTPAdapter to size the session's connection pool.
+from .frontier import DEFAULT_HANDLERS, SEED_PRIORITY, Frontier, extract_links  # Import the crawl frontier and its page handlers.
+from .metrics import REGISTRY, timed  # Import the metrics registry to instrument the scraping stages.
+from .ratelimit import RetryPolicy  # Import the default retry policy.
+from .parser import PARSERS, is_story_page, parse_comments, parse_raw  # Import the listing and comment parsers from the parser module.
 from .storage import Database  # Import the custom Database class from the storage module.
 
 
@@ -42,13 +81,41 @@ class Scraper:
     BASE_URL : str
         The base URL of the Hacker News website.
     
+    ITEM_URL : str
+        The URL of an item page, without the item id.
+    
+    SECTIONS : tuple of str
+        The listing sections that can be crawled ('' is the front page).
+    
     Methods:
     --------
-    __init__(db_path='crawler.db'):
-        Initializes the Scraper with a database connection.
+    __init__(db_path='crawler.db', workers=4, parser='fast', cache=None, rate_limiter=None, retry=None,
+             parse_workers=None, usage_logger=None, snapshots=True, compact_interval=3600):
+        Initializes the Scraper with a database connection and an HTTP session.
+    
+    fetch_html(url):
+        Downloads a page, through the response cache when one is configured.
+    
+    fetch_raw(url):
+        Downloads a page as raw bytes, through the response cache when one is configured.
+    
+    fetch_entries(limit=30, url=None):
+        Fetches and parses entries from a Hacker News listing page.
+    
+    parse_entries(html, limit=30):
+        Parses entries from the HTML of a listing page.
     
-    fetch_entries(limit=30):
-        Fetches and parses entries from Hacker News.
+    page_urls(pages=1, sections=('',)):
+        Builds the listing page URLs to crawl.
+    
+    fetch_pages(pages=1, sections=('',), workers=None):
+        Fetches several listing pages concurrently and merges them in rank order.
+    
+    parse_pages(pages, limit=None):
+        Parses raw listing pages in a process pool.
+    
+    fetch_and_parse(urls, limit=None):
+        Downloads pages with the thread pool while the process pool parses them.
     
     store_entries(entries):
         Stores the fetched entries in the database.
@@ -56,79 +123,370 @@ class Scraper:
     log_usage(filter_type):
         Logs the usage information in the database.
     
-    scrape_and_store():
+    scrape_and_store(pages=1, sections=('',)):
         Orchestrates the scraping, storing, and logging operations.
+    
+    crawl(seeds=None, max_depth=1, max_pages=100, handlers=None, frontier=None):
+        Crawls pages reachable from the seeds through a URL frontier.
+    
+    fetch_comments(item_id):
+        Fetches and parses the comments of a story.
+    
+    scrape_comments(item_ids=None, top=30, workers=None):
+        Fetches the comment threads of several stories concurrently and stores them.
     """
     BASE_URL = "https://news.ycombinator.com/"
+    ITEM_URL = BASE_URL + "item?id="
+    SECTIONS = ('', 'news', 'newest', 'ask', 'show')
     
-    def __init__(self, db_path='crawler.db'):
+    def __init__(self, db_path='crawler.db', workers=4, parser='fast', cache=None, rate_limiter=None, retry=None,
+                 parse_workers=None, usage_logger=None, snapshots=True, compact_interval=3600):
         """
-        Initializes the Scraper with a database connection.
+        Initializes the Scraper with a database connection and an HTTP session.
         
         Parameters:
         -----------
         db_path : str, optional
             The path to the database file (default is 'crawler.db').
+        workers : int, optional
+            The number of pages fetched concurrently by fetch_pages (default is 4).
+            The session keeps up to this many connections alive per host.
+        parser : str, optional
+            The listing parser to use, a key of crawler.parser.PARSERS:
+            'fast' (default) or 'bs4'.
+        cache : ResponseCache, optional
+            The response cache used to skip unchanged pages (default is None, no cache).
+        rate_limiter : RateLimiter, optional
+            The per-host rate and concurrency limiter (default is None, no limit).
+        retry : RetryPolicy, optional
+            The retry policy for throttled and failed requests
+            (default is RetryPolicy(), three retries with jittered backoff).
+        parse_workers : int, optional
+            The number of processes used by parse_pages and fetch_and_parse
+            (default is None, one per core). 0 parses in the calling process.
+        usage_logger : BufferedUsageLogger, optional
+            The background logger that batches usage events (default is None,
+            each event is committed by log_usage).
+        snapshots : bool, optional
+            Whether store_entries also records a snapshot of each entry's rank,
+            points and comments, for Database.fetch_top_movers (default is True).
+        compact_interval : float, optional
+            The minimum number of seconds between two runs of
+            Database.compact_snapshots by store_entries, which keeps the snapshots
+            table bounded (default is 3600; None never compacts).
+        
+        Raises:
+        -------
+        ValueError
+            If the parser is unknown.
+        """
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser: {parser!r}")
+        self.parser = parser
+        self.db = Database(db_path)
+        self.workers = workers
+        # Share one keep-alive session so repeated requests reuse TCP/TLS connections.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self.usage_logger = usage_logger
+        self.snapshots = snapshots
+        self.compact_interval = compact_interval
+        self._compacted_at = None  # Monotonic time of the last compaction.
+
+    def _request(self, url, headers=None):
         """
-        self.db = Database(db_path)    
+        Sends a GET request over the shared session, with rate limiting and retries.
         
-    def fetch_entries(self, limit=30):
+        Throttled (429) and failed (5xx) responses are retried up to the retry
+        policy's limit, waiting as the server asks with Retry-After or with jittered
+        exponential backoff. Every response is reported to the host's limiter so it
+        can adapt its concurrency. The last response is returned even if it failed,
+        and the last connection error is raised.
         """
-        Fetches and parses entries from Hacker News.
+        limiter = self.rate_limiter.for_url(url) if self.rate_limiter is not None else None
+        for attempt in range(self.retry.max_retries + 1):
+            last_attempt = attempt == self.retry.max_retries
+            response = None
+            start = time.monotonic()
+            try:
+                if limiter is None:
+                    response = self.session.get(url, headers=headers, timeout=30)
+                else:
+                    with limiter.slot():
+                        start = time.monotonic()
+                        response = self.session.get(url, headers=headers, timeout=30)
+            except (requests.ConnectionError, requests.Timeout):
+                if limiter is not None:
+                    limiter.record(None, time.monotonic() - start)
+                if last_attempt:
+                    raise
+            else:
+                REGISTRY.increment('http_responses')
+                if limiter is not None:
+                    limiter.record(response.status_code, time.monotonic() - start)
+                if last_attempt or not self.retry.should_retry(response.status_code):
+                    return response
+            REGISTRY.increment('http_retries')
+            time.sleep(self.retry.delay(attempt, response))
+
+    @timed('scraper.fetch_html')
+    def fetch_html(self, url):
+        """
+        Downloads a page, through the response cache when one is configured.
+        
+        Parameters:
+        -----------
+        url : str
+            The URL of the page.
+        
+        Returns:
+        --------
+        str or None
+            The HTML content, or None when the cache reports the page unchanged
+            (or an error response). Pages fetched through the cache are only
+            marked as seen by _commit_pages, once they have been stored.
+        """
+        if self.cache is None:
+            return self._request(url).text
+        return self.cache.fetch(url, self._request)
+
+    @timed('scraper.fetch_raw')
+    def fetch_raw(self, url):
+        """
+        Downloads a page as raw bytes, through the response cache when one is configured.
+        
+        Parameters:
+        -----------
+        url : str
+            The URL of the page.
+        
+        Returns:
+        --------
+        bytes or None
+            The body of the page, or None when the cache reports the page unchanged.
+        """
+        if self.cache is None:
+            return self._request(url).content
+        html = self.cache.fetch(url, self._request)
+        return None if html is None else html.encode('utf-8')
+        
+    @timed('scraper.fetch_entries')
+    def fetch_entries(self, limit=30, url=None):
+        """
+        Fetches and parses entries from a Hacker News listing page.
         
         Parameters:
         -----------
         limit : int, optional
             The maximum number of entries to fetch (default is 30).
+            None returns every entry on the page.
+        url : str, optional
+            The listing page to fetch (default is BASE_URL).
+        
+        Returns:
+        --------
+        list of Entry
+            The entries, each with its rank, title, points, comments, and item id.
+            The list is empty when the response cache reports the page unchanged,
+            in which case the page is not parsed.
+        """
+        html = self.fetch_html(url or self.BASE_URL)
+        if html is None:
+            return []
+        return self.parse_entries(html, limit)
+
+    @timed('scraper.parse_entries')
+    def parse_entries(self, html, limit=30):
+        """
+        Parses entries from the HTML of a listing page with the selected parser.
+        
+        Parameters:
+        -----------
+        html : str
+            The HTML content of a Hacker News listing page.
+        limit : int, optional
+            The maximum number of entries to parse (default is 30).
+            None parses every entry on the page.
         
         Returns:
         --------
-        list of tuple
-            A list of tuples, each containing the number, title, points, and comments of a news item.
-        """
-        response = requests.get(self.BASE_URL, timeout=30)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        entries = []
-        items = soup.select('.athing')
-        subtexts = soup.select('.subtext')
-        comments = 0
-        
-        for i in range(min(limit, len(items))):
-            item = items[i]
-            subtext = subtexts[i]
-            
-            number = item.select_one('.rank').text.strip('.')
-            title = item.select_one('.titleline').text
-            clean_title = re.sub(r'\s*\([^)]*\)', '', title)
-            points = int(re.search(r'(\d+)\spoints', subtext.text).group(1)) if subtext.select_one('.score') else 0
-
-            comments_link = subtext.find_all('a', string=re.compile(r'\d+\scomments'))
-
-            if comments_link:
-                comments_text = comments_link[0].text
-                comments_match = re.search(r'(\d+)\scomments', comments_text.replace('\xa0', ' '))
-                if comments_match:
-                    comments = int(comments_match.group(1))
-                    
-            entries.append((number, clean_title, points, comments))
-        
-        return entries
+        list of Entry
+            The entries, each with its rank, title, points, comments, and item id.
+        """
+        return PARSERS[self.parser](html, limit)
 
+    def page_urls(self, pages=1, sections=('',)):
+        """
+        Builds the listing page URLs to crawl.
+        
+        Parameters:
+        -----------
+        pages : int, optional
+            The number of pages to crawl in each section (default is 1).
+        sections : iterable of str, optional
+            The sections to crawl, e.g. '', 'newest', 'ask' or 'show' (default is the front page).
+        
+        Returns:
+        --------
+        list of str
+            The page URLs, grouped by section and ordered by page number.
+        
+        Raises:
+        -------
+        ValueError
+            If a section is not one of SECTIONS.
+        """
+        urls = []
+        for section in sections:
+            if section not in self.SECTIONS:
+                raise ValueError(f"Unknown section: {section!r}")
+            for page in range(1, pages + 1):
+                url = self.BASE_URL + section
+                if page > 1:
+                    url += f'?p={page}'
+                urls.append(url)
+        return urls
+
+    @timed('scraper.fetch_pages')
+    def fetch_pages(self, pages=1, sections=('',), workers=None):
+        """
+        Fetches several listing pages concurrently and merges them in rank order.
+        
+        Pages are fetched by a thread pool over the shared session. The merged
+        list keeps the sections in the given order, and the entries of each
+        section are ordered by their rank.
+        
+        Parameters:
+        -----------
+        pages : int, optional
+            The number of pages to crawl in each section (default is 1).
+        sections : iterable of str, optional
+            The sections to crawl (default is the front page).
+        workers : int, optional
+            The number of concurrent fetches (default is the Scraper's workers).
+        
+        Returns:
+        --------
+        list of Entry
+            The entries, each with its rank, title, points, comments, and item id.
+        """
+        sections = list(sections)
+        urls = self.page_urls(pages, sections)
+        with ThreadPoolExecutor(max_workers=workers or self.workers) as executor:
+            results = list(executor.map(lambda url: self.fetch_entries(limit=None, url=url), urls))
+
+        merged = []
+        for index, page_entries in enumerate(results):
+            # Pages are grouped by section, so the page index tells which section it belongs to.
+            section_index = index // pages
+            merged.extend((section_index, entry) for entry in page_entries)
+        merged.sort(key=lambda item: (item[0], item[1].rank))
+        return [entry for _, entry in merged]
+
+    def parse_pages(self, pages, limit=None):
+        """
+        Parses raw listing pages in a process pool.
+        
+        Parameters:
+        -----------
+        pages : iterable of bytes
+            The raw bodies of listing pages; None stands for a page that was skipped.
+        limit : int, optional
+            The maximum number of entries parsed per page (default is None, every entry).
+        
+        Returns:
+        --------
+        list of list of Entry
+            The entries of every page, in the order of the pages.
+        """
+        pages = list(pages)
+        if self.parse_workers == 0:
+            return [parse_raw(page, self.parser, limit) for page in pages]
+        # Send the pages in chunks so each round trip to a worker carries enough work.
+        chunksize = max(1, len(pages) // (self.parse_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            return list(executor.map(
+                parse_raw, pages, [self.parser] * len(pages), [limit] * len(pages), chunksize=chunksize
+            ))
+
+    def fetch_and_parse(self, urls, limit=None):
+        """
+        Downloads pages with the thread pool while the process pool parses them.
+        
+        Each page is handed to a parser process as soon as it has been downloaded,
+        whatever the order the downloads complete in, so fetching and parsing
+        overlap instead of alternating.
+        
+        Parameters:
+        -----------
+        urls : iterable of str
+            The URLs of the listing pages.
+        limit : int, optional
+            The maximum number of entries parsed per page (default is None, every entry).
+        
+        Returns:
+        --------
+        list of list of Entry
+            The entries of every page, in the order of the URLs. Pages reported
+            unchanged by the response cache yield an empty list. The pages are
+            committed to the cache once they have all been parsed.
+        """
+        urls = list(urls)
+        if self.parse_workers == 0:
+            with ThreadPoolExecutor(max_workers=self.workers) as fetchers:
+                pages = self.parse_pages(fetchers.map(self.fetch_raw, urls), limit)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as fetchers, \
+                    ProcessPoolExecutor(max_workers=self.parse_workers) as parsers:
+                downloads = {fetchers.submit(self.fetch_raw, url): index for index, url in enumerate(urls)}
+                parsed = [None] * len(urls)
+                # Pages are parsed in the order they arrive, so a slow page holds back no other.
+                for download in as_completed(downloads):
+                    parsed[downloads[download]] = parsers.submit(parse_raw, download.result(), self.parser, limit)
+                pages = [future.result() for future in parsed]
+        self._commit_pages(urls)
+        return pages
+
+    @timed('scraper.store_entries')
     def store_entries(self, entries):
         """
-        Stores the fetched entries in the database.
+        Stores the fetched entries in the database in a single transaction,
+        together with their snapshots unless snapshots are turned off.
+        
+        The first store, and the first one after every compact_interval seconds,
+        also compacts the old snapshots.
         
         Parameters:
         -----------
-        entries : list of tuple
-            A list of tuples, each containing the number, title, points, and comments of a news item.
+        entries : list of Entry or tuple
+            The entries to store; plain (number, title, points, comments[, item_id]) tuples are accepted too.
+        """
+        self.db.insert_entries(entries, snapshot_at=time.time() if self.snapshots else None)
+        REGISTRY.increment('entries_stored', len(entries))
+        if self.snapshots and self.compact_interval is not None:
+            now = time.monotonic()
+            if self._compacted_at is None or now - self._compacted_at >= self.compact_interval:
+                self._compacted_at = now
+                REGISTRY.increment('snapshots_compacted', self.db.compact_snapshots())
+
+    def _commit_pages(self, urls):
+        """
+        Records the cache validators of pages whose content has been stored.
         """
-        for entry in entries:
-            self.db.insert_entry(entry)
+        if self.cache is not None:
+            for url in urls:
+                self.cache.commit(url)
 
+    @timed('scraper.log_usage')
     def log_usage(self, filter_type):
         """
-        Logs the usage information in the database.
+        Logs the usage information in the database, through the usage logger when one is configured.
         
         Parameters:
         -----------
@@ -136,12 +494,158 @@ class Scraper:
             The type of filter applied during the scrape operation.
         """
         timestamp = datetime.now().isoformat()
-        self.db.log_usage(timestamp, filter_type)
+        if self.usage_logger is not None:
+            self.usage_logger.log(filter_type, timestamp)
+        else:
+            self.db.log_usage(timestamp, filter_type)
 
-    def scrape_and_store(self):
+    def scrape_and_store(self, pages=1, sections=('',)):
         """
         Orchestrates the scraping, storing, and logging operations.
+        
+        Parameters:
+        -----------
+        pages : int, optional
+            The number of pages to crawl in each section (default is 1).
+        sections : iterable of str, optional
+            The sections to crawl (default is the front page).
         """
-        entries = self.fetch_entries()
-        self.store_entries(entries)
+        sections = tuple(sections)
+        if pages == 1 and sections == ('',):
+            entries = self.fetch_entries()
+        else:
+            entries = self.fetch_pages(pages, sections)
+        # Unchanged pages yield no entries, so there is nothing to write.
+        if entries:
+            self.store_entries(entries)
+        self._commit_pages(self.page_urls(pages, sections))
         self.log_usage('scrape')
+
+    def crawl(self, seeds=None, max_depth=1, max_pages=100, handlers=None, frontier=None):
+        """
+        Crawls pages reachable from the seeds through a URL frontier.
+        
+        Pages are fetched concurrently in batches of up to `workers` URLs. Each
+        fetched page is passed to the first handler whose pattern matches its URL;
+        the handler stores what it needs and returns the (link, priority) pairs to
+        follow. URLs without a matching handler are skipped.
+        
+        A page the response cache reports unchanged is not handled again. When its
+        links are still needed, it is downloaded past the cache and only its links
+        are extracted, so a repeated crawl reaches beyond the seeds.
+        
+        Parameters:
+        -----------
+        seeds : iterable of str, optional
+            The URLs to start from (default is BASE_URL).
+        max_depth : int, optional
+            The maximum number of links followed from a seed (default is 1).
+        max_pages : int, optional
+            The maximum number of pages fetched (default is 100).
+        handlers : list of tuple, optional
+            (compiled pattern, handler) pairs, where handler(scraper, url, html, depth)
+            returns the links to follow (default is crawler.frontier.DEFAULT_HANDLERS).
+        frontier : Frontier, optional
+            The frontier to use, e.g. one restored with Frontier.load (default is a new one).
+        
+        Returns:
+        --------
+        int
+            The number of pages fetched.
+        """
+        handlers = DEFAULT_HANDLERS if handlers is None else handlers
+        frontier = Frontier() if frontier is None else frontier
+        for seed in seeds or (self.BASE_URL,):
+            frontier.push(seed, depth=0, priority=SEED_PRIORITY)
+
+        def fetch(url, depth):
+            html = self.fetch_html(url)
+            if html is not None or depth >= max_depth:
+                return html, True
+            response = self._request(url)
+            return (response.text if response.status_code == 200 else None), False
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while len(frontier) and fetched < max_pages:
+                batch = []
+                while len(frontier) and len(batch) < min(self.workers, max_pages - fetched):
+                    url, depth = frontier.pop()
+                    handler = next((handler for pattern, handler in handlers if pattern.search(url)), None)
+                    if handler is not None:
+                        batch.append((url, depth, handler))
+                pages = executor.map(fetch, [url for url, _, _ in batch], [depth for _, depth, _ in batch])
+                for (url, depth, handler), (html, changed) in zip(batch, pages):
+                    fetched += 1
+                    if html is None:
+                        continue
+                    if changed:
+                        links = handler(self, url, html, depth)
+                        self._commit_pages([url])
+                    else:
+                        links = extract_links(url, html)
+                    if depth < max_depth:
+                        for link, priority in links:
+                            frontier.push(link, depth + 1, priority)
+        return fetched
+
+    @timed('scraper.fetch_comments')
+    def fetch_comments(self, item_id):
+        """
+        Fetches and parses the comments of a story.
+        
+        Parameters:
+        -----------
+        item_id : int
+            The item id of the story.
+        
+        Returns:
+        --------
+        list of Comment or None
+            The comments in display order, or None when the response cache
+            reports the page unchanged. The list is empty when the item is a
+            comment, whose page only shows part of a thread.
+        """
+        html = self.fetch_html(self.ITEM_URL + str(item_id))
+        if html is None:
+            return None
+        if not is_story_page(html):
+            return []
+        return parse_comments(html, item_id)
+
+    def scrape_comments(self, item_ids=None, top=30, workers=None):
+        """
+        Fetches the comment threads of several stories concurrently and stores them.
+        
+        Item pages are downloaded and parsed by a thread pool; each thread is then
+        written by the calling thread in its own transaction, replacing the
+        comments stored by a previous crawl. Unchanged pages are left as stored.
+        
+        Parameters:
+        -----------
+        item_ids : iterable of int, optional
+            The item ids of the stories (default is None, the stored stories with
+            the most points).
+        top : int, optional
+            The number of stories crawled when item_ids is None (default is 30).
+        workers : int, optional
+            The number of concurrent fetches (default is the Scraper's workers).
+        
+        Returns:
+        --------
+        dict
+            {item_id: number of stored comments} for every story whose page changed.
+        """
+        if item_ids is None:
+            item_ids = [entry.item_id for entry in self.db.select_entries(
+                'item_id IS NOT NULL', order=('points DESC',), limit=top)]
+        stored = {}
+        with ThreadPoolExecutor(max_workers=workers or self.workers) as executor:
+            item_ids = list(item_ids)
+            for item_id, comments in zip(item_ids, executor.map(self.fetch_comments, item_ids)):
+                if comments is not None:
+                    stored[item_id] = self.db.store_comments(item_id, comments)
+                    self._commit_pages([self.ITEM_URL + str(item_id)])
+        REGISTRY.increment('comments_stored', sum(stored.values()))
+        self.log_usage('comments')
+        return stored
@@ -3,6 +3,41 @@ This module defines the Database class for interacting with a SQLite database.
 It provides methods to create tables, insert entries, log usage events, and fetch entries.
 The module uses the sqlite3 library for database operations.
 
+Entries are keyed on their Hacker News item id: writing an entry whose item id
+is already stored updates its rank, title, points and comments in place, so
+repeated crawls do not accumulate duplicate rows. Schema changes are applied by
+numbered migrations tracked in SQLite's user_version pragma.
+
+Entries are read back as Entry records with an integer rank. Each entry also
+stores the word count of its title, and composite indexes on
+(title_word_count, comments) and (title_word_count, points) let fetch_entries_by
+filter and order entries in SQLite, one page at a time.
+
+Entries can be written in bulk with insert_entries, which loads any number of rows
+in a single transaction. An optional performance profile switches the connection
+to WAL journaling with relaxed syncing, a larger page cache and memory-mapped I/O.
+A Database can also be opened read-only, which is how crawler.connections builds
+its pool of reader connections.
+
+Every crawl can also record a snapshot of each entry's rank, points and comments
+in the 'snapshots' table. Window functions over the snapshots answer "how fast is
+this story rising" (fetch_velocity) and "which stories gained the most in the last
+hour" (fetch_top_movers), and compact_snapshots downsamples old snapshots to one per
+item and bucket and drops the oldest, so the table stays bounded.
+
+Titles are indexed in an FTS5 table kept in sync by triggers, so search_titles
+finds the stories that mention some words without scanning the table, ranked by
+BM25 or by comments or points, and filtered by the same criteria as fetch_entries_by.
+
+iter_export streams the entries and usage rows in the order of a (time, id) key
+that only grows, which crawler.export uses to archive them incrementally.
+
+Comment threads are stored as an adjacency list: each row of 'comments' holds
+the id of its parent (the story for a top-level comment), indexed on the parent
+and on the story. store_comments replaces the thread of a story in one
+transaction, and fetch_thread and fetch_ancestors walk the tree down or up with
+a recursive common table expression.
+
 Classes:
 --------
 Database:
@@ -19,39 +54,225 @@ Example:
     from database import Database
 
     db = Database('my_database.db')
-    db.insert_entry(('1', 'Test Title', 100, 50))
+    db.insert_entry(Entry(1, 'Test Title', 100, 50, 41000001))
+    db.insert_entries([Entry(2, 'Another Title', 10, 5, 41000002), ('3', 'Third Title', 7, 0, 41000003)])
     db.log_usage('2023-01-01T00:00:00', 'test_filter')
     entries = db.fetch_all_entries()
     for entry in entries:
         print(entry)
+
+    # Titles with more than five words, most commented first, ten at a time.
+    first_page = db.fetch_entries_by('comments', min_words=6, limit=10)
+
+    # Snapshots: record a crawl, then ask for the stories that rose most in an hour.
+    db.insert_entries(entries, snapshot_at=time.time())
+    movers = db.fetch_top_movers(window=3600, order_by='points_gained', limit=10)
+
+    # Stories about Rust with at least 50 points, most commented first.
+    rust = db.search_titles('rust', order_by='comments', min_points=50)
+
+    # The replies under a comment, in display order.
+    db.store_comments(41000001, parse_comments(item_html, 41000001))
+    replies = db.fetch_thread(41000007)
 """
 
+import json  # Import json to store the export high-water marks.
+import os  # Import os to resolve the path of a read-only database.
 import sqlite3  # Import the SQLite3 library to handle the database operations.
+import time  # Import time to timestamp the snapshots.
+from collections import namedtuple  # Import namedtuple to build the mover records.
+from .entry import Comment, Entry, word_count  # Import the records and the title word count.
+from .metrics import timed  # Import timed to instrument the database methods.
+
+Mover = namedtuple('Mover', (
+    'item_id', 'title', 'rank', 'points', 'comments',
+    'points_gained', 'comments_gained', 'rank_change', 'points_per_hour',
+))
+
 
 class Database:
     """
     A class to manage the SQLite database operations, including creating tables,
     inserting entries, logging usage, and fetching data.
 
+    Attributes:
+    -----------
+    PERFORMANCE_PRAGMAS : dict
+        The pragmas applied to the connection by the performance profile.
+
+    WRITER_PRAGMAS : tuple of str
+        The performance pragmas that are not applied to read-only connections.
+
+    MIGRATIONS : tuple of str
+        The names of the migration methods, in the order they are applied.
+        The schema version stored in user_version is the number of applied migrations.
+
+    ORDER_COLUMNS : tuple of str
+        The columns fetch_entries_by can order by.
+
+    EXPORT_TABLES : dict
+        The tables iter_export can read, with their columns, export key and day.
+
+    SEARCH_ORDERS : tuple of str
+        The orders search_titles accepts: 'relevance' and ORDER_COLUMNS.
+
+    MOVER_ORDERS : tuple of str
+        The Mover fields fetch_top_movers can order by.
+
     Methods:
     --------
-    __init__(db_path):
+    __init__(db_path, performance=False, readonly=False, check_same_thread=True):
         Initializes the Database with the given SQLite database path.
     
     create_tables():
         Creates the necessary tables in the database if they don't exist.
     
+    migrate():
+        Applies the pending schema migrations.
+    
     insert_entry(entry):
-        Inserts a new entry into the 'entries' table.
+        Inserts or updates an entry in the 'entries' table.
+    
+    insert_entries(entries, snapshot_at=None):
+        Inserts or updates many entries in the 'entries' table in a single transaction.
+    
+    search_titles(query, order_by='relevance', min_words=None, max_words=None, min_points=None, ...):
+        Fetches the entries whose title contains every word of a query.
+    
+    has_title_index():
+        Returns whether the full-text index of titles exists.
+    
+    rebuild_title_index():
+        Creates the full-text index of titles if it is missing and rebuilds it.
+    
+    record_snapshots(entries, crawled_at=None):
+        Records the rank, points and comments of entries at a crawl time.
+    
+    fetch_velocity(item_id, window=None, now=None):
+        Fetches the snapshots of an item with the change since the previous one.
+    
+    fetch_top_movers(window=3600, order_by='points_gained', limit=10, now=None):
+        Fetches the items that changed most over a time window.
+    
+    compact_snapshots(keep_full=86400, bucket=3600, max_age=2592000, now=None):
+        Downsamples old snapshots and deletes the oldest.
     
     log_usage(timestamp, filter_type):
         Logs the usage event into the 'usage' table.
     
+    log_usage_many(events):
+        Logs many usage events into the 'usage' table in a single transaction.
+    
     fetch_all_entries():
         Fetches all entries from the 'entries' table.
+    
+    iter_entries(batch_size=500):
+        Yields the entries from the 'entries' table one batch at a time.
+    
+    fetch_entries_by(order_by, min_words=None, max_words=None, limit=None, offset=0):
+        Fetches entries filtered by title word count and ordered by a column.
+    
+    iter_entries_by(order_by, min_words=None, max_words=None, limit=None, offset=0, batch_size=500):
+        Yields the entries of fetch_entries_by one batch at a time.
+    
+    generation:
+        The write generation, which changes whenever the stored data may have changed.
+    
+    select_entries(where='', params=(), order=(), limit=None, offset=0):
+        Fetches the entries that satisfy an SQL condition, in an SQL order.
+    
+    save_frontier(name, state, queue, max_size):
+        Saves the state of a crawl frontier, replacing any previous save.
+    
+    load_frontier(name):
+        Loads the state of a saved crawl frontier.
+    
+    iter_export(table, after=None, before=None, batch_size=1000):
+        Yields the rows of a table in export order, one batch at a time.
+    
+    load_export_mark(name), save_export_mark(name, position):
+        Read and record the high-water mark of an export.
+    
+    prune_exported(table, position):
+        Deletes the rows of a table up to and including a (time, id) key.
+    
+    store_comments(story_id, comments):
+        Replaces the comment thread of a story.
+    
+    fetch_thread(root_id, max_depth=None):
+        Fetches the comments under a story or a comment, in display order.
+    
+    fetch_ancestors(comment_id):
+        Fetches the comments a comment replies to, from the top level down.
+    
+    vacuum():
+        Rebuilds the database file to return the space of deleted rows.
     """
+    PERFORMANCE_PRAGMAS = {
+        'journal_mode': 'WAL',      # Readers do not block the writer and commits append to a log.
+        'synchronous': 'NORMAL',    # Sync at checkpoints instead of on every commit (safe with WAL).
+        'cache_size': -64000,       # 64 MB page cache (negative values are in KiB).
+        'mmap_size': 268435456,     # Memory-map up to 256 MB of the database file.
+        'temp_store': 'MEMORY',     # Keep temporary tables and indexes in memory.
+    }
+    WRITER_PRAGMAS = ('journal_mode', 'synchronous')
+    MIGRATIONS = (
+        '_migrate_item_id',
+        '_migrate_title_word_count',
+        '_migrate_frontier',
+        '_migrate_rank',
+        '_migrate_snapshots',
+        '_migrate_title_search',
+        '_migrate_export',
+        '_migrate_comments',
+        '_migrate_legacy_titles',
+    )
+    UPSERT_ENTRY = '''
+        INSERT INTO entries (rank, title, points, comments, item_id, title_word_count, updated_at) 
+        VALUES (?, ?, ?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
+        ON CONFLICT (item_id) DO UPDATE SET
+            rank = excluded.rank,
+            title = excluded.title,
+            points = excluded.points,
+            comments = excluded.comments,
+            title_word_count = excluded.title_word_count,
+            updated_at = excluded.updated_at
+    '''
+    # Gives an incoming item id to the newest row stored without one under the same title.
+    # The subquery names the partial index: left alone, the planner reads every row without an
+    # item id through idx_entries_item_id.
+    ADOPT_LEGACY_ENTRY = '''
+        UPDATE entries SET item_id = ?1
+        WHERE id = (
+            SELECT MAX(id) FROM entries INDEXED BY idx_entries_legacy_title WHERE item_id IS NULL AND title = ?2
+        )
+            AND NOT EXISTS (SELECT 1 FROM entries WHERE item_id = ?1)
+    '''
+    ORDER_COLUMNS = ('comments', 'points')
+    # Per exported table: the exported columns, the (time, id) key the rows are
+    # exported in, and the SQL expression of the day a row belongs to. Usage
+    # timestamps are local ISO times, so entries are assigned to local days too.
+    EXPORT_TABLES = {
+        'entries': (
+            ('item_id', 'rank', 'title', 'points', 'comments', 'title_word_count', 'updated_at'),
+            ('updated_at', 'id'),
+            "date(updated_at, 'unixepoch', 'localtime')",
+        ),
+        'usage': (
+            ('id', 'timestamp', 'filter_type'),
+            ('timestamp', 'id'),
+            'substr(timestamp, 1, 10)',
+        ),
+    }
+    SEARCH_ORDERS = ('relevance',) + ORDER_COLUMNS
+    MOVER_ORDERS = ('points_gained', 'comments_gained', 'rank_change', 'points_per_hour')
+    COMMENT_COLUMNS = 'id, story_id, parent_id, depth, author, posted_at, text'
+    INSERT_SNAPSHOT = '''
+        INSERT OR REPLACE INTO snapshots (item_id, crawled_at, rank, points, comments)
+        VALUES (?, ?, ?, ?, ?)
+    '''
     
-    def __init__(self, db_path):
+    def __init__(self, db_path, performance=False, readonly=False, check_same_thread=True):
         """
         Initializes the Database class with the path to the SQLite database.
         
@@ -59,13 +280,40 @@ class Database:
         -----------
         db_path : str
             The path to the SQLite database file.
+        performance : bool, optional
+            Whether to apply PERFORMANCE_PRAGMAS to the connection (default is False).
+            A read-only connection skips journal_mode and synchronous, which belong to the writer.
+        readonly : bool, optional
+            Whether to open an existing database read-only (default is False). The
+            tables are then neither created nor migrated, and every write raises
+            sqlite3.OperationalError.
+        check_same_thread : bool, optional
+            Whether the connection may only be used by the thread that created it
+            (default is True). Pass False only when access is serialized by the caller.
         """
-        self.conn = sqlite3.connect(db_path)
-        self.create_tables()
+        if readonly:
+            # Imported here: urllib.request pulls in http.client and ssl, which only this branch needs.
+            from urllib.request import pathname2url
+
+            uri = f'file:{pathname2url(os.path.abspath(db_path))}?mode=ro'
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        if performance:
+            for pragma, value in self.PERFORMANCE_PRAGMAS.items():
+                if not (readonly and pragma in self.WRITER_PRAGMAS):
+                    self.conn.execute(f'PRAGMA {pragma} = {value}')
+        if readonly:
+            self.conn.execute('PRAGMA query_only = ON')
+        else:
+            self.create_tables()
         
     def create_tables(self):
         """
         Creates the necessary tables in the database if they don't exist.
+        
+        The tables are created with their original layout and then brought up to
+        date by migrate(), so new and existing databases go through the same steps.
         """
         with self.conn:
             self.conn.execute('''
@@ -85,22 +333,472 @@ class Database:
                 )
             ''')
             
+        self.migrate()
+
+    @timed('database.migrate')
+    def migrate(self):
+        """
+        Applies the pending schema migrations.
+        
+        Each migration runs in its own transaction together with the update of
+        the schema version, so an interrupted migration is rolled back and retried.
+        """
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, name in enumerate(self.MIGRATIONS[version:], start=version + 1):
+            with self.conn:
+                self.conn.execute('BEGIN')
+                getattr(self, name)()
+                self.conn.execute(f'PRAGMA user_version = {number}')
+
+    def _migrate_item_id(self):
+        """
+        Adds the Hacker News item id to 'entries' and collapses duplicate rows.
+        
+        Rows written before this migration have no item id, so duplicates are
+        detected by title and only the most recent row of each title is kept.
+        The remaining rows get their item id from the next crawl that sees their
+        title (see _adopt_legacy_rows).
+        """
+        self.conn.execute('ALTER TABLE entries ADD COLUMN item_id INTEGER')
+        self.conn.execute('''
+            DELETE FROM entries
+            WHERE id NOT IN (SELECT MAX(id) FROM entries GROUP BY title)
+        ''')
+        self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_item_id ON entries (item_id)')
+
+    def _migrate_title_word_count(self):
+        """
+        Adds the title word count to 'entries' and indexes it with comments and points.
+        """
+        self.conn.execute('ALTER TABLE entries ADD COLUMN title_word_count INTEGER')
+        self.conn.create_function('word_count', 1, word_count, deterministic=True)
+        self.conn.execute('UPDATE entries SET title_word_count = word_count(title)')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entries_words_comments
+            ON entries (title_word_count, comments)
+        ''')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entries_words_points
+            ON entries (title_word_count, points)
+        ''')
+
+    def _migrate_frontier(self):
+        """
+        Adds the tables that hold saved crawl frontiers.
+        """
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier_state (
+                name TEXT PRIMARY KEY,     -- Name of the saved frontier
+                size INTEGER,              -- Number of bits of the Bloom filter
+                hashes INTEGER,            -- Number of hash positions per URL
+                count INTEGER,             -- Number of URLs added to the Bloom filter
+                bits BLOB,                 -- The Bloom filter bits
+                max_size INTEGER           -- Maximum number of queued URLs
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier_queue (
+                name TEXT,                 -- Name of the saved frontier
+                url TEXT,                  -- Queued URL
+                depth INTEGER,             -- Links followed from a seed to reach the URL
+                priority INTEGER           -- Higher priorities are visited first
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_queue_name ON frontier_queue (name)')
+
+    def _migrate_rank(self):
+        """
+        Replaces the text 'number' column of 'entries' with an integer 'rank' column.
+        
+        Existing numbers are converted with CAST, so a non-numeric number becomes 0.
+        The old column is dropped where SQLite supports DROP COLUMN (3.35 and later);
+        with older versions it is kept but no longer written.
+        """
+        self.conn.execute('ALTER TABLE entries ADD COLUMN rank INTEGER')
+        self.conn.execute("UPDATE entries SET rank = CAST(rtrim(number, '.') AS INTEGER)")
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            self.conn.execute('ALTER TABLE entries DROP COLUMN number')
+
+    def _migrate_snapshots(self):
+        """
+        Adds the table of per-crawl snapshots of each item's rank, points and comments.
+        
+        The primary key (item_id, crawled_at) clusters the rows by item, for the
+        per-item window functions; a second index serves the time-window scans.
+        """
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                item_id INTEGER NOT NULL,  -- Hacker News item id of the entry
+                crawled_at INTEGER NOT NULL, -- Crawl time in seconds since the epoch
+                rank INTEGER,              -- Rank of the entry at that crawl
+                points INTEGER,            -- Points of the entry at that crawl
+                comments INTEGER,          -- Number of comments of the entry at that crawl
+                PRIMARY KEY (item_id, crawled_at)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_crawled_at ON snapshots (crawled_at)')
+
+    def _migrate_title_search(self):
+        """
+        Adds the full-text index of titles, if SQLite has the FTS5 module.
+        
+        Without FTS5 nothing is created, search_titles falls back to LIKE, and
+        rebuild_title_index can add the index later.
+        """
+        try:
+            self._create_title_index()
+        except sqlite3.OperationalError as error:
+            if 'fts5' not in str(error):
+                raise
+
+    def _create_title_index(self):
+        """
+        Creates the FTS5 index of titles with the triggers that keep it in sync, and fills it.
+        
+        The index is an external-content table: it stores only the tokens and reads
+        the titles from 'entries', keyed by entries.id. The update trigger only
+        fires when an upsert actually changes a title.
+        """
+        self.conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                title, content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_fts (rowid, title) VALUES (new.id, new.title);
+            END
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF title ON entries
+            WHEN old.title IS NOT new.title BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO entries_fts (rowid, title) VALUES (new.id, new.title);
+            END
+        ''')
+        self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+
+    def _migrate_export(self):
+        """
+        Adds what the archival export needs: the time each entry was last written,
+        (time, id) indexes to read rows in export order, and the high-water marks.
+        
+        Entries written before this migration get the time of the migration.
+        """
+        self.conn.execute('ALTER TABLE entries ADD COLUMN updated_at INTEGER')
+        self.conn.execute("UPDATE entries SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)")
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_updated_at ON entries (updated_at, id)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage (timestamp, id)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS export_marks (
+                name TEXT PRIMARY KEY,     -- Name of the export and table, e.g. 'default:usage'
+                position TEXT              -- JSON (time, id) key of the last exported row
+            )
+        ''')
+
+    def _migrate_comments(self):
+        """
+        Adds the adjacency-list table of comment threads.
+        
+        The parent index serves the recursive walks down a thread; the story
+        index replaces a story's thread and returns it in display order.
+        """
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS comments (
+                id INTEGER PRIMARY KEY,    -- Hacker News item id of the comment
+                story_id INTEGER NOT NULL, -- Item id of the story of the thread
+                parent_id INTEGER NOT NULL, -- Item id of the comment replied to, or of the story
+                depth INTEGER NOT NULL,    -- Nesting level, 0 for a top-level comment
+                position INTEGER NOT NULL, -- Display order of the comment in the story's thread
+                author TEXT,               -- User name of the author, NULL for a deleted comment
+                posted_at TEXT,            -- Time the comment was posted in ISO format
+                text TEXT                  -- Text of the comment
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_comments_parent ON comments (parent_id)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_comments_story ON comments (story_id, position)')
+
+    def _migrate_legacy_titles(self):
+        """
+        Indexes the titles of the entries stored without an item id.
+        
+        The partial index only holds those rows, so _adopt_legacy_rows finds the
+        row of an incoming title with one lookup, and entries with an item id do
+        not pay for it.
+        """
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entries_legacy_title ON entries (title) WHERE item_id IS NULL
+        ''')
+
+    def _entries_cursor(self):
+        """
+        Returns a cursor that reads entry rows as Entry records.
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = Entry.row_factory
+        return cursor
+
+    @staticmethod
+    def _entry_row(entry):
+        """
+        Returns the values of an entry as (rank, title, points, comments, item_id, title_word_count).
+        
+        Entry records are written as they are; plain tuples are converted first.
+        Entries without an item id get None, which never conflicts with a stored row.
+        """
+        return Entry.from_tuple(entry)
+            
+    @timed('database.insert_entry')
     def insert_entry(self, entry):
         """
-        Inserts a new entry into the 'entries' table.
+        Inserts or updates an entry in the 'entries' table.
         
         Parameters:
         -----------
-        entry : tuple
-            A tuple containing the values to be inserted into the 'entries' table.
-            The tuple should be in the format (number, title, points, comments).
+        entry : Entry or tuple
+            The entry to write: an Entry, or a tuple in the format
+            (number, title, points, comments, item_id) whose number is converted to an integer rank.
+            When an entry with the same item id exists, it is updated in place.
+            The item id may be omitted, in which case the entry is always inserted.
         """
+        row = self._entry_row(entry)
         with self.conn:
-            self.conn.execute('''
-                INSERT INTO entries (number, title, points, comments) 
-                VALUES (?, ?, ?, ?)
-            ''', entry)
+            if self._has_legacy_rows():
+                self._adopt_legacy_rows([row])
+            self.conn.execute(self.UPSERT_ENTRY, row)
+
+    @timed('database.insert_entries')
+    def insert_entries(self, entries, snapshot_at=None):
+        """
+        Inserts or updates many entries in the 'entries' table in a single transaction.
+        
+        Parameters:
+        -----------
+        entries : iterable of Entry or tuple
+            The entries to write, each in the format accepted by insert_entry.
+        snapshot_at : float, optional
+            When given, the entries are also recorded in 'snapshots' at this crawl
+            time, in seconds since the epoch, in the same transaction (default is None).
+        
+        Returns:
+        --------
+        int
+            The number of inserted or updated entries.
+        """
+        rows = map(self._entry_row, entries)
+        legacy = self._has_legacy_rows()
+        if snapshot_at is not None or legacy:
+            rows = list(rows)  # Read twice: for the entries, and for the snapshots or the legacy rows.
+        with self.conn:
+            if legacy:
+                self._adopt_legacy_rows(rows)
+            cursor = self.conn.executemany(self.UPSERT_ENTRY, rows)
+            count = cursor.rowcount
+            if snapshot_at is not None:
+                self.conn.executemany(self.INSERT_SNAPSHOT, self._snapshot_rows(rows, snapshot_at))
+        return count
+
+    def _has_legacy_rows(self):
+        """
+        Returns whether some stored entries have no item id; a lookup in the item id index.
+        """
+        return self.conn.execute('SELECT 1 FROM entries WHERE item_id IS NULL LIMIT 1').fetchone() is not None
+
+    def _adopt_legacy_rows(self, rows):
+        """
+        Gives the item ids of incoming entries to stored rows without one, matched by title.
+        
+        Rows written before item ids were recorded would otherwise be duplicated
+        by the first crawl after the migration, instead of being updated in place.
+        Each title is looked up in the partial index idx_entries_legacy_title.
+        """
+        self.conn.executemany(self.ADOPT_LEGACY_ENTRY,
+                              ((row.item_id, row.title) for row in rows if row.item_id is not None))
+
+    @staticmethod
+    def _snapshot_rows(entries, crawled_at):
+        """
+        Returns the snapshot rows of the entries that have an item id.
+        """
+        crawled_at = int(crawled_at)
+        return [
+            (entry.item_id, crawled_at, entry.rank, entry.points, entry.comments)
+            for entry in entries if entry.item_id is not None
+        ]
+
+    @timed('database.record_snapshots')
+    def record_snapshots(self, entries, crawled_at=None):
+        """
+        Records the rank, points and comments of entries at a crawl time.
+        
+        Entries without an item id cannot be followed over time and are skipped.
+        A second snapshot of an item at the same second replaces the first.
+        
+        Parameters:
+        -----------
+        entries : iterable of Entry or tuple
+            The entries, each in the format accepted by insert_entry.
+        crawled_at : float, optional
+            The crawl time in seconds since the epoch (default is now).
+        
+        Returns:
+        --------
+        int
+            The number of recorded snapshots.
+        """
+        rows = self._snapshot_rows(map(self._entry_row, entries), time.time() if crawled_at is None else crawled_at)
+        with self.conn:
+            self.conn.executemany(self.INSERT_SNAPSHOT, rows)
+        return len(rows)
+
+    @timed('database.fetch_velocity')
+    def fetch_velocity(self, item_id, window=None, now=None):
+        """
+        Fetches the snapshots of an item with the change since the previous one.
+        
+        Parameters:
+        -----------
+        item_id : int
+            The Hacker News item id.
+        window : float, optional
+            Only the snapshots of the last `window` seconds are returned
+            (default is None, every snapshot).
+        now : float, optional
+            The end of the window in seconds since the epoch (default is now).
+        
+        Returns:
+        --------
+        list of tuple
+            (crawled_at, rank, points, comments, points_delta, comments_delta, points_per_hour)
+            in time order. The deltas and the rate are None for the first snapshot.
+        """
+        now = time.time() if now is None else now
+        start = float('-inf') if window is None else now - window
+        return self.conn.execute('''
+            SELECT crawled_at, rank, points, comments,
+                   points - LAG(points) OVER w,
+                   comments - LAG(comments) OVER w,
+                   (points - LAG(points) OVER w) * 3600.0 / (crawled_at - LAG(crawled_at) OVER w)
+            FROM snapshots
+            WHERE item_id = ? AND crawled_at >= ? AND crawled_at <= ?
+            WINDOW w AS (ORDER BY crawled_at)
+            ORDER BY crawled_at
+        ''', (item_id, start, now)).fetchall()
+
+    @timed('database.fetch_top_movers')
+    def fetch_top_movers(self, window=3600, order_by='points_gained', limit=10, now=None):
+        """
+        Fetches the items that changed most over a time window.
+        
+        Each item is compared between its first and its last snapshot in the
+        window, so items seen only once in the window are left out.
+        
+        Parameters:
+        -----------
+        window : float, optional
+            The length of the window in seconds, ending at now (default is 3600).
+        order_by : str, optional
+            The Mover field to order by in descending order, one of MOVER_ORDERS
+            (default is 'points_gained'). A positive rank_change is a climb.
+        limit : int, optional
+            The maximum number of items to return (default is 10, None for every item).
+        now : float, optional
+            The end of the window in seconds since the epoch (default is now).
+        
+        Returns:
+        --------
+        list of Mover
+            The items with their title and latest rank, points and comments, and
+            their points gained, comments gained, rank change and points per hour.
+        
+        Raises:
+        -------
+        ValueError
+            If order_by is not one of MOVER_ORDERS.
+        """
+        if order_by not in self.MOVER_ORDERS:
+            raise ValueError(f"Cannot order movers by {order_by!r}")
+        now = time.time() if now is None else now
+        rows = self.conn.execute(f'''
+            WITH windowed AS (
+                SELECT item_id, crawled_at, rank, points, comments,
+                       FIRST_VALUE(crawled_at) OVER w AS first_at,
+                       FIRST_VALUE(rank) OVER w AS first_rank,
+                       FIRST_VALUE(points) OVER w AS first_points,
+                       FIRST_VALUE(comments) OVER w AS first_comments,
+                       ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY crawled_at DESC) AS newest
+                FROM snapshots
+                WHERE crawled_at >= ? AND crawled_at <= ?
+                WINDOW w AS (PARTITION BY item_id ORDER BY crawled_at)
+            ), movers AS (
+                SELECT item_id, rank, points, comments,
+                       points - first_points AS points_gained,
+                       comments - first_comments AS comments_gained,
+                       first_rank - rank AS rank_change,
+                       (points - first_points) * 3600.0 / (crawled_at - first_at) AS points_per_hour
+                FROM windowed
+                WHERE newest = 1 AND crawled_at > first_at
+            )
+            SELECT movers.item_id, entries.title, movers.rank, movers.points, movers.comments,
+                   points_gained, comments_gained, rank_change, points_per_hour
+            FROM movers LEFT JOIN entries ON entries.item_id = movers.item_id
+            ORDER BY {order_by} DESC, movers.item_id
+            LIMIT ?
+        ''', (now - window, now, -1 if limit is None else limit)).fetchall()
+        return [Mover._make(row) for row in rows]
+
+    @timed('database.compact_snapshots')
+    def compact_snapshots(self, keep_full=86400, bucket=3600, max_age=2592000, now=None):
+        """
+        Downsamples old snapshots and deletes the oldest.
+        
+        Snapshots newer than keep_full are all kept. Older ones are thinned to the
+        last snapshot of each item in each bucket, and those older than max_age are
+        deleted, so the table holds at most one row per item and bucket beyond the
+        recent window.
+        
+        Parameters:
+        -----------
+        keep_full : float, optional
+            The age in seconds under which every snapshot is kept (default is one day).
+        bucket : float, optional
+            The length in seconds of a downsampling bucket (default is one hour).
+        max_age : float, optional
+            The age in seconds beyond which snapshots are deleted (default is 30 days,
+            None keeps them forever).
+        now : float, optional
+            The current time in seconds since the epoch (default is now).
+        
+        Returns:
+        --------
+        int
+            The number of deleted snapshots.
+        """
+        now = time.time() if now is None else now
+        with self.conn:
+            deleted = 0
+            if max_age is not None:
+                deleted += self.conn.execute('DELETE FROM snapshots WHERE crawled_at < ?', (now - max_age,)).rowcount
+            deleted += self.conn.execute('''
+                DELETE FROM snapshots WHERE (item_id, crawled_at) IN (
+                    SELECT item_id, crawled_at FROM (
+                        SELECT item_id, crawled_at, ROW_NUMBER() OVER (
+                            PARTITION BY item_id, CAST(crawled_at / ? AS INTEGER) ORDER BY crawled_at DESC
+                        ) AS position
+                        FROM snapshots
+                        WHERE crawled_at < ?
+                    )
+                    WHERE position > 1
+                )
+            ''', (bucket, now - keep_full)).rowcount
+        return deleted
         
+    @timed('database.log_usage')
     def log_usage(self, timestamp, filter_type):
         """
         Logs the usage event into the 'usage' table.
@@ -117,16 +815,544 @@ class Database:
                 INSERT INTO usage (timestamp, filter_type) 
                 VALUES (?, ?)
             ''', (timestamp, filter_type))
-        
+
+    @timed('database.log_usage_many')
+    def log_usage_many(self, events):
+        """
+        Logs many usage events into the 'usage' table in a single transaction.
+
+        Parameters:
+        -----------
+        events : iterable of tuple
+            The (timestamp, filter_type) pairs to log.
+
+        Returns:
+        --------
+        int
+            The number of logged events.
+        """
+        with self.conn:
+            cursor = self.conn.executemany('INSERT INTO usage (timestamp, filter_type) VALUES (?, ?)', events)
+        return cursor.rowcount
+
+    @timed('database.fetch_all_entries')
     def fetch_all_entries(self):
         """
         Fetches all entries from the 'entries' table.
         
         Returns:
         --------
-        list of tuple
-            A list of tuples, each containing the number, title, points, and comments of a news item.
+        list of Entry
+            The entries, each with its rank, title, points, comments, item id and title word count.
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT number, title, points, comments FROM entries')
+        cursor = self._entries_cursor()
+        cursor.execute('SELECT rank, title, points, comments, item_id, title_word_count FROM entries')
         return cursor.fetchall()
+
+    def iter_entries(self, batch_size=500):
+        """
+        Yields the entries from the 'entries' table one batch at a time.
+        
+        Only one batch of rows is held in memory, so the whole table can be
+        scanned with a memory footprint that does not grow with its size.
+        
+        Parameters:
+        -----------
+        batch_size : int, optional
+            The number of rows read from SQLite per fetchmany call (default is 500).
+        
+        Yields:
+        -------
+        Entry
+            The rank, title, points, comments, item id and title word count of a news item.
+        """
+        cursor = self._entries_cursor()
+        cursor.execute('SELECT rank, title, points, comments, item_id, title_word_count FROM entries ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    @timed('database.fetch_entries_by')
+    def fetch_entries_by(self, order_by, min_words=None, max_words=None, limit=None, offset=0):
+        """
+        Fetches entries filtered by title word count and ordered by a column.
+        
+        The filtering, ordering and paging run in SQLite on the word count indexes.
+        Entries with equal values keep the order in which they were stored.
+        
+        Parameters:
+        -----------
+        order_by : str
+            The column to order by in descending order, one of ORDER_COLUMNS.
+        min_words : int, optional
+            The minimum number of words in the title (default is None, no minimum).
+        max_words : int, optional
+            The maximum number of words in the title (default is None, no maximum).
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        
+        Returns:
+        --------
+        list of Entry
+            The entries, each with its rank, title, points, comments, item id and title word count.
+        
+        Raises:
+        -------
+        ValueError
+            If order_by is not one of ORDER_COLUMNS.
+        """
+        return self._query_entries_by(order_by, min_words, max_words, limit, offset).fetchall()
+
+    def iter_entries_by(self, order_by, min_words=None, max_words=None, limit=None, offset=0, batch_size=500):
+        """
+        Yields the entries of fetch_entries_by one batch at a time.
+        
+        The rows come straight from the SQLite cursor with fetchmany, so the first
+        rows are available at once and memory does not grow with the result size.
+        
+        Parameters:
+        -----------
+        order_by, min_words, max_words, limit, offset :
+            The same as for fetch_entries_by.
+        batch_size : int, optional
+            The number of rows read from SQLite per fetchmany call (default is 500).
+        
+        Yields:
+        -------
+        Entry
+            The rank, title, points, comments, item id and title word count of a news item.
+        """
+        cursor = self._query_entries_by(order_by, min_words, max_words, limit, offset)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def _query_entries_by(self, order_by, min_words, max_words, limit, offset):
+        """
+        Runs the filtered, ordered and paged entries query and returns its cursor.
+        """
+        if order_by not in self.ORDER_COLUMNS:
+            raise ValueError(f"Cannot order entries by {order_by!r}")
+        conditions, params = self._entry_conditions(min_words, max_words)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        # SQLite treats a negative LIMIT as no limit.
+        params.extend((-1 if limit is None else limit, offset))
+        return self._entries_cursor().execute(f'''
+            SELECT rank, title, points, comments, item_id, title_word_count FROM entries
+            {where}
+            ORDER BY {order_by} DESC, id
+            LIMIT ? OFFSET ?
+        ''', params)
+
+    @staticmethod
+    def _entry_conditions(min_words=None, max_words=None, min_points=None, min_comments=None):
+        """
+        Returns the SQL conditions and parameters of the word count, points and comments criteria.
+        """
+        conditions = []
+        params = []
+        for condition, value in (
+            ('entries.title_word_count >= ?', min_words),
+            ('entries.title_word_count <= ?', max_words),
+            ('entries.points >= ?', min_points),
+            ('entries.comments >= ?', min_comments),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        return conditions, params
+
+    def has_title_index(self):
+        """
+        Returns whether the full-text index of titles exists (it needs SQLite's FTS5 module).
+        """
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
+        ).fetchone() is not None
+
+    @timed('database.search_titles')
+    def search_titles(self, query, order_by='relevance', min_words=None, max_words=None,
+                      min_points=None, min_comments=None, limit=None, offset=0):
+        """
+        Fetches the entries whose title contains every word of a query.
+        
+        The words are matched in the FTS5 index of titles, case-insensitively and
+        ignoring accents, and combined with the word count, points and comments
+        criteria in the same query. Without the index (SQLite built without FTS5)
+        the words are matched with LIKE over the whole table instead, and
+        'relevance' keeps the order in which the entries were stored.
+        
+        Parameters:
+        -----------
+        query : str
+            The words to look for, or an FTS5 query expression when it starts with
+            'fts:' (e.g. 'fts:rust NOT game', 'fts:"open source"', 'fts:pyth*').
+        order_by : str, optional
+            One of SEARCH_ORDERS: 'relevance' (BM25, best first; the default),
+            'comments' or 'points' (descending).
+        min_words : int, optional
+            The minimum number of words in the title (default is None, no minimum).
+        max_words : int, optional
+            The maximum number of words in the title (default is None, no maximum).
+        min_points : int, optional
+            The minimum number of points (default is None, no minimum).
+        min_comments : int, optional
+            The minimum number of comments (default is None, no minimum).
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        
+        Returns:
+        --------
+        list of Entry
+            The matching entries.
+        
+        Raises:
+        -------
+        ValueError
+            If the query has no words or order_by is not one of SEARCH_ORDERS.
+        """
+        if order_by not in self.SEARCH_ORDERS:
+            raise ValueError(f"Cannot order search results by {order_by!r}")
+        raw = query.startswith('fts:')
+        words = query[4:].strip() if raw else query.split()
+        if not words:
+            raise ValueError("The search query has no words")
+        conditions, params = self._entry_conditions(min_words, max_words, min_points, min_comments)
+        if self.has_title_index():
+            source = 'entries_fts JOIN entries ON entries.id = entries_fts.rowid'
+            match = words if raw else ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+            conditions.insert(0, 'entries_fts MATCH ?')
+            params.insert(0, match)
+            relevance = 'bm25(entries_fts)'
+        else:
+            if raw:
+                raise ValueError("FTS5 query expressions need the full-text index")
+            source = 'entries'
+            for word in reversed(words):
+                escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.insert(0, "entries.title LIKE ? ESCAPE '\\'")
+                params.insert(0, f'%{escaped}%')
+            relevance = 'entries.id'
+        order = relevance if order_by == 'relevance' else f'entries.{order_by} DESC'
+        params.extend((-1 if limit is None else limit, offset))
+        return self._entries_cursor().execute(f'''
+            SELECT entries.rank, entries.title, entries.points, entries.comments,
+                   entries.item_id, entries.title_word_count
+            FROM {source}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order}, entries.id
+            LIMIT ? OFFSET ?
+        ''', params).fetchall()
+
+    @timed('database.rebuild_title_index')
+    def rebuild_title_index(self):
+        """
+        Creates the full-text index of titles if it is missing and rebuilds it from 'entries'.
+        
+        The index is kept in sync by triggers, so this is only needed for a database
+        migrated by a SQLite without FTS5, or to compact the index after many updates.
+        
+        Raises:
+        -------
+        sqlite3.OperationalError
+            If SQLite was built without the FTS5 module.
+        """
+        with self.conn:
+            self._create_title_index()
+            self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('optimize')")
+
+    @property
+    def generation(self):
+        """
+        The write generation: a value that changes whenever the stored data may have changed.
+        
+        It combines the number of rows changed through this connection, which
+        every insert, update and delete bumps, with SQLite's data_version, which
+        changes when another connection commits. Results computed at one
+        generation are still valid while it stays the same.
+        """
+        return self.conn.total_changes, self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    @timed('database.select_entries')
+    def select_entries(self, where='', params=(), order=(), limit=None, offset=0):
+        """
+        Fetches the entries that satisfy an SQL condition, in an SQL order.
+        
+        This is the execution step of crawler.query, which compiles its queries to
+        the condition and the order; every value must be passed in params.
+        
+        Parameters:
+        -----------
+        where : str, optional
+            The SQL condition over the 'entries' columns (default is '', every entry).
+        params : sequence, optional
+            The values of the condition's placeholders.
+        order : sequence of str, optional
+            The SQL sort keys, most significant first; ties keep the stored order.
+        limit : int, optional
+            The maximum number of entries to return (default is None, every entry).
+        offset : int, optional
+            The number of entries to skip (default is 0).
+        
+        Returns:
+        --------
+        list of Entry
+            The matching entries.
+        """
+        return self._entries_cursor().execute(f'''
+            SELECT rank, title, points, comments, item_id, title_word_count FROM entries
+            {f'WHERE {where}' if where else ''}
+            ORDER BY {', '.join(tuple(order) + ('entries.id',))}
+            LIMIT ? OFFSET ?
+        ''', (*params, -1 if limit is None else limit, offset)).fetchall()
+
+    @timed('database.save_frontier')
+    def save_frontier(self, name, state, queue, max_size):
+        """
+        Saves the state of a crawl frontier, replacing any previous save.
+        
+        Parameters:
+        -----------
+        name : str
+            The name of the frontier.
+        state : tuple
+            The Bloom filter state as (size, hashes, count, bits).
+        queue : iterable of tuple
+            The queued URLs as (url, depth, priority) tuples.
+        max_size : int
+            The maximum number of queued URLs.
+        """
+        size, hashes, count, bits = state
+        with self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO frontier_state (name, size, hashes, count, bits, max_size)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, size, hashes, count, sqlite3.Binary(bits), max_size))
+            self.conn.execute('DELETE FROM frontier_queue WHERE name = ?', (name,))
+            self.conn.executemany(
+                'INSERT INTO frontier_queue (name, url, depth, priority) VALUES (?, ?, ?, ?)',
+                ((name, url, depth, priority) for url, depth, priority in queue)
+            )
+
+    @timed('database.load_frontier')
+    def load_frontier(self, name):
+        """
+        Loads the state of a saved crawl frontier.
+        
+        Parameters:
+        -----------
+        name : str
+            The name of the frontier.
+        
+        Returns:
+        --------
+        tuple or None
+            (state, queue, max_size) in the format accepted by save_frontier,
+            or None when no frontier was saved under this name.
+        """
+        row = self.conn.execute(
+            'SELECT size, hashes, count, bits, max_size FROM frontier_state WHERE name = ?', (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        queue = self.conn.execute(
+            'SELECT url, depth, priority FROM frontier_queue WHERE name = ? ORDER BY rowid', (name,)
+        ).fetchall()
+        return row[:4], queue, row[4]
+
+    @timed('database.store_comments')
+    def store_comments(self, story_id, comments):
+        """
+        Replaces the comment thread of a story in a single transaction.
+        
+        The previous comments of the story are deleted, so comments removed since
+        the last crawl disappear, and the new ones are loaded with one executemany.
+        
+        Parameters:
+        -----------
+        story_id : int
+            The item id of the story.
+        comments : iterable of Comment
+            The comments of the story in display order, as returned by
+            crawler.parser.parse_comments.
+        
+        Returns:
+        --------
+        int
+            The number of stored comments.
+        """
+        rows = (
+            (comment.comment_id, story_id, comment.parent_id, comment.depth, position, comment.author,
+             comment.posted_at, comment.text)
+            for position, comment in enumerate(comments)
+        )
+        with self.conn:
+            self.conn.execute('DELETE FROM comments WHERE story_id = ?', (story_id,))
+            cursor = self.conn.executemany('''
+                INSERT OR REPLACE INTO comments (id, story_id, parent_id, depth, position, author, posted_at, text)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        return cursor.rowcount
+
+    @timed('database.fetch_thread')
+    def fetch_thread(self, root_id, max_depth=None):
+        """
+        Fetches the comments under a story or a comment, in display order.
+        
+        The tree is walked down from the root through the parent index with a
+        recursive CTE, so only the rows of the thread are read.
+        
+        Parameters:
+        -----------
+        root_id : int
+            The item id of a story (its whole thread) or of a comment (its replies).
+        max_depth : int, optional
+            The number of levels below the root to return: 1 returns the direct
+            replies only (default is None, every level).
+        
+        Returns:
+        --------
+        list of Comment
+            The comments, each reply after its parent, as they are displayed.
+        """
+        rows = self.conn.execute(f'''
+            WITH RECURSIVE thread (id, level) AS (
+                SELECT id, 1 FROM comments WHERE parent_id = :root
+                UNION ALL
+                SELECT comments.id, thread.level + 1
+                FROM comments JOIN thread ON comments.parent_id = thread.id
+                WHERE :max_depth IS NULL OR thread.level < :max_depth
+            )
+            SELECT {self.COMMENT_COLUMNS} FROM comments
+            WHERE id IN (SELECT id FROM thread)
+            ORDER BY position
+        ''', {'root': root_id, 'max_depth': max_depth}).fetchall()
+        return [Comment(*row) for row in rows]
+
+    @timed('database.fetch_ancestors')
+    def fetch_ancestors(self, comment_id):
+        """
+        Fetches the comments a comment replies to, from the top level down.
+        
+        Parameters:
+        -----------
+        comment_id : int
+            The item id of the comment.
+        
+        Returns:
+        --------
+        list of Comment
+            The chain of parents from the top-level comment to the comment's
+            parent; empty for a top-level or unknown comment.
+        """
+        rows = self.conn.execute(f'''
+            WITH RECURSIVE ancestors (id) AS (
+                SELECT parent_id FROM comments WHERE id = ?
+                UNION ALL
+                SELECT comments.parent_id FROM comments JOIN ancestors ON comments.id = ancestors.id
+            )
+            SELECT {self.COMMENT_COLUMNS} FROM comments
+            WHERE id IN (SELECT id FROM ancestors)
+            ORDER BY depth
+        ''', (comment_id,)).fetchall()
+        return [Comment(*row) for row in rows]
+
+    def iter_export(self, table, after=None, before=None, batch_size=1000):
+        """
+        Yields the rows of a table in export order, one batch at a time.
+        
+        Rows are ordered by their (time, id) key, which only grows as rows are
+        written, so an export can resume after the key of the last row it wrote.
+        
+        Parameters:
+        -----------
+        table : str
+            The table to read, a key of EXPORT_TABLES.
+        after : tuple, optional
+            Only rows with a key greater than this (time, id) key are read (default is None, from the start).
+        before : int or str, optional
+            Only rows whose time is less than this are read (default is None, no bound).
+        batch_size : int, optional
+            The number of rows read from SQLite per fetchmany call (default is 1000).
+        
+        Yields:
+        -------
+        tuple
+            (day, key, row): the 'YYYY-MM-DD' day of the row, its (time, id) key
+            and the values of the table's export columns.
+        
+        Raises:
+        -------
+        ValueError
+            If the table cannot be exported.
+        """
+        if table not in self.EXPORT_TABLES:
+            raise ValueError(f"Cannot export table {table!r}")
+        columns, (time_column, id_column), day = self.EXPORT_TABLES[table]
+        conditions, params = [], []
+        if after is not None:
+            conditions.append(f'({time_column}, {id_column}) > (?, ?)')
+            params.extend(after)
+        if before is not None:
+            conditions.append(f'{time_column} < ?')
+            params.append(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor = self.conn.execute(f'''
+            SELECT {day}, {time_column}, {id_column}, {', '.join(columns)} FROM {table}
+            {where}
+            ORDER BY {time_column}, {id_column}
+        ''', params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], row[1:3], row[3:]
+
+    def load_export_mark(self, name):
+        """
+        Returns the (time, id) key of the last row exported under a name, or None.
+        """
+        row = self.conn.execute('SELECT position FROM export_marks WHERE name = ?', (name,)).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def save_export_mark(self, name, position):
+        """
+        Records the (time, id) key of the last row exported under a name.
+        """
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO export_marks (name, position) VALUES (?, ?)',
+                              (name, json.dumps(list(position))))
+
+    @timed('database.prune_exported')
+    def prune_exported(self, table, position):
+        """
+        Deletes the rows of a table up to and including a (time, id) key.
+        
+        Returns:
+        --------
+        int
+            The number of deleted rows.
+        """
+        if table not in self.EXPORT_TABLES:
+            raise ValueError(f"Cannot export table {table!r}")
+        _, (time_column, id_column), _ = self.EXPORT_TABLES[table]
+        with self.conn:
+            return self.conn.execute(
+                f'DELETE FROM {table} WHERE ({time_column}, {id_column}) <= (?, ?)', tuple(position)
+            ).rowcount
+
+    @timed('database.vacuum')
+    def vacuum(self):
+        """
+        Rebuilds the database file to return the space of deleted rows to the file system.
+        """
+        self.conn.execute('VACUUM')
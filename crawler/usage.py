@@ -0,0 +1,272 @@
+"""
+This module defines the BufferedUsageLogger class, which writes usage events to
+the 'usage' table in batches from a background thread.
+
+Database.log_usage commits one transaction per event. At high event rates those
+tiny commits dominate the I/O and compete with the entry writes on the same
+connection. The buffered logger instead queues events in memory and a writer
+thread, with its own connection, inserts them with one executemany per batch:
+
+- a batch is written as soon as it holds max_batch events, or once the oldest
+  queued event has waited flush_interval seconds;
+- the queue is bounded: when it is full, new events are dropped and counted
+  rather than blocking the caller;
+- close() (also called on leaving the context manager and at interpreter exit
+  through atexit) writes every queued event before the thread stops.
+
+Classes:
+--------
+BufferedUsageLogger:
+    A usage logger that writes events in batches from a background thread.
+
+Usage:
+------
+Pass a BufferedUsageLogger to the Scraper, or use it directly as a context manager.
+
+Example:
+--------
+    from crawler.scraper import Scraper
+    from crawler.usage import BufferedUsageLogger
+
+    with BufferedUsageLogger('crawler.db', max_batch=500, flush_interval=1.0) as usage:
+        scraper = Scraper(usage_logger=usage)
+        scraper.scrape_and_store()
+    print(usage.stats)   # {'logged': 1, 'flushed': 1, 'dropped': 0, 'failed': 0, 'batches': 1}
+"""
+
+import atexit  # Import atexit to flush the queued events when the interpreter exits.
+import queue  # Import queue to hand events to the writer thread.
+import sqlite3  # Import sqlite3 to catch write errors.
+import threading  # Import threading to run the writer in the background.
+import time  # Import time to measure the flush interval.
+from datetime import datetime  # Import datetime to timestamp the events.
+from .metrics import REGISTRY  # Import the metrics registry to count flushed and dropped events.
+from .storage import Database  # Import the Database class the writer thread uses.
+
+_STOP = object()  # Queued by close() to stop the writer thread.
+
+
+class BufferedUsageLogger:
+    """
+    A usage logger that writes events in batches from a background thread.
+
+    Attributes:
+    -----------
+    stats : dict
+        The event counters: 'logged' (accepted into the queue), 'flushed' (written),
+        'dropped' (rejected because the queue was full or the logger closed),
+        'failed' (lost to a database error) and 'batches' (transactions committed).
+
+    Methods:
+    --------
+    __init__(db_path, max_batch=500, flush_interval=1.0, max_queue=100000):
+        Starts the writer thread.
+
+    log(filter_type, timestamp=None):
+        Queues a usage event without blocking.
+
+    flush(timeout=None):
+        Waits until every event queued so far is written.
+
+    close(timeout=None):
+        Writes the queued events and stops the writer thread.
+    """
+
+    def __init__(self, db_path, max_batch=500, flush_interval=1.0, max_queue=100000):
+        """
+        Starts the writer thread.
+
+        Parameters:
+        -----------
+        db_path : str
+            The path to the database file. The writer thread opens its own
+            connection, so an in-memory database would not be shared.
+        max_batch : int, optional
+            The number of events that triggers a write (default is 500).
+        flush_interval : float, optional
+            The longest time in seconds an event waits before it is written (default is 1.0).
+        max_queue : int, optional
+            The largest number of queued events; further events are dropped (default is 100000).
+
+        Raises:
+        -------
+        sqlite3.Error
+            If the writer thread cannot open the database.
+        """
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.stats = dict.fromkeys(('logged', 'flushed', 'dropped', 'failed', 'batches'), 0)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._ready = threading.Event()
+        self._startup_error = None
+        self._thread = threading.Thread(target=self._run, name='usage-logger', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            self._closed = True
+            self._thread.join()
+            raise self._startup_error
+        atexit.register(self.close)
+
+    def log(self, filter_type, timestamp=None):
+        """
+        Queues a usage event without blocking.
+
+        Parameters:
+        -----------
+        filter_type : str
+            The type of filter used during the event.
+        timestamp : str, optional
+            The time of the event in ISO format (default is now).
+
+        Returns:
+        --------
+        bool
+            True if the event was queued, False if it was dropped.
+        """
+        event = (timestamp or datetime.now().isoformat(), filter_type)
+        # Queued under the lock, so that no event can follow the _STOP queued by close().
+        with self._lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait(event)
+                except queue.Full:
+                    pass
+                else:
+                    self.stats['logged'] += 1
+                    return True
+            self.stats['dropped'] += 1
+        REGISTRY.increment('usage_events_dropped')
+        return False
+
+    def flush(self, timeout=None):
+        """
+        Waits until every event queued so far is written.
+
+        Returns:
+        --------
+        bool
+            True if the events were written within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        while True:
+            # Queued under the lock, like log(), so that the marker cannot follow the _STOP of close().
+            # The writer takes the lock too, so a full queue is retried outside it.
+            with self._lock:
+                queued = not self._closed
+                if queued:
+                    try:
+                        self._queue.put_nowait(done)
+                        break
+                    except queue.Full:
+                        pass
+            if not queued:
+                # close() writes every queued event before the writer stops.
+                self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+                return not self._thread.is_alive()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=None):
+        """
+        Writes the queued events and stops the writer thread; later events are dropped.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        # log() no longer queues events, so _STOP is the last item the writer reads.
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _count(self, name, amount):
+        """
+        Adds to one of the stats counters.
+        """
+        with self._lock:
+            self.stats[name] += amount
+
+    def _run(self):
+        """
+        Collects events into batches and writes them until close() is called.
+        """
+        try:
+            db = Database(self.db_path)
+        except Exception as error:  # Raised again by __init__.
+            self._startup_error = error
+            return
+        finally:
+            self._ready.set()
+        batch = []
+        waiters = []
+        deadline = None
+        stopping = False
+        try:
+            while not stopping:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None  # The oldest event has waited flush_interval.
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif item is not None:
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    if len(batch) < self.max_batch:
+                        continue
+                elif deadline is not None and time.monotonic() < deadline:
+                    continue
+                # Also take whatever else is already queued, up to a full batch.
+                while len(batch) < self.max_batch and not stopping:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                self._write(db, batch)
+                batch = []
+                deadline = None
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+        finally:
+            db.conn.close()
+
+    def _write(self, db, batch):
+        """
+        Writes one batch of events in a single transaction.
+        """
+        if not batch:
+            return
+        try:
+            db.log_usage_many(batch)
+        except sqlite3.Error:
+            self._count('failed', len(batch))
+            REGISTRY.increment('usage_events_failed', len(batch))
+            return
+        with self._lock:
+            self.stats['flushed'] += len(batch)
+            self.stats['batches'] += 1
+        REGISTRY.increment('usage_events_flushed', len(batch))
@@ -7,8 +7,16 @@ Modules:
 --------
 crawler.scraper:
     Contains the Scraper class for scraping and storing data.
+crawler.pipeline:
+    Contains the AsyncScraper class, which crawls through concurrent stages when --pipeline is given.
 crawler.filters:
     Contains the Filters class for filtering the scraped data.
+crawler.output:
+    Writes the filtered entries as a grid, JSON Lines or CSV.
+crawler.metrics:
+    Records per-stage counters and latency histograms when --metrics is given.
+crawler.profiling:
+    Wraps the run in a profiler when --profile is given.
 
 Libraries:
 ----------
@@ -18,67 +26,203 @@ tabulate:
 Usage:
 ------
 To run the web crawler and apply filters to the scraped data, execute this module directly.
+Without --filter, the filter type is asked interactively; with it, the run needs no
+input and can be scheduled. --skip-crawl only queries the stored entries: it opens the
+database directly and never imports the crawling stack (requests, bs4), so it starts
+quickly from scripts; tabulate is only imported for the grid format. The jsonl
+and csv formats stream rows from the database cursor as they are read. --search
+keeps the entries whose title contains the given words, using the full-text index.
+--pipeline fetches, parses and stores the pages in overlapping stages.
+--metrics writes the per-stage metrics as JSON, or in the Prometheus text format
+when the path ends in .prom; --profile writes a cProfile (or, with
+--profiler sampling, a collapsed-stack) profile of the whole run.
 
 Example:
 --------
     python main.py
+    python main.py --filter points --limit 20
+    python main.py --filter comments --skip-crawl --format jsonl > comments.jsonl
+    python main.py --filter points --pages 5 --format csv > points.csv
+    python main.py --filter points --pages 30 --pipeline
+    python main.py --filter comments --skip-crawl --search "rust async"
+    python main.py --filter points --metrics metrics.json --profile run.prof
+    python main.py --profile run.folded --profiler sampling
 """
 
-# Import Tabulate to create a table grid to print the results.
-from tabulate import tabulate
-# Import the Scraper and Filters classes from the crawler module.
-from crawler.scraper import Scraper
+# Import argparse to read the command-line options.
+import argparse
+# Import json to write the metrics snapshot.
+import json
+# Import os and sys to write to standard output and handle closed pipes.
+import os
+import sys
+# Import nullcontext to run without a profiler.
+from contextlib import nullcontext
+# Import datetime to timestamp the usage events.
+from datetime import datetime
+# Import the Filters and Database classes from the crawler module. The scrapers are
+# imported by run() only when it crawls, as requests takes longer to import than a query takes.
 from crawler.filters import Filters
+from crawler.storage import Database
+# Import the output writers.
+from crawler.output import FORMATS, STREAMING_FORMATS, write_rows
+# Import the metrics registry and the profiler wrapper.
+from crawler.metrics import REGISTRY
+from crawler.profiling import PROFILERS, profile
 
-def main():
+FILTER_TYPES = ('comments', 'points')
+
+
+def parse_args(argv=None):
+    """
+    Parses the command-line options.
+    """
+    parser = argparse.ArgumentParser(description='Scrape Hacker News and filter the stored entries.')
+    parser.add_argument('--filter', choices=FILTER_TYPES,
+                        help='the filter to apply (asked interactively when omitted)')
+    parser.add_argument('--limit', type=int, help='the maximum number of entries to output')
+    parser.add_argument('--pages', type=int, default=1, help='the number of listing pages to crawl (default 1)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='fetch, parse and store the pages in concurrent stages')
+    parser.add_argument('--comments', type=int, default=0, metavar='N',
+                        help='also crawl the comment threads of the N stored stories with the most points')
+    parser.add_argument('--skip-crawl', action='store_true', help='only query the entries already stored')
+    parser.add_argument('--format', choices=tuple(FORMATS), default='grid', help='the output format (default grid)')
+    parser.add_argument('--db', default='crawler.db', help='the SQLite database file (default crawler.db)')
+    parser.add_argument('--search', metavar='WORDS',
+                        help='only output the entries whose title contains every one of these words')
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help='rebuild the full-text index of titles before querying')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write per-stage metrics to PATH (Prometheus text if it ends in .prom, else JSON)')
+    parser.add_argument('--profile', metavar='PATH', help='profile the run and write the profile to PATH')
+    parser.add_argument('--profiler', choices=PROFILERS, default='cprofile', help='the profiler used by --profile')
+    args = parser.parse_args(argv)
+    if args.pages < 1:
+        parser.error('--pages must be at least 1')
+    if args.limit is not None and args.limit < 0:
+        parser.error('--limit must not be negative')
+    if args.comments < 0:
+        parser.error('--comments must not be negative')
+    return args
+
+
+def write_metrics(path):
+    """
+    Writes the recorded metrics to a file, in the format chosen by its extension.
+    """
+    with open(path, 'w') as handle:
+        if path.endswith('.prom'):
+            handle.write(REGISTRY.to_prometheus())
+        else:
+            json.dump(REGISTRY.snapshot(), handle, indent=2)
+
+
+def main(argv=None):
     """
     Main function to run the web crawler, apply filters, and display the results.
-    
-    This function initializes the Scraper class, scrapes data from a website, stores 
-    the data in a database, prompts the user to select a filter, applies the selected 
-    filter using the Filters class, and displays the filtered results in a table format.
+
+    Parses the command-line options, enables the metrics and the profiler when
+    they are requested, runs the crawler and writes the metrics.
 
     Parameters:
     -----------
-    None
+    argv : list of str, optional
+        The command-line arguments (default is sys.argv[1:]).
 
     Returns:
     --------
-    None
+    int
+        The exit status: 0 on success, 1 when --skip-crawl is given a missing database,
+        2 for an invalid filter type.
     """
-    # Initialize the scraper by creating an instance of the Scraper class.
-    scraper = Scraper()
-    
-    # Use the scraper to scrape the website and store the entries in the database.
-    scraper.scrape_and_store()
-    
-    # Fetch all the stored entries from the database.
-    entries = scraper.db.fetch_all_entries()
-    
-    # Prompt the user to enter the type of filter they want to apply (comments or points).
-    filter_type = input("Enter filter type (comments/points): ").strip()
+    args = parse_args(argv)
+    if args.metrics:
+        REGISTRY.enable()
+    try:
+        with profile(args.profile, args.profiler) if args.profile else nullcontext():
+            status = run(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); silence the flush at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        status = 0
+    if args.metrics:
+        write_metrics(args.metrics)
+    return status
+
+
+def run(args):
+    """
+    Runs the web crawler, applies the selected filter, and writes the results.
     
-    # Check which filter type the user selected and apply the corresponding filter.
-    if filter_type == 'comments':
-        # Filter the entries by the number of comments and log this action.
-        filtered_entries = Filters.filter_by_comments(entries)
-        scraper.log_usage('filter_by_comments')
-    elif filter_type == 'points':
-        # Filter the entries by the number of points and log this action.
-        filtered_entries = Filters.filter_by_points(entries)
-        scraper.log_usage('filter_by_points')
+    This function initializes the Scraper class, scrapes data from a website and
+    stores it in the database unless --skip-crawl is given (a query-only run opens
+    the database without importing the scrapers), applies the selected
+    filter using the Filters class, and writes the filtered results to standard
+    output in the selected format.
+
+    Parameters:
+    -----------
+    args : argparse.Namespace
+        The parsed command-line options.
+
+    Returns:
+    --------
+    int
+        The exit status.
+    """
+    if args.skip_crawl:
+        # Query-only runs read the existing entries and never import the crawling stack.
+        if not os.path.exists(args.db):
+            # Opening a mistyped path would create an empty database and report no entries.
+            print(f"Database not found: {args.db}", file=sys.stderr)
+            return 1
+        db = Database(args.db)
     else:
+        # Initialize the scraper by creating an instance of the Scraper class.
+        if args.pipeline:
+            from crawler.pipeline import AsyncScraper as Scraper
+        else:
+            from crawler.scraper import Scraper
+        scraper = Scraper(db_path=args.db)
+        # Use the scraper to scrape the website and store the entries in the database.
+        scraper.scrape_and_store(pages=args.pages)
+        if args.comments:
+            scraper.scrape_comments(top=args.comments)
+        db = scraper.db
+    
+    # Without --filter, prompt the user to enter the type of filter they want to apply.
+    filter_type = args.filter or input("Enter filter type (comments/points): ").strip()
+    if filter_type not in FILTER_TYPES:
         # If the user enters an invalid filter type, print an error message and exit.
         print("Invalid filter type.")
-        return
-    
-    # Define the headers for the table
-    headers = ["Number", "Title", "Points", "Comments"]
+        return 2
+
+    if args.rebuild_index:
+        db.rebuild_title_index()
+    if args.search:
+        # Same word count criteria and order as the filter, matched in the full-text index.
+        if filter_type == 'comments':
+            words = {'min_words': Filters.TITLE_WORDS + 1}
+        else:
+            words = {'max_words': Filters.TITLE_WORDS}
+        filtered_entries = db.search_titles(args.search, order_by=filter_type, limit=args.limit, **words)
+    elif args.format in STREAMING_FORMATS:
+        # The streaming formats read rows from the database cursor as they are written;
+        # the grid needs every row up front to size its columns.
+        select = Filters.stream_by_comments if filter_type == 'comments' else Filters.stream_by_points
+        filtered_entries = select(db, limit=args.limit)
+    else:
+        select = Filters.filter_by_comments if filter_type == 'comments' else Filters.filter_by_points
+        filtered_entries = select(db, limit=args.limit)
+    db.log_usage(datetime.now().isoformat(), f'filter_by_{filter_type}')
 
-    # Print out each of the filtered entries using library tabulate to turn it into a table grid.  
-    print(tabulate(filtered_entries, headers=headers, tablefmt="grid"))
+    # Write the filtered entries in the selected format.
+    with REGISTRY.timer('main.render'):
+        write_rows(filtered_entries, args.format, sys.stdout)
+    return 0
 
 # Check if this script is being run directly (as opposed to being imported).
 if __name__ == '__main__':
-    # If so, call the main function to run the script.
-    main()
\ No newline at end of file
+    # If so, call the main function to run the script and exit with its status.
+    sys.exit(main())
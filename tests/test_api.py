@@ -0,0 +1,201 @@
+"""
+This module contains unit tests for the crawler.api module.
+
+Classes:
+--------
+TestApi:
+    A class that contains test cases for the read-only JSON API.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_api
+"""
+
+import http.client  # Import http.client to send requests to the server
+import json  # Import json to read the responses
+import os  # Import os to remove the temporary database
+import shutil  # Import shutil to remove the temporary directory
+import sqlite3  # Import sqlite3 to check the error of a missing database
+import tempfile  # Import tempfile to create a database shared by several connections
+import threading  # Import threading to run concurrent clients
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to count the database reads
+from crawler.api import ApiServer  # Import the class under test
+from crawler.entry import Entry  # Import the Entry record to build the stored rows
+from crawler.filters import Filters  # Import the Filters class to compare the views
+from crawler.storage import Database  # Import the Database class to write entries
+
+ENTRIES = [
+    Entry(rank, f'Story {rank} about rust and other things' if rank % 2 else f'Python {rank}', rank * 10,
+          (rank * 7) % 40, 100 + rank)
+    for rank in range(1, 41)
+]
+
+
+class TestApi(unittest.TestCase):
+    """
+    A test case class that contains test cases for the read-only JSON API.
+
+    Methods:
+    --------
+    setUp():
+        Stores the entries in a temporary database and starts a server.
+
+    tearDown():
+        Stops the server and removes the temporary directory.
+
+    test_views_and_paging():
+        Tests the filtered views, the entries query, paging and the errors.
+
+    test_etag_and_invalidation():
+        Tests that repeated requests are cached, revalidated with 304 and invalidated by writes.
+
+    test_concurrent_clients():
+        Tests that concurrent clients are served while the crawler writes.
+
+    test_never_writes_to_database():
+        Tests that the server neither creates a missing database nor changes an existing one.
+    """
+
+    def setUp(self):
+        """
+        Stores the entries in a temporary database and starts a server.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'crawler.db')
+        self.db = Database(self.path)
+        self.db.insert_entries(ENTRIES)
+        self.server = ApiServer(self.path, port=0, workers=4, cache_size=8).start()
+
+    def tearDown(self):
+        """
+        Stops the server and removes the temporary directory.
+        """
+        self.server.stop()
+        self.db.conn.close()
+        shutil.rmtree(self.directory)
+
+    def get(self, path, headers=None):
+        """
+        Sends a GET request and returns the response status, ETag and decoded body.
+        """
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.httpd.server_address[1], timeout=10)
+        try:
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+            return response.status, response.getheader('ETag'), json.loads(body) if body else None
+        finally:
+            connection.close()
+
+    def test_views_and_paging(self):
+        """
+        Tests the filtered views, the entries query, paging and the errors.
+        """
+        status, _, page = self.get('/filters/comments?limit=5&offset=5')
+        self.assertEqual(status, 200)
+        expected = Filters.filter_by_comments(ENTRIES, limit=5, offset=5)
+        self.assertEqual([item['item_id'] for item in page['items']], [entry.item_id for entry in expected])
+        self.assertEqual((page['limit'], page['offset'], page['next_offset']), (5, 5, 10))
+
+        _, _, page = self.get('/filters/points?offset=15')
+        self.assertEqual(len(page['items']), 5, "Only the 20 short titles are in the points view")
+        self.assertIsNone(page['next_offset'])
+
+        _, _, page = self.get('/entries?q=RUST&min_points=300&order=-comments&limit=3')
+        matching = [entry for entry in ENTRIES if entry.rank % 2 and entry.points >= 300]
+        expected = sorted(matching, key=lambda entry: entry.comments, reverse=True)[:3]
+        self.assertEqual([item['rank'] for item in page['items']], [entry.rank for entry in expected])
+        _, _, page = self.get('/entries/')
+        self.assertEqual([item['rank'] for item in page['items']], list(range(1, 31)))
+
+        for path, status in [('/entries?limit=0', 400), ('/entries?offset=x', 400), ('/entries?order=id', 400),
+                             ('/filters/titles', 404), ('/', 404)]:
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[0], status)
+                self.assertIn('error', self.get(path)[2])
+
+    def test_etag_and_invalidation(self):
+        """
+        Tests that repeated requests are cached, revalidated with 304 and invalidated by writes.
+        """
+        reader = self.server.connections.reader
+        with mock.patch.object(self.server.connections, 'reader', side_effect=reader) as reads:
+            status, etag, first = self.get('/filters/comments?limit=3')
+            self.assertEqual(self.get('/filters/comments?offset=0&limit=3')[1:], (etag, first))
+            self.assertEqual(self.get('/filters/comments?limit=3', {'If-None-Match': etag}), (304, etag, None))
+            self.assertEqual(self.get('/filters/comments?limit=3', {'If-None-Match': 'W/' + etag})[0], 304)
+            self.assertEqual(reads.call_count, 1, "Equal requests are answered from the cache")
+
+            # Equivalent queries share one normalized key.
+            self.get('/entries?min_points=100&max_words=4')
+            self.get('/entries?max_words=4&min_points=100&order=rank')
+            self.assertEqual(reads.call_count, 2)
+
+            self.db.insert_entries([Entry(41, 'A new story with a great many comments', 5, 900, 141)])
+            status, new_etag, page = self.get('/filters/comments?limit=3', {'If-None-Match': etag})
+            self.assertEqual(status, 200, "A write invalidates the cached response")
+            self.assertNotEqual(new_etag, etag)
+            self.assertEqual(page['items'][0]['item_id'], 141)
+            self.assertEqual(reads.call_count, 3)
+
+            for offset in range(10):
+                self.get(f'/filters/points?limit=1&offset={offset}')
+        self.assertEqual(len(self.server._cache), 8, "The least recently used responses are evicted")
+
+    def test_concurrent_clients(self):
+        """
+        Tests that concurrent clients are served while the crawler writes.
+        """
+        errors = []
+        paths = ['/filters/comments?limit=10', '/filters/points?limit=10', '/entries?q=python&order=-points']
+
+        def poll(number):
+            connection = http.client.HTTPConnection('127.0.0.1', self.server.httpd.server_address[1], timeout=10)
+            try:
+                for index in range(30):
+                    connection.request('GET', paths[(number + index) % len(paths)])
+                    response = connection.getresponse()
+                    items = json.loads(response.read())['items']
+                    if response.status != 200 or not items:
+                        errors.append((response.status, items))
+            except Exception as error:  # Reported by the main thread.
+                errors.append(error)
+            finally:
+                connection.close()
+
+        clients = [threading.Thread(target=poll, args=(number,)) for number in range(8)]
+        for client in clients:
+            client.start()
+        for batch in range(20):
+            self.db.insert_entries([Entry(rank, f'Python {rank} again', rank, batch, 200 + rank)
+                                    for rank in range(1, 11)])
+        for client in clients:
+            client.join()
+        self.assertEqual(errors, [])
+
+    def test_never_writes_to_database(self):
+        """
+        Tests that the server neither creates a missing database nor changes an existing one.
+        """
+        missing = os.path.join(self.directory, 'missing.db')
+        with self.assertRaises(sqlite3.OperationalError):
+            ApiServer(missing, port=0)
+        self.assertFalse(os.path.exists(missing))
+
+        journal_mode = self.db.conn.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertNotEqual(journal_mode, 'wal')
+        self.assertEqual(self.get('/entries?limit=1')[0], 200)
+        self.assertEqual(self.db.conn.execute('PRAGMA journal_mode').fetchone()[0], journal_mode,
+                         "The journal mode belongs to the crawler")
+        with self.assertRaises(RuntimeError):
+            with self.server.connections.writer():
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
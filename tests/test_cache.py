@@ -0,0 +1,224 @@
+"""
+This module contains unit tests for the ResponseCache class from the crawler.cache module.
+It replaces the HTTP layer with a stub that records the request headers and replays
+canned responses.
+
+Classes:
+--------
+TestResponseCache:
+    A class that contains test cases for the ResponseCache class.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_cache
+"""
+
+import os  # Import the os module to remove the cache file
+import sqlite3  # Import sqlite3 to fail a database write
+import tempfile  # Import tempfile to place the cache file outside the repository
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to build canned responses
+from crawler.cache import ResponseCache  # Import the ResponseCache class under test
+from crawler.entry import Entry  # Import the Entry record the scraper stores
+from crawler.scraper import Scraper  # Import the Scraper class to test the integration
+
+URL = 'https://news.ycombinator.com/'
+
+
+def response(status_code, body=b'', headers=None):
+    """
+    Builds a canned requests.Response-like object.
+    """
+    return mock.Mock(status_code=status_code, content=body, text=body.decode(), headers=headers or {})
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    A test case class that contains test cases for the ResponseCache class.
+
+    Methods:
+    --------
+    setUp():
+        Creates a cache in a temporary file.
+
+    tearDown():
+        Closes and removes the cache file.
+
+    test_conditional_request_and_304():
+        Tests that validators are sent back and a 304 is a hit.
+
+    test_identical_body_is_unchanged():
+        Tests that a 200 with the same body hash is a hit.
+
+    test_ttl():
+        Tests that a fresh page is not requested and per-URL TTLs apply.
+
+    test_scraper_skips_unchanged_pages():
+        Tests that the scraper neither parses nor stores an unchanged page.
+
+    test_uncommitted_page_is_fetched_again():
+        Tests that a page is only cached once it has been committed.
+
+    test_error_responses_are_not_cached():
+        Tests that error responses are neither returned nor cached.
+
+    test_failed_store_refetches_page():
+        Tests that a page whose entries could not be stored is parsed again on the next crawl.
+
+    test_fetch_and_parse_commits_pages():
+        Tests that pages parsed by fetch_and_parse are reported unchanged on the next fetch.
+    """
+
+    def setUp(self):
+        """
+        Creates a cache in a temporary file.
+        """
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.cache = ResponseCache(self.path, ttl=0)
+        self.headers = []
+
+    def tearDown(self):
+        """
+        Closes and removes the cache file.
+        """
+        self.cache.close()
+        os.remove(self.path)
+
+    def replay(self, *responses):
+        """
+        Returns a request function that records headers and replays the responses.
+        """
+        queue = list(responses)
+
+        def request(url, headers):
+            self.headers.append(headers)
+            return queue.pop(0)
+        return request
+
+    def test_conditional_request_and_304(self):
+        """
+        Tests that validators are sent back and a 304 is a hit.
+        """
+        request = self.replay(
+            response(200, b'<html>v1</html>', {'ETag': '"abc"', 'Last-Modified': 'Sat, 17 Oct 2026 10:00:00 GMT'}),
+            response(304),
+        )
+        self.assertEqual(self.cache.fetch(URL, request), '<html>v1</html>')
+        self.cache.commit(URL)
+        self.assertIsNone(self.cache.fetch(URL, request), "A 304 should report the page unchanged")
+        self.assertEqual(self.headers[0], {})
+        self.assertEqual(self.headers[1], {'If-None-Match': '"abc"', 'If-Modified-Since': 'Sat, 17 Oct 2026 10:00:00 GMT'})
+        self.assertEqual(self.cache.stats['misses'], 1)
+        self.assertEqual(self.cache.stats['not_modified'], 1)
+        self.assertEqual(self.cache.stats['bytes_saved'], len(b'<html>v1</html>'))
+
+    def test_identical_body_is_unchanged(self):
+        """
+        Tests that a 200 with the same body hash is a hit.
+        """
+        request = self.replay(response(200, b'same'), response(200, b'same'), response(200, b'changed'))
+        self.assertEqual(self.cache.fetch(URL, request), 'same')
+        self.cache.commit(URL)
+        self.assertIsNone(self.cache.fetch(URL, request))
+        self.assertEqual(self.cache.fetch(URL, request), 'changed')
+        self.assertEqual((self.cache.stats['hits'], self.cache.stats['misses']), (1, 2))
+
+    def test_ttl(self):
+        """
+        Tests that a fresh page is not requested and per-URL TTLs apply.
+        """
+        self.cache.ttl = 3600
+        self.cache.ttls = {URL + 'newest': 0}
+        request = self.replay(response(200, b'front'), response(200, b'newest'), response(200, b'newest 2'))
+        self.cache.fetch(URL, request)
+        self.cache.commit(URL)
+        self.assertIsNone(self.cache.fetch(URL, request), "A fresh page should not be requested")
+        self.cache.fetch(URL + 'newest', request)
+        self.cache.commit(URL + 'newest')
+        self.assertEqual(self.cache.fetch(URL + 'newest', request), 'newest 2')
+        self.assertEqual(len(self.headers), 3)
+        self.assertEqual(self.cache.stats['fresh'], 1)
+
+    def test_scraper_skips_unchanged_pages(self):
+        """
+        Tests that the scraper neither parses nor stores an unchanged page.
+        """
+        scraper = Scraper(db_path=':memory:', cache=self.cache)
+        page = (
+            '<tr class="athing" id="7"><td><span class="rank">1.</span></td>'
+            '<td><span class="titleline"><a href="a">Cached story</a></span></td></tr>'
+        ).encode()
+        with mock.patch.object(scraper.session, 'get', side_effect=[response(200, page), response(304)]), \
+                mock.patch.object(scraper, 'parse_entries', wraps=scraper.parse_entries) as parse, \
+                mock.patch.object(scraper.db, 'insert_entries', wraps=scraper.db.insert_entries) as insert:
+            scraper.scrape_and_store()
+            scraper.scrape_and_store()
+        self.assertEqual(parse.call_count, 1, "The unchanged page should not be parsed")
+        self.assertEqual(insert.call_count, 1, "The unchanged page should not be stored")
+        self.assertEqual(scraper.db.fetch_all_entries(), [Entry(1, 'Cached story', 0, 0, 7)])
+
+    def test_uncommitted_page_is_fetched_again(self):
+        """
+        Tests that a page is only cached once it has been committed.
+        """
+        self.cache.ttl = 3600
+        request = self.replay(response(200, b'v1', {'ETag': '"v1"'}), response(200, b'v1', {'ETag': '"v1"'}))
+        self.assertEqual(self.cache.fetch(URL, request), 'v1')
+        self.assertEqual(self.cache.fetch(URL, request), 'v1', "An uncommitted page is not fresh")
+        self.assertEqual(self.headers[1], {}, "Nor are its validators sent")
+        self.cache.commit(URL)
+        self.cache.commit(URL)
+        self.assertIsNone(self.cache.fetch(URL, request))
+        self.assertEqual(len(self.headers), 2)
+
+    def test_error_responses_are_not_cached(self):
+        """
+        Tests that error responses are neither returned nor cached.
+        """
+        request = self.replay(response(503, b'overloaded'), response(404, b'not found'), response(200, b'back'))
+        self.assertIsNone(self.cache.fetch(URL, request))
+        self.cache.commit(URL)
+        self.assertIsNone(self.cache.fetch(URL, request))
+        self.assertEqual(self.cache.fetch(URL, request), 'back')
+        self.assertEqual(self.cache.stats['errors'], 2)
+        self.assertEqual(self.headers, [{}, {}, {}])
+
+    def test_failed_store_refetches_page(self):
+        """
+        Tests that a page whose entries could not be stored is parsed again on the next crawl.
+        """
+        scraper = Scraper(db_path=':memory:', cache=self.cache)
+        page = (
+            '<tr class="athing" id="7"><td><span class="rank">1.</span></td>'
+            '<td><span class="titleline"><a href="a">Cached story</a></span></td></tr>'
+        ).encode()
+        with mock.patch.object(scraper.session, 'get', side_effect=[response(200, page, {'ETag': '"7"'})] * 2):
+            with mock.patch.object(scraper.db, 'insert_entries', side_effect=sqlite3.OperationalError('locked')):
+                with self.assertRaises(sqlite3.OperationalError):
+                    scraper.scrape_and_store()
+            scraper.scrape_and_store()
+        self.assertEqual(scraper.db.fetch_all_entries(), [Entry(1, 'Cached story', 0, 0, 7)])
+
+    def test_fetch_and_parse_commits_pages(self):
+        """
+        Tests that pages parsed by fetch_and_parse are reported unchanged on the next fetch.
+        """
+        scraper = Scraper(db_path=':memory:', cache=self.cache, parse_workers=0)
+        page = (
+            '<tr class="athing" id="7"><td><span class="rank">1.</span></td>'
+            '<td><span class="titleline"><a href="a">Cached story</a></span></td></tr>'
+        ).encode()
+        with mock.patch.object(scraper.session, 'get', side_effect=[response(200, page, {'ETag': '"7"'}),
+                                                                    response(304)]):
+            self.assertEqual(scraper.fetch_and_parse([URL]), [[Entry(1, 'Cached story', 0, 0, 7)]])
+            self.assertEqual(scraper.fetch_and_parse([URL]), [[]], "The parsed page should be committed")
+        self.assertEqual(self.cache._pending, {})
+        self.assertEqual(self.cache.stats['not_modified'], 1)
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
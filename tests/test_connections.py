@@ -0,0 +1,164 @@
+"""
+This module contains unit tests for the crawler.connections module, including a
+stress test of many concurrent readers during bulk inserts.
+
+Classes:
+--------
+TestConnections:
+    A class that contains test cases for the connection manager.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_connections
+"""
+
+import shutil  # Import shutil to remove the temporary directory
+import sqlite3  # Import sqlite3 to check that readers cannot write
+import tempfile  # Import tempfile to create a temporary database
+import threading  # Import threading to run the concurrent readers and writer
+import time  # Import time to measure how long readers wait
+import unittest  # Import the unittest module for creating and running tests
+from pathlib import Path  # Import Path to build the database path
+from crawler.connections import ConnectionManager  # Import the class under test
+from crawler.entry import Entry  # Import the Entry record to build the inserted rows
+
+
+class TestConnections(unittest.TestCase):
+    """
+    A test case class that contains test cases for the connection manager.
+
+    Methods:
+    --------
+    setUp():
+        Creates a temporary directory for the database.
+
+    tearDown():
+        Removes the temporary directory.
+
+    test_readers_do_not_block_on_open_write():
+        Tests that a reader answers at once, from the last commit, while a write transaction is open.
+
+    test_concurrent_readers_during_bulk_inserts():
+        Tests that many readers only ever see whole committed batches while a writer inserts.
+
+    test_reader_pool_is_bounded():
+        Tests that a reader waits for an idle connection and times out.
+
+    test_readers_are_read_only():
+        Tests that reader connections reject writes and in-memory databases are rejected.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory for the database.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = str(Path(self.directory) / 'crawler.db')
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def batch(start, size):
+        """
+        Returns `size` entries with item ids from `start`.
+        """
+        return [Entry(rank, f'Story number {rank}', rank % 500, rank % 70, rank) for rank in range(start, start + size)]
+
+    def test_readers_do_not_block_on_open_write(self):
+        """
+        Tests that a reader answers at once, from the last commit, while a write transaction is open.
+        """
+        with ConnectionManager(self.path, readers=2, timeout=5) as manager:
+            with manager.writer() as db:
+                db.insert_entries(self.batch(1, 10))
+                db.conn.execute('BEGIN IMMEDIATE')
+                db.conn.executemany(db.UPSERT_ENTRY, self.batch(11, 1000))
+                start = time.monotonic()
+                with manager.reader() as reader:
+                    self.assertEqual(len(reader.fetch_all_entries()), 10, "Uncommitted rows should be invisible")
+                self.assertLess(time.monotonic() - start, 1, "The reader should not wait for the writer")
+                db.conn.commit()
+            with manager.reader() as reader:
+                self.assertEqual(len(reader.fetch_all_entries()), 1010)
+
+    def test_concurrent_readers_during_bulk_inserts(self):
+        """
+        Tests that many readers only ever see whole committed batches while a writer inserts.
+        """
+        batches, size, threads = 40, 500, 12
+        errors = []
+        counts = [[] for _ in range(threads)]
+        done = threading.Event()
+
+        with ConnectionManager(self.path, readers=4, timeout=5) as manager:
+            def write():
+                try:
+                    for number in range(batches):
+                        with manager.writer() as db:
+                            db.insert_entries(self.batch(number * size + 1, size))
+                except Exception as error:  # Reported by the main thread.
+                    errors.append(error)
+                finally:
+                    done.set()
+
+            def read(seen):
+                try:
+                    while not done.is_set():
+                        with manager.reader(timeout=5) as db:
+                            seen.append(db.conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0])
+                            db.fetch_entries_by('points', min_words=3, limit=5)
+                except Exception as error:  # Reported by the main thread.
+                    errors.append(error)
+
+            workers = [threading.Thread(target=read, args=(seen,)) for seen in counts]
+            workers.append(threading.Thread(target=write))
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(60)
+
+            self.assertEqual(errors, [])
+            for seen in counts:
+                self.assertTrue(seen, "Every reader should complete reads during the inserts")
+                self.assertEqual(seen, sorted(seen), "A reader should never go back in time")
+                self.assertTrue(all(count % size == 0 for count in seen), "Batches should be seen whole or not at all")
+            with manager.reader() as db:
+                self.assertEqual(len(db.fetch_all_entries()), batches * size)
+
+    def test_reader_pool_is_bounded(self):
+        """
+        Tests that a reader waits for an idle connection and times out.
+        """
+        with ConnectionManager(self.path, readers=1) as manager:
+            with manager.reader():
+                with self.assertRaises(TimeoutError):
+                    with manager.reader(timeout=0.05):
+                        pass
+            with manager.reader(timeout=0.05) as db:
+                self.assertEqual(db.fetch_all_entries(), [])
+
+    def test_readers_are_read_only(self):
+        """
+        Tests that reader connections reject writes and in-memory databases are rejected.
+        """
+        with ConnectionManager(self.path, readers=1) as manager:
+            with manager.reader() as db:
+                with self.assertRaises(sqlite3.OperationalError):
+                    db.insert_entries(self.batch(1, 1))
+            with manager.writer() as db:
+                journal_mode = db.conn.execute('PRAGMA journal_mode').fetchone()[0]
+            self.assertEqual(journal_mode, 'wal')
+        with self.assertRaises(ValueError):
+            ConnectionManager(':memory:')
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
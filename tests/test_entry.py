@@ -0,0 +1,76 @@
+"""
+This module contains unit tests for the Entry record from the crawler.entry module.
+
+Classes:
+--------
+TestEntry:
+    A class that contains test cases for the Entry record.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_entry
+"""
+
+import pickle  # Import pickle to check that entries cross process boundaries
+import unittest  # Import the unittest module for creating and running tests
+from crawler.entry import Entry, to_rank  # Import the record and helpers under test
+
+
+class TestEntry(unittest.TestCase):
+    """
+    A test case class that contains test cases for the Entry record.
+
+    Methods:
+    --------
+    test_fields_and_word_count():
+        Tests the fields of an entry and its cached title word count.
+
+    test_tuple_compatibility():
+        Tests that entries index, unpack, slice and pickle like tuples.
+
+    test_from_tuple():
+        Tests the conversion of legacy tuples with string ranks.
+    """
+
+    def test_fields_and_word_count(self):
+        """
+        Tests the fields of an entry and its cached title word count.
+        """
+        entry = Entry(3, 'Show HN: A tiny database', 120, 45, 41000001)
+        self.assertEqual((entry.rank, entry.points, entry.comments, entry.item_id), (3, 120, 45, 41000001))
+        self.assertEqual(entry.word_count, 5)
+        self.assertEqual(entry.number, '3')
+        self.assertEqual(Entry(1, 'Untitled').word_count, 1)
+        self.assertEqual(Entry(1, '').word_count, 0)
+        self.assertEqual(Entry(1, 'a b', word_count=9).word_count, 9, "A given count should not be recomputed")
+        with self.assertRaises(AttributeError):
+            entry.extra = 1  # No per-instance dict.
+
+    def test_tuple_compatibility(self):
+        """
+        Tests that entries index, unpack, slice and pickle like tuples.
+        """
+        entry = Entry(7, 'Seven words in this title right here', 10, 2, 99)
+        self.assertIsInstance(entry, tuple)
+        self.assertEqual((entry[0], entry[1], entry[2], entry[3], entry[4]), (7, entry.title, 10, 2, 99))
+        rank, title, points, comments = entry[:4]
+        self.assertEqual((rank, points, comments), (7, 10, 2))
+        self.assertEqual(pickle.loads(pickle.dumps(entry)), entry)
+        self.assertEqual(sorted([Entry(10, 'b'), Entry(9, 'a')])[0].rank, 9, "Ranks should sort numerically")
+
+    def test_from_tuple(self):
+        """
+        Tests the conversion of legacy tuples with string ranks.
+        """
+        self.assertEqual(Entry.from_tuple(('12', 'Legacy title', 5, 1)), Entry(12, 'Legacy title', 5, 1))
+        self.assertEqual(Entry.from_tuple(('3.', 'With id', 5, 1, 77)).item_id, 77)
+        entry = Entry(1, 'Already an entry')
+        self.assertIs(Entry.from_tuple(entry), entry)
+        self.assertEqual([to_rank(value) for value in ('4', ' 5. ', 6, '', None)], [4, 5, 6, 0, 0])
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
@@ -0,0 +1,211 @@
+"""
+This module contains unit tests for the crawler.export module.
+
+Classes:
+--------
+TestExport:
+    A class that contains test cases for the archival export.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_export
+"""
+
+import csv  # Import csv to read the exported CSV files
+import gzip  # Import gzip to read the compressed files
+import json  # Import json to read the exported JSON Lines
+import os  # Import os to list the exported files
+import shutil  # Import shutil to remove the temporary directory
+import tempfile  # Import tempfile to export outside the repository
+import time  # Import time to place the export after the inserts
+import unittest  # Import the unittest module for creating and running tests
+from datetime import datetime  # Import datetime to timestamp a usage event in local time
+from unittest import mock  # Import mock to interrupt an export
+from crawler.entry import Entry  # Import the Entry record to build the stored rows
+from crawler.export import Exporter, main  # Import the exporter and command line under test
+from crawler.storage import Database  # Import the Database class to hold the rows
+
+USAGE = [
+    ('2024-05-01T09:00:00', 'filter_by_points'),
+    ('2024-05-01T23:59:59', 'filter_by_comments'),
+    ('2024-05-02T00:00:01', 'filter_by_points'),
+    ('2024-05-03T12:00:00', 'filter_by_points'),
+    ('2024-05-03T12:30:00', 'filter_by_comments'),
+]
+
+
+class TestExport(unittest.TestCase):
+    """
+    A test case class that contains test cases for the archival export.
+
+    Methods:
+    --------
+    setUp():
+        Creates a database with entries and usage rows and an output directory.
+
+    tearDown():
+        Removes the temporary directory.
+
+    test_day_partitions():
+        Tests that rows are written to compressed per-day part files in key order.
+
+    test_resume_after_mark():
+        Tests that a second export only writes the rows added since the first.
+
+    test_interrupted_export_resumes():
+        Tests that an interrupted export leaves no partial file and resumes after the last complete one.
+
+    test_prune_and_vacuum():
+        Tests that exported rows are deleted and unsettled rows kept.
+
+    test_xlsx_and_command_line():
+        Tests the XLSX format through the command line.
+
+    test_tables_share_local_days():
+        Tests that entries and usage rows written at the same moment go to the same day.
+    """
+
+    def setUp(self):
+        """
+        Creates a database with entries and usage rows and an output directory.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'crawler.db')
+        self.output = os.path.join(self.directory, 'archive')
+        self.db = Database(self.path)
+        self.db.log_usage_many(USAGE)
+        self.db.insert_entries([Entry(rank, f'Story {rank}', rank * 10, rank, 100 + rank) for rank in range(1, 8)])
+        with self.db.conn:  # The entries were crawled two hours ago.
+            self.db.conn.execute('UPDATE entries SET updated_at = updated_at - 7200')
+        self.later = time.time() + 3600  # Everything written so far has settled an hour later.
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+        """
+        self.db.conn.close()
+        shutil.rmtree(self.directory)
+
+    def read_jsonl(self, path):
+        """
+        Returns the objects of a gzip-compressed JSON Lines file.
+        """
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_day_partitions(self):
+        """
+        Tests that rows are written to compressed per-day part files in key order.
+        """
+        results = Exporter(self.db, self.output, rows_per_file=1).export(tables=('usage',), now=self.later)
+        files = [os.path.relpath(path, self.output) for path in results['usage']['files']]
+        self.assertEqual(files, [
+            os.path.join('usage', '2024-05-01', 'part-00000.jsonl.gz'),
+            os.path.join('usage', '2024-05-01', 'part-00001.jsonl.gz'),
+            os.path.join('usage', '2024-05-02', 'part-00000.jsonl.gz'),
+            os.path.join('usage', '2024-05-03', 'part-00000.jsonl.gz'),
+            os.path.join('usage', '2024-05-03', 'part-00001.jsonl.gz'),
+        ])
+        rows = [row for path in results['usage']['files'] for row in self.read_jsonl(path)]
+        self.assertEqual([(row['timestamp'], row['filter_type']) for row in rows], USAGE)
+
+        results = Exporter(self.db, self.output, format='csv').export(tables=('entries',), now=self.later)
+        with gzip.open(results['entries']['files'][0], 'rt', encoding='utf-8') as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], list(Database.EXPORT_TABLES['entries'][0]))
+        self.assertEqual([row[2] for row in rows[1:]], [f'Story {rank}' for rank in range(1, 8)])
+
+    def test_resume_after_mark(self):
+        """
+        Tests that a second export only writes the rows added since the first.
+        """
+        exporter = Exporter(self.db, self.output)
+        first = exporter.export()
+        self.assertEqual((first['entries']['rows'], first['usage']['rows']), (7, 5))
+        self.db.log_usage_many([('2024-05-04T08:00:00', 'filter_by_points')])
+        self.db.insert_entries([Entry(1, 'Story 1, updated', 15, 2, 101)])
+        second = exporter.export(now=self.later)
+        self.assertEqual((second['entries']['rows'], second['usage']['rows']), (1, 1))
+        self.assertEqual(self.read_jsonl(second['entries']['files'][0])[0]['title'], 'Story 1, updated')
+        self.assertEqual(exporter.export(now=self.later)['usage'], {'rows': 0, 'files': [], 'pruned': 0})
+        other = Exporter(self.db, os.path.join(self.directory, 'other'), name='other').export(now=self.later)
+        self.assertEqual(other['usage']['rows'], 6, "Each export name keeps its own mark")
+
+    def test_interrupted_export_resumes(self):
+        """
+        Tests that an interrupted export leaves no partial file and resumes after the last complete one.
+        """
+        exporter = Exporter(self.db, self.output, rows_per_file=2)
+        save = self.db.save_export_mark
+        outcomes = iter([save, OSError('disk full')])
+
+        def save_then_fail(name, position):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            outcome(name, position)
+
+        with mock.patch.object(self.db, 'save_export_mark', side_effect=save_then_fail):
+            with self.assertRaises(OSError):
+                exporter.export(tables=('usage',), now=self.later)
+        self.assertEqual(self.db.load_export_mark('default:usage'), ('2024-05-01T23:59:59', 2))
+        exporter.export(tables=('usage',), now=self.later)
+        files = sorted(os.path.join(root, file) for root, _, names in os.walk(self.output) for file in names)
+        self.assertFalse([path for path in files if path.endswith('.tmp')], "No temporary file should remain")
+        rows = [row['id'] for path in files for row in self.read_jsonl(path)]
+        self.assertEqual(sorted(rows), [1, 2, 3, 3, 4, 5], "Rows are exported at least once, never lost")
+
+    def test_prune_and_vacuum(self):
+        """
+        Tests that exported rows are deleted and unsettled rows kept.
+        """
+        self.db.log_usage_many([('2999-01-01T00:00:00', 'filter_by_points')])
+        results = Exporter(self.db, self.output).export(prune=True, vacuum=True, now=self.later)
+        self.assertEqual(results['usage']['pruned'], 5)
+        self.assertEqual(results['entries']['pruned'], 7)
+        remaining = self.db.conn.execute('SELECT timestamp FROM usage').fetchall()
+        self.assertEqual(remaining, [('2999-01-01T00:00:00',)], "Rows newer than the cutoff are not exported")
+        self.assertEqual(self.db.fetch_all_entries(), [])
+
+    def test_xlsx_and_command_line(self):
+        """
+        Tests the XLSX format through the command line.
+        """
+        from openpyxl import load_workbook
+
+        self.db.conn.close()
+        with mock.patch('time.time', return_value=self.later), mock.patch('builtins.print'):
+            status = main(['--db', self.path, '--output', self.output, '--format', 'xlsx', '--tables', 'usage'])
+        self.assertEqual(status, 0)
+        workbook = load_workbook(os.path.join(self.output, 'usage', '2024-05-03', 'part-00000.xlsx'), read_only=True)
+        rows = list(workbook['usage'].values)
+        self.assertEqual(rows, [('id', 'timestamp', 'filter_type'), (4, *USAGE[3]), (5, *USAGE[4])])
+        workbook.close()
+        self.db = Database(self.path)
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "Changing the time zone needs time.tzset")
+    def test_tables_share_local_days(self):
+        """
+        Tests that entries and usage rows written at the same moment go to the same day.
+        """
+        moment = 1714564800  # 2024-05-01T12:00:00 UTC, already 2024-05-02 at UTC+14.
+        try:
+            with mock.patch.dict(os.environ, {'TZ': 'Etc/GMT-14'}):
+                time.tzset()
+                with self.db.conn:
+                    self.db.conn.execute('DELETE FROM usage')
+                    self.db.conn.execute('UPDATE entries SET updated_at = ?', (moment,))
+                self.db.log_usage(datetime.fromtimestamp(moment).isoformat(), 'filter_by_points')
+                results = Exporter(self.db, self.output).export(now=self.later)
+        finally:
+            time.tzset()
+        days = {os.path.basename(os.path.dirname(path)) for table in results.values() for path in table['files']}
+        self.assertEqual(days, {'2024-05-02'})
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
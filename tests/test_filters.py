@@ -17,7 +17,9 @@ Example:
 """
 
 import unittest  # Import the unittest module for creating and running tests
+from crawler.entry import Entry  # Import the Entry record the database returns
 from crawler.filters import Filters  # Import the Filters class from the crawler.filters module
+from crawler.storage import Database  # Import the Database class to test the SQL-backed filters
 
 class TestFilters(unittest.TestCase):
     """
@@ -33,6 +35,18 @@ class TestFilters(unittest.TestCase):
     
     test_filter_by_points():
         Tests the filter_by_points method of the Filters class.
+    
+    test_database_filters_match_list_filters():
+        Tests that filtering a Database returns the same entries as filtering a list.
+    
+    test_paging():
+        Tests that limit and offset return consecutive pages.
+    
+    test_top_k():
+        Tests that top_k returns the k best entries of any iterable.
+    
+    test_streams_match_filters():
+        Tests that the streaming filters yield the same entries as the list filters.
     """
 
     def setUp(self):
@@ -48,6 +62,8 @@ class TestFilters(unittest.TestCase):
             ('4', 'Tiny', 20, 2),
             ('5', 'Just right', 70, 15)
         ]
+        # The same entries as Entry records, as the database returns them.
+        self.records = [Entry.from_tuple(entry) for entry in self.entries]
 
     def test_filter_by_comments(self):
         """
@@ -72,5 +88,59 @@ class TestFilters(unittest.TestCase):
         self.assertEqual(filtered_entries[0][1], 'Another long title example', "Titles should match expected order")
         self.assertEqual(filtered_entries[0][2], 150, "Points should match expected order")
 
+    def test_database_filters_match_list_filters(self):
+        """
+        Tests that filtering a Database returns the same entries as filtering a list.
+        """
+        db = Database(':memory:')
+        db.insert_entries(self.entries)
+        self.assertEqual(Filters.filter_by_comments(db), Filters.filter_by_comments(self.records))
+        self.assertEqual(Filters.filter_by_points(db), Filters.filter_by_points(self.records))
+        self.assertEqual([entry[1] for entry in Filters.filter_by_points(self.entries)],
+                         [entry.title for entry in Filters.filter_by_points(self.records)],
+                         "Plain tuples and Entry records should filter alike")
+        db.conn.close()
+
+    def test_paging(self):
+        """
+        Tests that limit and offset return consecutive pages.
+        """
+        db = Database(':memory:')
+        db.insert_entries(self.entries)
+        everything = Filters.filter_by_points(self.records)
+        for source in (self.records, db):
+            with self.subTest(source=type(source).__name__):
+                self.assertEqual(Filters.filter_by_points(source, limit=2), everything[:2])
+                self.assertEqual(Filters.filter_by_points(source, limit=2, offset=2), everything[2:4])
+        db.conn.close()
+
+    def test_top_k(self):
+        """
+        Tests that top_k returns the k best entries of any iterable.
+        """
+        db = Database(':memory:')
+        db.insert_entries(self.entries)
+        for method in (Filters.filter_by_comments, Filters.filter_by_points):
+            with self.subTest(method=method.__name__):
+                expected = method(self.records)[:2]
+                self.assertEqual(method(iter(self.records), top_k=2), expected)
+                self.assertEqual(method(db.iter_entries(batch_size=2), top_k=2), expected)
+                self.assertEqual(method(db, top_k=2), expected)
+                self.assertEqual(method(db, top_k=2, limit=5, offset=1), expected[1:])
+        db.conn.close()
+
+    def test_streams_match_filters(self):
+        """
+        Tests that the streaming filters yield the same entries as the list filters.
+        """
+        db = Database(':memory:')
+        db.insert_entries(self.entries)
+        stream = Filters.stream_by_points(db, batch_size=1)
+        self.assertEqual(next(stream), Filters.filter_by_points(self.records)[0], "Rows should stream lazily")
+        self.assertEqual(list(Filters.stream_by_comments(db)), Filters.filter_by_comments(self.records))
+        self.assertEqual(list(Filters.stream_by_points(db, limit=2, offset=1, batch_size=1)),
+                         Filters.filter_by_points(self.records)[1:3])
+        db.conn.close()
+
 if __name__ == '__main__':
     unittest.main()  # Run the unit tests if this script is executed directly
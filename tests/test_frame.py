@@ -0,0 +1,90 @@
+"""
+This module contains unit tests for the EntryFrame class from the crawler.frame module.
+It checks that the vectorized filters return the same entries, in the same order,
+as the tuple-based Filters methods. The tests are skipped when NumPy is not installed.
+
+Classes:
+--------
+TestEntryFrame:
+    A class that contains test cases for the EntryFrame class.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_frame
+"""
+
+import random  # Import random to generate entries with many ties
+import unittest  # Import the unittest module for creating and running tests
+from crawler import frame  # Import the frame module to check whether NumPy is available
+from crawler.entry import Entry  # Import the Entry record the frame returns
+from crawler.filters import Filters  # Import the Filters class to compare against
+from crawler.storage import Database  # Import the Database class to build frames from
+
+
+@unittest.skipIf(not frame.HAS_NUMPY, "NumPy is not installed")
+class TestEntryFrame(unittest.TestCase):
+    """
+    A test case class that contains test cases for the EntryFrame class.
+
+    Methods:
+    --------
+    setUp():
+        Builds random entries with many equal points and comments.
+
+    test_filters_match_tuple_path():
+        Tests that the vectorized filters match the tuple-based filters.
+
+    test_from_database():
+        Tests that a frame built from a Database holds the stored entries.
+
+    test_paging_and_top_k():
+        Tests limit, offset and top_k on a frame.
+    """
+
+    def setUp(self):
+        """
+        Builds random entries with many equal points and comments.
+        """
+        rng = random.Random(42)
+        words = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta']
+        self.entries = [
+            Entry(i, ' '.join(rng.choice(words) for _ in range(rng.randint(1, 9))), rng.randint(0, 20), rng.randint(0, 20))
+            for i in range(1, 401)
+        ]
+
+    def test_filters_match_tuple_path(self):
+        """
+        Tests that the vectorized filters match the tuple-based filters.
+        """
+        entry_frame = frame.EntryFrame.from_entries(self.entries)
+        self.assertEqual(len(entry_frame), len(self.entries))
+        self.assertEqual(Filters.filter_by_comments(entry_frame), Filters.filter_by_comments(self.entries))
+        self.assertEqual(Filters.filter_by_points(entry_frame), Filters.filter_by_points(self.entries))
+
+    def test_from_database(self):
+        """
+        Tests that a frame built from a Database holds the stored entries.
+        """
+        db = Database(':memory:')
+        db.insert_entries(self.entries)
+        entry_frame = frame.EntryFrame.from_database(db, batch_size=64)
+        self.assertEqual(entry_frame.rows(range(len(entry_frame))), self.entries)
+        self.assertEqual(Filters.filter_by_points(entry_frame), Filters.filter_by_points(db))
+        db.conn.close()
+
+    def test_paging_and_top_k(self):
+        """
+        Tests limit, offset and top_k on a frame.
+        """
+        entry_frame = frame.EntryFrame.from_entries(self.entries)
+        expected = Filters.filter_by_comments(self.entries)
+        self.assertEqual(Filters.filter_by_comments(entry_frame, limit=10, offset=5), expected[5:15])
+        self.assertEqual(Filters.filter_by_comments(entry_frame, top_k=7), expected[:7])
+        self.assertEqual(Filters.filter_by_comments(entry_frame, top_k=7, offset=5), expected[5:7])
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
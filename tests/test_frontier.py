@@ -0,0 +1,213 @@
+"""
+This module contains unit tests for the crawler.frontier module and for Scraper.crawl.
+It checks the Bloom filter, the priority order and bound of the frontier, saving and
+restoring it through the Database, and a crawl over canned pages.
+
+Classes:
+--------
+TestFrontier:
+    A class that contains test cases for the frontier and the crawl.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_frontier
+"""
+
+import os  # Import the os module to remove the cache file
+import tempfile  # Import tempfile to place the cache file outside the repository
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to serve canned pages
+from crawler.cache import ResponseCache  # Import ResponseCache to crawl through the cache
+from crawler.frontier import BloomFilter, Frontier, extract_links  # Import the classes under test
+from crawler.scraper import Scraper  # Import the Scraper class to test the crawl
+from crawler.storage import Database  # Import the Database class to save frontiers
+
+BASE = Scraper.BASE_URL
+PAGES = {
+    BASE: (
+        '<tr class="athing" id="1"><td><span class="rank">1.</span></td>'
+        '<td><span class="titleline"><a href="https://example.com">Linked story</a></span></td></tr>'
+        '<tr><td class="subtext"><a href="user?id=alice">alice</a> '
+        '<a href="item?id=1">3&nbsp;comments</a> <a href="from?site=example.com">example.com</a></td></tr>'
+    ),
+    BASE + 'item?id=1': '<a href="user?id=bob">bob</a> <a href="item?id=1">parent</a>',
+    BASE + 'user?id=alice': '<a href="item?id=2">submission</a>',
+    BASE + 'user?id=bob': '',
+    BASE + 'from?site=example.com': '',
+    BASE + 'item?id=2': '',
+}
+
+
+def comment_row(comment_id, indent, text):
+    """
+    Builds the row of a comment, with the age link to the comment's own page.
+    """
+    return (
+        f'<tr class="athing comtr" id="{comment_id}"><td><table><tr><td class="ind" indent="{indent}"></td>'
+        f'<td class="default"><span class="comhead"><a href="user?id=carol" class="hnuser">carol</a> '
+        f'<span class="age" title="2026-10-18T08:00:00"><a href="item?id={comment_id}">1 hour ago</a></span></span>'
+        f'<div class="comment"><div class="commtext c00">{text}</div></div></td></tr></table></td></tr>'
+    )
+
+
+# A story with a reply to its first comment, and the pages of the comments, which show their replies at indent 0.
+THREAD_PAGES = {
+    BASE + 'item?id=1': (
+        '<table class="fatitem"><tr class="athing submission" id="1"><td class="title">'
+        '<span class="titleline"><a href="https://example.com">Linked story</a></span></td></tr></table>'
+        '<table class="comment-tree">' + comment_row(10, 0, 'First') + comment_row(11, 1, 'Reply')
+        + comment_row(12, 0, 'Second') + '</table>'
+    ),
+    BASE + 'item?id=10': (
+        '<table class="fatitem"><tr class="athing" id="10"><td class="default"><span class="comhead">'
+        '<span class="navs"> | <a href="item?id=1">parent</a></span>'
+        '<span class="onstory"> | on: <a href="item?id=1">Linked story</a></span></span></td></tr></table>'
+        '<table class="comment-tree">' + comment_row(11, 0, 'Reply') + '</table>'
+    ),
+    BASE + 'item?id=11': '<table class="fatitem"><tr class="athing" id="11"><td> | on: <a href="item?id=1">x</a></td></tr></table>',
+    BASE + 'item?id=12': '<table class="fatitem"><tr class="athing" id="12"><td> | on: <a href="item?id=1">x</a></td></tr></table>',
+}
+
+
+class TestFrontier(unittest.TestCase):
+    """
+    A test case class that contains test cases for the frontier and the crawl.
+
+    Methods:
+    --------
+    test_bloom_filter():
+        Tests that added items are always found and false positives stay rare.
+
+    test_priority_and_dedupe():
+        Tests that URLs pop by priority and are queued only once.
+
+    test_max_size():
+        Tests that the queue drops its lowest-priority URLs when full.
+
+    test_save_and_load():
+        Tests that a frontier is restored from the database.
+
+    test_crawl_follows_links_up_to_depth():
+        Tests that the crawl routes pages to handlers and respects max_depth.
+
+    test_crawl_stores_story_threads_only():
+        Tests that the crawl stores a story's thread and leaves it intact on a comment's page.
+
+    test_repeated_crawl_follows_cached_pages():
+        Tests that a crawl through the cache follows the links of pages reported unchanged.
+    """
+
+    def test_bloom_filter(self):
+        """
+        Tests that added items are always found and false positives stay rare.
+        """
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        items = [f'https://news.ycombinator.com/item?id={i}' for i in range(10000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items), "A Bloom filter has no false negatives")
+        false_positives = sum(f'https://example.com/{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 250, "False positives should stay near the 1% error rate")
+        self.assertLess(len(bloom.bits), 12500, "10000 items at 1% need under 12.5 KB")
+
+    def test_priority_and_dedupe(self):
+        """
+        Tests that URLs pop by priority and are queued only once.
+        """
+        frontier = Frontier(capacity=100)
+        self.assertTrue(frontier.push('a', priority=0))
+        self.assertTrue(frontier.push('b', priority=2))
+        self.assertTrue(frontier.push('c', depth=1, priority=2))
+        self.assertFalse(frontier.push('b', priority=5), "A seen URL should not be queued again")
+        self.assertEqual([frontier.pop() for _ in range(3)], [('b', 0), ('c', 1), ('a', 0)])
+
+    def test_max_size(self):
+        """
+        Tests that the queue drops its lowest-priority URLs when full.
+        """
+        frontier = Frontier(capacity=1000, max_size=8)
+        for i in range(20):
+            frontier.push(f'url{i}', priority=i)
+        self.assertLessEqual(len(frontier), 8)
+        self.assertEqual(frontier.pop(), ('url19', 0))
+        self.assertGreater(frontier.dropped, 0)
+
+    def test_save_and_load(self):
+        """
+        Tests that a frontier is restored from the database.
+        """
+        db = Database(':memory:')
+        self.assertIsNone(Frontier.load(db))
+        frontier = Frontier(capacity=100)
+        frontier.push('first', priority=1)
+        frontier.push('second', depth=2, priority=5)
+        frontier.save(db)
+        restored = Frontier.load(db)
+        self.assertFalse(restored.push('first'), "The seen-set should be restored")
+        self.assertEqual([restored.pop(), restored.pop()], [('second', 2), ('first', 0)])
+        db.conn.close()
+
+    def test_crawl_follows_links_up_to_depth(self):
+        """
+        Tests that the crawl routes pages to handlers and respects max_depth.
+        """
+        self.assertEqual(extract_links(BASE, PAGES[BASE])[0], (BASE + 'user?id=alice', 1))
+        scraper = Scraper(db_path=':memory:', workers=2)
+        fetched = []
+
+        def fake_get(url, **kwargs):
+            fetched.append(url)
+            return mock.Mock(status_code=200, text=PAGES[url])
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_get):
+            count = scraper.crawl(max_depth=1)
+        self.assertEqual(count, 4)
+        self.assertEqual(fetched[0], BASE, "The seed should be fetched first")
+        self.assertEqual(set(fetched[1:]), {BASE + 'item?id=1', BASE + 'user?id=alice', BASE + 'from?site=example.com'})
+        self.assertEqual([entry[:4] for entry in scraper.db.fetch_all_entries()], [(1, 'Linked story', 0, 3)], "Listing entries should be stored")
+
+    def test_crawl_stores_story_threads_only(self):
+        """
+        Tests that the crawl stores a story's thread and leaves it intact on a comment's page.
+        """
+        scraper = Scraper(db_path=':memory:', workers=1)
+        with mock.patch.object(scraper.session, 'get',
+                               side_effect=lambda url, **kwargs: mock.Mock(status_code=200, text=THREAD_PAGES.get(url, ''))):
+            count = scraper.crawl(seeds=[BASE + 'item?id=1'], max_depth=1)
+        self.assertEqual(count, 5, "The comments' and the author's pages are visited")
+        thread = scraper.db.fetch_thread(1)
+        self.assertEqual([(comment.comment_id, comment.story_id, comment.parent_id, comment.depth) for comment in thread],
+                         [(10, 1, 1, 0), (11, 1, 10, 1), (12, 1, 1, 0)])
+        self.assertEqual(scraper.db.conn.execute('SELECT id, position FROM comments ORDER BY id').fetchall(),
+                         [(10, 0), (11, 1), (12, 2)])
+
+    def test_repeated_crawl_follows_cached_pages(self):
+        """
+        Tests that a crawl through the cache follows the links of pages reported unchanged.
+        """
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        cache = ResponseCache(path, ttl=3600)
+        self.addCleanup(cache.close)
+        scraper = Scraper(db_path=':memory:', workers=2, cache=cache)
+        fetched = []
+
+        def fake_get(url, **kwargs):
+            fetched.append(url)
+            return mock.Mock(status_code=200, content=PAGES[url].encode(), text=PAGES[url], headers={})
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_get), \
+                mock.patch.object(scraper, 'parse_entries', wraps=scraper.parse_entries) as parse:
+            self.assertEqual(scraper.crawl(max_depth=1), 4)
+            fetched.clear()
+            self.assertEqual(scraper.crawl(max_depth=1), 4, "The links of the fresh seed should be followed")
+        self.assertEqual(fetched, [BASE], "Only the seed is downloaded again, for its links")
+        self.assertEqual(parse.call_count, 1, "The unchanged seed should not be handled again")
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
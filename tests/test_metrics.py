@@ -0,0 +1,146 @@
+"""
+This module contains unit tests for the crawler.metrics and crawler.profiling modules.
+
+Classes:
+--------
+TestMetrics:
+    A class that contains test cases for the metrics registry and the profilers.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_metrics
+"""
+
+import os  # Import os to remove the written profiles
+import pstats  # Import pstats to read the cProfile output
+import tempfile  # Import tempfile to write the profiles outside the repository
+import time  # Import time to give the sampling profiler something to sample
+import unittest  # Import the unittest module for creating and running tests
+from crawler.filters import Filters  # Import the Filters class to test its instrumentation
+from crawler.metrics import REGISTRY, timed  # Import the registry and decorator under test
+from crawler.profiling import profile  # Import the profiler wrapper under test
+from crawler.storage import Database  # Import the Database class to test its instrumentation
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    A test case class that contains test cases for the metrics registry and the profilers.
+
+    Methods:
+    --------
+    setUp():
+        Resets the global registry.
+
+    tearDown():
+        Disables and resets the global registry.
+
+    test_disabled_records_nothing():
+        Tests that nothing is recorded while the registry is disabled.
+
+    test_records_database_and_filters():
+        Tests that the Database and Filters calls are counted and timed.
+
+    test_errors_and_prometheus_text():
+        Tests that failed calls are counted and the Prometheus text is well formed.
+
+    test_profilers_write_files():
+        Tests that both profilers write a readable profile.
+    """
+
+    def setUp(self):
+        """
+        Resets the global registry.
+        """
+        REGISTRY.reset()
+
+    def tearDown(self):
+        """
+        Disables and resets the global registry.
+        """
+        REGISTRY.disable()
+        REGISTRY.reset()
+
+    def test_disabled_records_nothing(self):
+        """
+        Tests that nothing is recorded while the registry is disabled.
+        """
+        db = Database(':memory:')
+        db.insert_entries([('1', 'One two three four five six', 10, 3, 1)])
+        Filters.filter_by_comments(db)
+        REGISTRY.increment('entries_stored', 1)
+        self.assertEqual(REGISTRY.snapshot(), {'counters': {}, 'operations': {}})
+
+    def test_records_database_and_filters(self):
+        """
+        Tests that the Database and Filters calls are counted and timed.
+        """
+        REGISTRY.enable()
+        db = Database(':memory:')
+        db.insert_entries([('1', 'One two three four five six', 10, 3, 1), ('2', 'Short', 5, 1, 2)])
+        Filters.filter_by_comments(db)
+        Filters.filter_by_points(db)
+        operations = REGISTRY.snapshot()['operations']
+        self.assertEqual(operations['database.insert_entries']['count'], 1)
+        self.assertEqual(operations['database.select_entries']['count'], 2)
+        self.assertEqual(operations['filters.filter_by_comments']['count'], 1)
+        self.assertEqual(operations['database.migrate']['count'], 1)
+        insert = operations['database.insert_entries']
+        self.assertEqual(insert['buckets']['+Inf'], 1)
+        self.assertGreater(insert['total_seconds'], 0)
+        self.assertLessEqual(insert['p99_seconds'], insert['max_seconds'])
+
+    def test_errors_and_prometheus_text(self):
+        """
+        Tests that failed calls are counted and the Prometheus text is well formed.
+        """
+        @timed('test.fails')
+        def fails():
+            raise RuntimeError("boom")
+
+        REGISTRY.enable()
+        with self.assertRaises(RuntimeError):
+            fails()
+        REGISTRY.increment('entries_stored', 30)
+        text = REGISTRY.to_prometheus()
+        self.assertIn('# TYPE crawler_operation_seconds histogram', text)
+        self.assertIn('crawler_operation_seconds_bucket{operation="test.fails",le="+Inf"} 1', text)
+        self.assertIn('crawler_operation_seconds_count{operation="test.fails"} 1', text)
+        self.assertIn('crawler_operation_errors_total{operation="test.fails"} 1', text)
+        self.assertIn('crawler_entries_stored_total 30', text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_profilers_write_files(self):
+        """
+        Tests that both profilers write a readable profile.
+        """
+        directory = tempfile.mkdtemp()
+        cprofile_path = os.path.join(directory, 'run.prof')
+        sampling_path = os.path.join(directory, 'run.folded')
+        try:
+            with profile(cprofile_path):
+                Database(':memory:').fetch_all_entries()
+            functions = {name for _, _, name in pstats.Stats(cprofile_path).stats}
+            self.assertIn('fetch_all_entries', functions)
+
+            with profile(sampling_path, 'sampling', interval=0.001):
+                time.sleep(0.05)
+            with open(sampling_path) as handle:
+                lines = handle.read().splitlines()
+            self.assertTrue(lines, "The sampling profiler should record stacks")
+            self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+            self.assertIn('test_profilers_write_files', lines[0])
+            with self.assertRaises(ValueError):
+                with profile(sampling_path, 'unknown'):
+                    pass
+        finally:
+            for path in (cprofile_path, sampling_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(directory)
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
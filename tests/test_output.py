@@ -0,0 +1,191 @@
+"""
+This module contains unit tests for the crawler.output module and for the
+non-interactive command line in main.py.
+
+Classes:
+--------
+TestOutput:
+    A class that contains test cases for the output writers and the command line.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_output
+"""
+
+import csv  # Import csv to read back the CSV output
+import io  # Import io to capture the written output
+import json  # Import json to read back the JSONL output
+import os  # Import os to remove the temporary database
+import subprocess  # Import subprocess to start the command line in a fresh interpreter
+import sys  # Import sys to find the running interpreter
+import tempfile  # Import tempfile to create a temporary database
+import unittest  # Import the unittest module for creating and running tests
+from contextlib import redirect_stderr, redirect_stdout  # Import the redirects to capture the command-line output
+import main  # Import the command line under test
+from crawler.output import write_rows  # Import the writer under test
+from crawler.storage import Database  # Import the Database class to prepare stored entries
+
+ENTRIES = [
+    ('1', 'A "quoted", comma title with many words', 10, 7, 1),
+    ('2', 'Short one', 50, 1, 2),
+    ('3', 'Café naïve unicode title with six words', 30, 9, 3),
+]
+STARTUP_BUDGET = 0.15  # Seconds to import main.py for a query-only run; about 0.03 on a laptop.
+CRAWLING_MODULES = ('requests', 'bs4', 'numpy', 'tabulate', 'asyncio')
+
+
+class TestOutput(unittest.TestCase):
+    """
+    A test case class that contains test cases for the output writers and the command line.
+
+    Methods:
+    --------
+    setUp():
+        Creates a temporary database with stored entries.
+
+    tearDown():
+        Removes the temporary database.
+
+    test_formats():
+        Tests that every format writes every row and can be read back.
+
+    test_writers_stream_lazily():
+        Tests that the streaming writers consume their rows one at a time.
+
+    test_cli_query_only():
+        Tests a non-interactive, query-only run of the command line.
+
+    test_query_only_startup():
+        Tests that a query-only run does not import the crawling stack and starts within the budget.
+
+    test_query_only_missing_database():
+        Tests that a query-only run on a missing database fails instead of creating it.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary database with stored entries.
+        """
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        db = Database(self.path)
+        db.insert_entries(ENTRIES)
+        db.conn.close()
+
+    def tearDown(self):
+        """
+        Removes the temporary database.
+        """
+        os.remove(self.path)
+
+    def test_formats(self):
+        """
+        Tests that every format writes every row and can be read back.
+        """
+        rows = [entry[:4] for entry in ENTRIES]
+        stream = io.StringIO()
+        self.assertEqual(write_rows(rows, 'jsonl', stream), 3)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(records[2], {'number': '3', 'title': ENTRIES[2][1], 'points': 30, 'comments': 9})
+
+        stream = io.StringIO()
+        self.assertEqual(write_rows(rows, 'csv', stream), 3)
+        read = list(csv.reader(io.StringIO(stream.getvalue())))
+        self.assertEqual(read[0], ['number', 'title', 'points', 'comments'])
+        self.assertEqual(read[1], ['1', ENTRIES[0][1], '10', '7'])
+
+        stream = io.StringIO()
+        self.assertEqual(write_rows(rows, 'grid', stream), 3)
+        self.assertIn('| Short one ', stream.getvalue())
+        self.assertTrue(stream.getvalue().startswith('+---'))
+        with self.assertRaises(ValueError):
+            write_rows(rows, 'xml', stream)
+
+    def test_writers_stream_lazily(self):
+        """
+        Tests that the streaming writers consume their rows one at a time.
+        """
+        for format in ('jsonl', 'csv'):
+            with self.subTest(format=format):
+                stream = io.StringIO()
+                lines = []
+
+                def rows():
+                    for entry in ENTRIES:
+                        lines.append(stream.getvalue().count('\n'))
+                        yield entry[:4]
+
+                write_rows(rows(), format, stream)
+                header = 1 if format == 'csv' else 0
+                self.assertEqual(lines, [header, header + 1, header + 2],
+                                 "Each row should be written before the next is read")
+
+    def test_cli_query_only(self):
+        """
+        Tests a non-interactive, query-only run of the command line.
+        """
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = main.main(['--db', self.path, '--skip-crawl', '--filter', 'comments', '--format', 'jsonl'])
+        self.assertEqual(status, 0)
+        titles = [json.loads(line)['title'] for line in output.getvalue().splitlines()]
+        self.assertEqual(titles, [ENTRIES[2][1], ENTRIES[0][1]])
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.main(['--db', self.path, '--skip-crawl', '--filter', 'points', '--format', 'csv', '--limit', '1'])
+        self.assertEqual(output.getvalue().splitlines(), ['number,title,points,comments', '2,Short one,50,1'])
+
+        db = Database(self.path)
+        usage = db.conn.execute('SELECT filter_type FROM usage ORDER BY id').fetchall()
+        db.conn.close()
+        self.assertEqual(usage, [('filter_by_comments',), ('filter_by_points',)])
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.main(['--db', self.path, '--skip-crawl', '--filter', 'comments', '--format', 'csv',
+                       '--search', 'cafe words', '--rebuild-index'])
+        self.assertEqual(output.getvalue().splitlines()[1:], ['3,Café naïve unicode title with six words,30,9'])
+
+    def test_query_only_startup(self):
+        """
+        Tests that a query-only run does not import the crawling stack and starts within the budget.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ('import sys, main; '
+                f'sys.exit(main.main(["--db", {self.path!r}, "--skip-crawl", "--filter", "points", "--format", "csv"]))')
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, capture_output=True,
+                                text=True, encoding='utf-8')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.splitlines(), ['number,title,points,comments', '2,Short one,50,1'])
+        # Each line is "import time: <self us> | <cumulative us> | <indented module name>".
+        imports = {}
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:'):
+                _, cumulative, module = line.split('|')
+                if cumulative.strip().isdigit():
+                    imports[module.strip()] = int(cumulative) / 1e6
+        self.assertFalse([module for module in imports if module.split('.')[0] in CRAWLING_MODULES],
+                         "A query-only run should not import the crawling or rendering libraries")
+        self.assertLess(imports['main'], STARTUP_BUDGET)
+
+    def test_query_only_missing_database(self):
+        """
+        Tests that a query-only run on a missing database fails instead of creating it.
+        """
+        missing = self.path + '.missing'
+        errors = io.StringIO()
+        with redirect_stdout(io.StringIO()) as output, redirect_stderr(errors):
+            status = main.main(['--db', missing, '--skip-crawl', '--filter', 'comments', '--format', 'csv'])
+        self.assertEqual(status, 1)
+        self.assertEqual(output.getvalue(), '')
+        self.assertIn(missing, errors.getvalue())
+        self.assertFalse(os.path.exists(missing), "The mistyped database should not be created")
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
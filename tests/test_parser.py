@@ -0,0 +1,187 @@
+"""
+This module contains unit tests for the listing parsers from the crawler.parser module.
+It checks that the fast single-pass parser and the BeautifulSoup fallback return the
+same entries for the saved pages in tests/fixtures, that rows are paired with their
+subtext by item id, and that comment threads are parsed into their tree.
+
+Classes:
+--------
+TestParser:
+    A class that contains test cases for the listing and comment parsers.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_parser
+"""
+
+import os  # Import the os module to locate the saved pages
+import unittest  # Import the unittest module for creating and running tests
+from benchmarks.synth import make_item_page, make_page  # Import the synthetic page generators
+from crawler.entry import Comment, Entry  # Import the records the parsers return
+from crawler.parser import parse_comments, parse_listing, parse_listing_bs4  # Import the parsers under test
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name):
+    """
+    Reads a saved listing page from the fixtures directory.
+    """
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as handle:
+        return handle.read()
+
+
+class TestParser(unittest.TestCase):
+    """
+    A test case class that contains test cases for the listing and comment parsers.
+
+    Methods:
+    --------
+    test_parity_on_saved_pages():
+        Tests that both parsers return the same entries for every saved page.
+
+    test_saved_page_values():
+        Tests the values parsed from a saved page.
+
+    test_limit():
+        Tests that both parsers stop after the requested number of entries.
+
+    test_pairs_rows_by_item_id():
+        Tests that a missing subtext does not shift the values of the following rows.
+
+    test_parity_on_synthetic_pages():
+        Tests that both parsers agree on large synthetic pages.
+
+    test_comment_values():
+        Tests the depth, parent, author, age and text parsed from an item page.
+
+    test_comment_tree_on_synthetic_pages():
+        Tests that every comment of a large thread hangs from a comment shown before it.
+    """
+
+    def test_parity_on_saved_pages(self):
+        """
+        Tests that both parsers return the same entries for every saved page.
+        """
+        for name in sorted(os.listdir(FIXTURES)):
+            if not name.endswith('.html'):
+                continue
+            with self.subTest(page=name):
+                html = load_fixture(name)
+                fast = parse_listing(html)
+                self.assertEqual(len(fast), 30, "Every saved page lists 30 entries")
+                self.assertEqual(fast, parse_listing_bs4(html), "Both parsers should agree")
+
+    def test_saved_page_values(self):
+        """
+        Tests the values parsed from a saved page.
+        """
+        entries = parse_listing(load_fixture('news.html'))
+        self.assertEqual(entries[0], Entry(1, 'The unreasonable effectiveness of plain text', 3, 0, 45123456))
+        self.assertEqual([entry.rank for entry in entries], list(range(1, 31)))
+        # Entities are unescaped and parenthesised parts are removed from titles.
+        self.assertIn('Understanding B-trees & LSM trees', [entry[1] for entry in entries])
+        self.assertIn('Reverse engineering the Game Boy boot ROM', [entry[1] for entry in entries])
+        # The job posting has neither points nor comments.
+        job = [entry for entry in entries if entry[1].startswith('Fooly')][0]
+        self.assertEqual(job[2:4], (0, 0))
+
+    def test_limit(self):
+        """
+        Tests that both parsers stop after the requested number of entries.
+        """
+        html = load_fixture('news.html')
+        self.assertEqual(parse_listing(html, limit=5), parse_listing_bs4(html, limit=5))
+        self.assertEqual(len(parse_listing(html, limit=5)), 5)
+
+    def test_pairs_rows_by_item_id(self):
+        """
+        Tests that a missing subtext does not shift the values of the following rows.
+        """
+        html = (
+            '<table>'
+            '<tr class="athing" id="1"><td><span class="rank">1.</span></td>'
+            '<td><span class="titleline"><a href="a">First</a></span></td></tr>'
+            '<tr><td class="subtext"><span class="score" id="score_1">10 points</span> '
+            '<a href="item?id=1">7&nbsp;comments</a></td></tr>'
+            '<tr class="athing" id="2"><td><span class="rank">2.</span></td>'
+            '<td><span class="titleline"><a href="b">Second</a></span></td></tr>'
+            '<tr class="athing" id="3"><td><span class="rank">3.</span></td>'
+            '<td><span class="titleline"><a href="c">Third</a></span></td></tr>'
+            '<tr><td class="subtext"><span class="score" id="score_3">30 points</span> '
+            '<a href="item?id=3">discuss</a></td></tr>'
+            '</table>'
+        )
+        expected = [Entry(1, 'First', 10, 7, 1), Entry(2, 'Second', 0, 0, 2), Entry(3, 'Third', 30, 0, 3)]
+        self.assertEqual(parse_listing(html), expected)
+        self.assertEqual(parse_listing_bs4(html), expected)
+
+    def test_parity_on_synthetic_pages(self):
+        """
+        Tests that both parsers agree on large synthetic pages.
+        """
+        for seed in range(3):
+            html = make_page(rows=200, start=seed * 200 + 1, seed=seed)
+            entries = parse_listing(html)
+            self.assertEqual(len(entries), 200)
+            self.assertEqual(entries, parse_listing_bs4(html))
+
+    def test_comment_values(self):
+        """
+        Tests the depth, parent, author, age and text parsed from an item page.
+        """
+        def row(comment_id, indent, head, body):
+            return (
+                f'<tr class="athing comtr" id="{comment_id}"><td><table><tr>{indent}'
+                f'<td class="default"><div><span class="comhead">{head}</span></div><br>'
+                f'<div class="comment">{body}</div></td></tr></table></td></tr>'
+            )
+
+        def head(user, minute):
+            return (f'<a href="user?id={user}" class="hnuser">{user}</a> '
+                    f'<span class="age" title="2026-10-18T08:{minute}:00 1792310400"><a href="item?id=1">1 hour ago</a></span>')
+
+        html = '<table class="comment-tree">' + ''.join([
+            row(11, '<td class="ind" indent="0"></td>', head('alice', '01'),
+                '<div class="commtext c00">First &amp; foremost<p>Second <i>paragraph</i></div>'),
+            row(12, '<td class="ind" indent="1"></td>', head('bob', '02'),
+                '<div class="commtext c00">See <a href="https://example.com">https://example.com</a></div>'),
+            row(13, '<td class="ind" indent="2"></td>', ' [deleted]', ''),
+            row(14, '<td class="ind" indent="3"></td>', head('carol', '04'), '<div class="commtext c5a">Orphan?</div>'),
+            row(15, '<td class="ind" indent="1"></td>', head('dave', '05'), '<div class="commtext c00">Sibling</div>'),
+            row(16, '<td class="ind"><img src="s.gif" height="1" width="0"></td>', head('erin', '06'),
+                '<div class="commtext c00">Old markup</div>'),
+            row(17, '<td class="ind"><img src="s.gif" height="1" width="160"></td>', head('frank', '07'),
+                '<div class="commtext c00">Too deep</div>'),
+        ]) + '</table>'
+        self.assertEqual(parse_comments(html, 1), [
+            Comment(11, 1, 1, 0, 'alice', '2026-10-18T08:01:00', 'First & foremost\n\nSecond paragraph'),
+            Comment(12, 1, 11, 1, 'bob', '2026-10-18T08:02:00', 'See https://example.com'),
+            Comment(13, 1, 12, 2, None, None, ''),
+            Comment(14, 1, 13, 3, 'carol', '2026-10-18T08:04:00', 'Orphan?'),
+            Comment(15, 1, 11, 1, 'dave', '2026-10-18T08:05:00', 'Sibling'),
+            Comment(16, 1, 1, 0, 'erin', '2026-10-18T08:06:00', 'Old markup'),
+            Comment(17, 1, 16, 1, 'frank', '2026-10-18T08:07:00', 'Too deep'),
+        ])
+        self.assertEqual(parse_comments('<table></table>', 1), [])
+
+    def test_comment_tree_on_synthetic_pages(self):
+        """
+        Tests that every comment of a large thread hangs from a comment shown before it.
+        """
+        comments = parse_comments(make_item_page(comments=5000, story_id=7, seed=1), 7)
+        self.assertEqual(len(comments), 5000)
+        depths = {7: -1}
+        for comment in comments:
+            self.assertIn(comment.parent_id, depths, "A parent is shown before its replies")
+            self.assertEqual(comment.depth, depths[comment.parent_id] + 1)
+            depths[comment.comment_id] = comment.depth
+        self.assertGreater(max(depths.values()), 5)
+        self.assertTrue(any(comment.author is None for comment in comments), "Deleted comments are kept")
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
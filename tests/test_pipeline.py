@@ -0,0 +1,137 @@
+"""
+This module contains unit tests for the crawler.pipeline module.
+
+Classes:
+--------
+TestPipeline:
+    A class that contains test cases for the staged crawl pipeline.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_pipeline
+"""
+
+import os  # Import the os module to remove the cache file
+import tempfile  # Import tempfile to place the cache file outside the repository
+import time  # Import time to slow down the writes
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to replace HTTP calls with canned listing pages
+import requests  # Import requests to raise a connection error
+from crawler.cache import ResponseCache  # Import ResponseCache to follow the committed pages
+from crawler.pipeline import AsyncScraper  # Import the class under test
+from crawler.ratelimit import RetryPolicy  # Import RetryPolicy to fail without retrying
+from tests.test_scraper import fake_get  # Import the canned listing pages
+
+
+def fake_raw_get(url, **kwargs):
+    """
+    Serves the canned listing pages as raw bytes.
+    """
+    return mock.Mock(status_code=200, content=fake_get(url).text.encode())
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    A test case class that contains test cases for the staged crawl pipeline.
+
+    Methods:
+    --------
+    test_stores_every_page():
+        Tests that every fetched page is parsed and stored, and the usage logged.
+
+    test_slow_store_backpressures_fetch():
+        Tests that a slow store stage holds back fetching through the bounded queues.
+
+    test_failed_pages_are_counted():
+        Tests that a failing page is recorded without stopping the other pages.
+
+    test_empty_pages_are_committed():
+        Tests that a page without entries is committed to the cache and reported unchanged next time.
+    """
+
+    def test_stores_every_page(self):
+        """
+        Tests that every fetched page is parsed and stored, and the usage logged.
+        """
+        scraper = AsyncScraper(db_path=':memory:', parse_workers=0, fetch_concurrency=3, parse_concurrency=2)
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_raw_get):
+            stored = scraper.scrape_and_store(pages=5, sections=('', 'newest'))
+        self.assertEqual(stored, 300)
+        entries = scraper.db.fetch_all_entries()
+        self.assertEqual(sorted(entry[0] for entry in entries), list(range(1, 151)),
+                         "Both sections serve the same canned pages")
+        stats = scraper.stats()
+        self.assertEqual([stats[stage]['processed'] for stage in ('fetch', 'parse')], [10, 10])
+        self.assertEqual(stats['fetch']['workers'], 3)
+        self.assertGreaterEqual(stats['store']['processed'], 1)
+        self.assertTrue(all(stage['queue_depth'] == 0 for stage in stats.values()), "Every queue is drained")
+        usage = scraper.db.conn.execute('SELECT filter_type FROM usage').fetchall()
+        self.assertEqual(usage, [('scrape',)])
+
+    def test_slow_store_backpressures_fetch(self):
+        """
+        Tests that a slow store stage holds back fetching through the bounded queues.
+        """
+        scraper = AsyncScraper(db_path=':memory:', parse_workers=0, fetch_concurrency=4, queue_size=1,
+                               store_batch=1)
+        insert = scraper.db.insert_entries
+
+        def slow_insert(entries, snapshot_at=None):
+            time.sleep(0.05)
+            insert(entries, snapshot_at)
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_raw_get), \
+                mock.patch.object(scraper.db, 'insert_entries', side_effect=slow_insert):
+            scraper.scrape_and_store(pages=12)
+        stats = scraper.stats()
+        self.assertEqual(stats['store']['processed'], 12)
+        self.assertTrue(all(stage['max_queue_depth'] <= 1 for stage in stats.values()), "Queues stay bounded")
+        self.assertGreater(stats['parse']['blocked'], 0.1, "Parsing waits for the store stage")
+        self.assertGreater(stats['fetch']['blocked'], 0.1, "Fetching waits in turn")
+        self.assertEqual(scraper.bottleneck(), 'store')
+
+    def test_failed_pages_are_counted(self):
+        """
+        Tests that a failing page is recorded without stopping the other pages.
+        """
+        scraper = AsyncScraper(db_path=':memory:', parse_workers=0, retry=RetryPolicy(max_retries=0))
+
+        def flaky_get(url, **kwargs):
+            if url.endswith('?p=2'):
+                raise requests.ConnectionError('connection reset')
+            return fake_raw_get(url)
+
+        with mock.patch.object(scraper.session, 'get', side_effect=flaky_get):
+            stored = scraper.scrape_and_store(pages=3)
+        self.assertEqual(stored, 60)
+        self.assertEqual((scraper.stats()['fetch']['processed'], scraper.stats()['fetch']['failed']), (2, 1))
+        [(stage, url, error)] = scraper.errors
+        self.assertEqual((stage, url), ('fetch', AsyncScraper.BASE_URL + '?p=2'))
+        self.assertIsInstance(error, requests.ConnectionError)
+
+    def test_empty_pages_are_committed(self):
+        """
+        Tests that a page without entries is committed to the cache and reported unchanged next time.
+        """
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        cache = ResponseCache(path, ttl=0)
+        self.addCleanup(cache.close)
+        scraper = AsyncScraper(db_path=':memory:', parse_workers=0, cache=cache)
+        responses = [mock.Mock(status_code=200, content=b'<table></table>', text='<table></table>',
+                               headers={'ETag': '"empty"'}),
+                     mock.Mock(status_code=304)]
+        with mock.patch.object(scraper.session, 'get', side_effect=responses):
+            self.assertEqual(scraper.scrape_and_store(), 0)
+            self.assertEqual(scraper.scrape_and_store(), 0)
+        self.assertEqual(cache.stats['not_modified'], 1, "The empty page should be committed")
+        self.assertEqual(cache._pending, {})
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
@@ -0,0 +1,161 @@
+"""
+This module contains unit tests for the crawler.query module.
+
+Classes:
+--------
+TestQuery:
+    A class that contains test cases for the query engine and its cache.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_query
+"""
+
+import os  # Import os to remove the temporary database
+import tempfile  # Import tempfile to create a database shared by two connections
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to count the SQL queries
+from crawler import frame  # Import the frame module to query an EntryFrame
+from crawler.entry import Entry  # Import the Entry record to build the stored rows
+from crawler.filters import Filters  # Import the Filters class to test its queries
+from crawler.query import Comments, Points, Query, QueryCache, TitleMatch, Words  # Import the classes under test
+from crawler.storage import Database  # Import the Database class to run queries as SQL
+
+ENTRIES = [
+    Entry(1, 'Rust in production at a large scale', 300, 40, 1),
+    Entry(2, 'Why we rewrote our Python service in Rust', 120, 250, 2),
+    Entry(3, 'Python 3.13 released', 500, 90, 3),
+    Entry(4, 'Ask HN: Who is hiring?', 80, 400, 4),
+    Entry(5, 'A café for programmers', 20, 2, 5),
+    Entry(6, 'Show HN: Zig and Rust side by side', 120, 60, 6),
+    Entry(7, 'Python packaging, again', 120, 60, 7),
+]
+
+
+class TestQuery(unittest.TestCase):
+    """
+    A test case class that contains test cases for the query engine and its cache.
+
+    Methods:
+    --------
+    setUp():
+        Stores the entries in an in-memory database.
+
+    test_sql_matches_python():
+        Tests that queries compiled to SQL return the same entries as in Python.
+
+    test_normalized_keys():
+        Tests that equivalent queries share one normal form.
+
+    test_query_on_entry_frame():
+        Tests that queries run on an EntryFrame return the same entries as on a list.
+
+    test_cache_invalidated_by_writes():
+        Tests that repeated queries are answered from the cache until the next write.
+
+    test_cache_sees_other_connections():
+        Tests that a commit by another connection invalidates the cache.
+    """
+
+    def setUp(self):
+        """
+        Stores the entries in an in-memory database.
+        """
+        self.db = Database(':memory:')
+        self.db.insert_entries(ENTRIES)
+
+    def test_sql_matches_python(self):
+        """
+        Tests that queries compiled to SQL return the same entries as in Python.
+        """
+        queries = [
+            Query(),
+            Query(Words(min=6)).order_by('comments'),
+            Query(Words(max=5) & Points(min=100)).order_by('points').order_by('comments', descending=False),
+            Query(TitleMatch('rust') | TitleMatch('PYTHON')).order_by('points').page(limit=3, offset=1),
+            Query(~TitleMatch('hn') & Comments(min=50, max=300)).order_by('rank', descending=False),
+            Query(TitleMatch('cafe')),
+            Query(TitleMatch('python rust')).order_by('title', descending=False),
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(query.run(self.db, cache=False), query.run(ENTRIES))
+        self.assertEqual([entry.item_id for entry in queries[3].run(self.db)], [1, 2, 6])
+        self.assertEqual([entry.item_id for entry in queries[5].run(self.db)], [5], "Accents are ignored")
+        self.assertEqual(Filters.query([tuple(entry[:5]) for entry in ENTRIES], queries[1]), queries[1].run(self.db))
+        self.assertEqual(Filters.filter_by_comments(self.db), Filters.filter_by_comments(ENTRIES))
+        with self.assertRaises(ValueError):
+            Query().order_by('item_id')
+
+    @unittest.skipIf(not frame.HAS_NUMPY, "NumPy is not installed")
+    def test_query_on_entry_frame(self):
+        """
+        Tests that queries run on an EntryFrame return the same entries as on a list.
+        """
+        entry_frame = frame.EntryFrame.from_entries(ENTRIES)
+        self.assertEqual(entry_frame.rows(), ENTRIES)
+        for query in [Query(), Query(TitleMatch('rust') & Points(min=100)).order_by('comments').page(limit=2)]:
+            with self.subTest(query=query):
+                self.assertEqual(query.run(entry_frame), query.run(ENTRIES))
+                self.assertEqual(Filters.query(entry_frame, query), query.run(ENTRIES))
+
+    def test_normalized_keys(self):
+        """
+        Tests that equivalent queries share one normal form.
+        """
+        first = Query(Words(min=6) & Points(min=100) & TitleMatch('Rust python')).order_by('comments')
+        second = Query(TitleMatch('python  RUST')).where(Points(min=100)).where(Words(min=6)).order_by('comments')
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, first.page(limit=10))
+        self.assertNotEqual(Query(Words(min=6) | Points(min=1)), Query(Words(min=6) & Points(min=1)))
+
+    def test_cache_invalidated_by_writes(self):
+        """
+        Tests that repeated queries are answered from the cache until the next write.
+        """
+        cache = QueryCache(maxsize=2)
+        query = Query(TitleMatch('python')).order_by('points')
+        with mock.patch.object(self.db, 'select_entries', wraps=self.db.select_entries) as select:
+            first = query.run(self.db, cache=cache)
+            first.clear()
+            self.assertEqual(len(query.run(self.db, cache=cache)), 3, "Callers get their own copy")
+            self.assertEqual(select.call_count, 1)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            self.db.insert_entries([Entry(8, 'Python wheels explained', 900, 1, 8)])
+            self.assertEqual(query.run(self.db, cache=cache)[0].item_id, 8, "A write invalidates the result")
+            self.assertEqual(select.call_count, 2)
+
+            for limit in (1, 2):
+                query.page(limit=limit).run(self.db, cache=cache)
+            query.run(self.db, cache=cache)
+            self.assertEqual(select.call_count, 5, "The least recently used result is evicted")
+
+    def test_cache_sees_other_connections(self):
+        """
+        Tests that a commit by another connection invalidates the cache.
+        """
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            reader, writer = Database(path), Database(path)
+            writer.insert_entries(ENTRIES)
+            cache = QueryCache()
+            query = Query(Points(min=400))
+            self.assertEqual(len(query.run(reader, cache=cache)), 1)
+            writer.insert_entries([Entry(8, 'Elsewhere', 450, 0, 8)])
+            self.assertEqual(len(query.run(reader, cache=cache)), 2)
+            self.assertEqual(cache.misses, 2)
+            reader.conn.close()
+            writer.conn.close()
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
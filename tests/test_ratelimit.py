@@ -0,0 +1,198 @@
+"""
+This module contains unit tests for the crawler.ratelimit module and for the retry
+handling of the Scraper. The Scraper is tested against a local HTTP stand-in that
+throttles the first requests with 429 and 503 responses.
+
+Classes:
+--------
+ThrottlingHandler:
+    An HTTP request handler that throttles a configurable number of requests.
+TestRateLimit:
+    A class that contains test cases for the limiters and the retry policy.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_ratelimit
+"""
+
+import threading  # Import threading to run the HTTP stand-in in the background
+import time  # Import time to measure the rate limiter
+import unittest  # Import the unittest module for creating and running tests
+from email.utils import formatdate  # Import formatdate to build an HTTP-date Retry-After
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Import the HTTP stand-in classes
+from unittest import mock  # Import mock to build canned responses
+from crawler.entry import Entry  # Import the Entry record the scraper returns
+from crawler.ratelimit import HostLimiter, RateLimiter, RetryPolicy, TokenBucket  # Import the classes under test
+from crawler.scraper import Scraper  # Import the Scraper class to test retries end to end
+
+PAGE = (
+    '<table><tr class="athing" id="11"><td><span class="rank">1.</span></td>'
+    '<td><span class="titleline"><a href="a">Throttled story</a></span></td></tr>'
+    '<tr><td class="subtext"><span class="score" id="score_11">5 points</span> '
+    '<a href="item?id=11">2&nbsp;comments</a></td></tr></table>'
+)
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """
+    An HTTP request handler that throttles a configurable number of requests.
+
+    The server attributes `throttle` (a list of status codes to answer before
+    serving the page) and `requests` (a counter) control and record its behaviour.
+    """
+
+    def do_GET(self):
+        """
+        Answers with the next throttling status, or with the listing page.
+        """
+        with self.server.lock:
+            self.server.requests += 1
+            status = self.server.throttle.pop(0) if self.server.throttle else 200
+        body = (PAGE if status == 200 else 'slow down').encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Silences the request log.
+        """
+
+
+class TestRateLimit(unittest.TestCase):
+    """
+    A test case class that contains test cases for the limiters and the retry policy.
+
+    Methods:
+    --------
+    setUp():
+        Starts the HTTP stand-in on a free local port.
+
+    tearDown():
+        Stops the HTTP stand-in.
+
+    test_scraper_retries_throttled_requests():
+        Tests that the scraper retries 429 and 503 responses and then succeeds.
+
+    test_scraper_gives_up_after_max_retries():
+        Tests that the last failed response is returned after the retries run out.
+
+    test_token_bucket_rate():
+        Tests that the token bucket spaces requests at its rate.
+
+    test_aimd():
+        Tests that the concurrency limit grows on health and halves on throttling.
+
+    test_aimd_recovers_from_lasting_slowdown():
+        Tests that a lasting latency increase becomes the new baseline, so the limit grows again.
+
+    test_retry_delay():
+        Tests that Retry-After is honoured and backoff is jittered and bounded.
+    """
+
+    def setUp(self):
+        """
+        Starts the HTTP stand-in on a free local port.
+        """
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+        self.server.lock = threading.Lock()
+        self.server.throttle = []
+        self.server.requests = 0
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def tearDown(self):
+        """
+        Stops the HTTP stand-in.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_scraper_retries_throttled_requests(self):
+        """
+        Tests that the scraper retries 429 and 503 responses and then succeeds.
+        """
+        self.server.throttle = [429, 503, 429]
+        limiter = RateLimiter(rate=100, burst=5, initial_concurrency=4, cooldown=0)
+        scraper = Scraper(db_path=':memory:', rate_limiter=limiter, retry=RetryPolicy(max_retries=3, backoff=0.01))
+        entries = scraper.fetch_entries(url=self.url)
+        self.assertEqual(entries, [Entry(1, 'Throttled story', 5, 2, 11)])
+        self.assertEqual(self.server.requests, 4, "Should retry every throttled request")
+        host = limiter.for_url(self.url)
+        self.assertLess(host.limit, 4, "Throttling should lower the concurrency limit")
+
+    def test_scraper_gives_up_after_max_retries(self):
+        """
+        Tests that the last failed response is returned after the retries run out.
+        """
+        self.server.throttle = [503] * 5
+        scraper = Scraper(db_path=':memory:', retry=RetryPolicy(max_retries=2, backoff=0.01))
+        response = scraper._request(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.requests, 3, "Should stop after the first attempt and two retries")
+
+    def test_token_bucket_rate(self):
+        """
+        Tests that the token bucket spaces requests at its rate.
+        """
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09, "Five refills at 50/s take 0.1 s")
+
+    def test_aimd(self):
+        """
+        Tests that the concurrency limit grows on health and halves on throttling.
+        """
+        limiter = HostLimiter(initial_concurrency=2, max_concurrency=6, cooldown=0)
+        for _ in range(50):
+            limiter.record(200, 0.1)
+        self.assertEqual(limiter.limit, 6, "Healthy responses should ramp up to the maximum")
+        limiter.record(429, 0.1)
+        self.assertEqual(limiter.limit, 3)
+        limiter.record(200, 5.0)
+        self.assertEqual(limiter.limit, 1.5, "A latency spike should also back off")
+        limiter.record(None, 0.1)
+        self.assertEqual(limiter.limit, 1, "The limit never drops below one request")
+
+    def test_aimd_recovers_from_lasting_slowdown(self):
+        """
+        Tests that a lasting latency increase becomes the new baseline, so the limit grows again.
+        """
+        limiter = HostLimiter(initial_concurrency=4, max_concurrency=4, cooldown=0)
+        for _ in range(20):
+            limiter.record(200, 0.1)
+        for _ in range(2):
+            limiter.record(200, 1.0)
+        self.assertEqual(limiter.limit, 1, "The first slow responses back off")
+        for _ in range(60):
+            limiter.record(200, 1.0)
+        self.assertEqual(limiter.limit, 4, "Once the slowdown is the baseline, the limit grows back")
+        limiter.record(200, 5.0)
+        self.assertEqual(limiter.limit, 2, "A spike over the new baseline still backs off")
+
+    def test_retry_delay(self):
+        """
+        Tests that Retry-After is honoured and backoff is jittered and bounded.
+        """
+        policy = RetryPolicy(backoff=1, max_delay=10)
+        self.assertEqual(policy.delay(0, mock.Mock(headers={'Retry-After': '7'})), 7)
+        self.assertEqual(policy.delay(0, mock.Mock(headers={'Retry-After': '120'})), 10)
+        http_date = formatdate(time.time() + 5, usegmt=True)
+        self.assertAlmostEqual(policy.delay(0, mock.Mock(headers={'Retry-After': http_date})), 5, delta=1.5)
+        delays = [policy.delay(3) for _ in range(200)]
+        self.assertTrue(all(0 <= delay <= 8 for delay in delays), "Backoff should stay under backoff * 2 ** attempt")
+        self.assertGreater(len(set(delays)), 100, "Backoff should be jittered")
+        self.assertTrue(policy.should_retry(429))
+        self.assertFalse(policy.should_retry(404))
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly
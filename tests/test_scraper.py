@@ -18,9 +18,52 @@ Example:
     python -m unittest test_scraper.py
 """
 
+import threading  # Import threading to hold back a download
+import time  # Import time to measure loading a large thread
 import unittest  # Import the unittest module for creating and running tests
+from concurrent.futures import ProcessPoolExecutor  # Import ProcessPoolExecutor to watch the parse jobs
+from unittest import mock  # Import mock to replace HTTP calls with canned listing pages
+from benchmarks.synth import make_item_page  # Import the synthetic item page generator
+from crawler.entry import Entry  # Import the Entry record the scraper returns
+from crawler.parser import parse_comments  # Import the comment parser to time a large thread
 from crawler.scraper import Scraper  # Import the Scraper class from the crawler.scraper module
 
+
+def make_listing(start, count):
+    """
+    Builds a minimal Hacker News listing page with consecutive ranks.
+
+    Parameters:
+    -----------
+    start : int
+        The rank of the first item on the page.
+    count : int
+        The number of items on the page.
+
+    Returns:
+    --------
+    str
+        The HTML content of the listing page.
+    """
+    rows = []
+    for rank in range(start, start + count):
+        rows.append(
+            f'<tr class="athing" id="{1000 + rank}"><td class="title"><span class="rank">{rank}.</span></td>'
+            f'<td class="title"><span class="titleline"><a href="https://example.com/{rank}">Story {rank}</a></span></td></tr>'
+            f'<tr><td class="subtext"><span class="score">{rank * 10} points</span> '
+            f'<a href="item?id={1000 + rank}">{rank}&nbsp;comments</a></td></tr>'
+        )
+    return '<table>' + ''.join(rows) + '</table>'
+
+
+def fake_get(url, **kwargs):
+    """
+    Serves canned listing pages of 30 items, keyed by the ?p= page number.
+    """
+    page = int(url.split('?p=')[1]) if '?p=' in url else 1
+    return mock.Mock(text=make_listing((page - 1) * 30 + 1, 30), status_code=200)
+
+
 class TestScraper(unittest.TestCase):
     """
     A test case class that contains test cases for the Scraper class methods.
@@ -38,6 +81,33 @@ class TestScraper(unittest.TestCase):
     
     test_store_and_fetch_entries():
         Tests storing entries and fetching them from the database.
+    
+    test_page_urls():
+        Tests that listing page URLs are built per section and page.
+    
+    test_fetch_pages_merges_in_rank_order():
+        Tests that concurrently fetched pages are merged in rank order.
+    
+    test_fetch_pages_reuses_session():
+        Tests that every page is fetched through the shared session.
+    
+    test_parse_pages_in_process_pool():
+        Tests that the process pool parses pages like the calling process.
+    
+    test_fetch_and_parse():
+        Tests that staged fetching and parsing keep the order of the URLs.
+    
+    test_fetch_and_parse_does_not_wait_for_slow_page():
+        Tests that downloaded pages are parsed while an earlier page is still downloading.
+    
+    test_scrape_comments():
+        Tests that the threads of the top stories are fetched concurrently and stored.
+    
+    test_large_thread_loads_quickly():
+        Tests that a thread of thousands of comments is parsed and stored in well under a second.
+    
+    test_store_compacts_snapshots():
+        Tests that storing entries compacts the old snapshots at most once per interval.
     """
 
     def setUp(self):
@@ -66,16 +136,20 @@ class TestScraper(unittest.TestCase):
             # Iterate over each entry in the entries list
             self.assertIsInstance(entry, tuple, "Entry should be a tuple")
             # Assert that each entry is an instance of tuple with a custom error message
-            self.assertEqual(len(entry), 4, "Entry should have four elements")
-            # Assert that each entry has exactly 4 elements with a custom error message
-            self.assertIsInstance(entry[0], str, "Number should be a string")
-            # Assert that the first element of each entry is a string with a custom error message
+            self.assertIsInstance(entry, Entry, "Entry should be an Entry record")
+            # Assert that each entry is an Entry record, which is still a tuple
+            self.assertEqual(len(entry), 6, "Entry should have six elements")
+            # Assert that each entry has exactly 6 elements with a custom error message
+            self.assertIsInstance(entry[0], int, "Rank should be an integer")
+            # Assert that the first element of each entry is an integer with a custom error message
             self.assertIsInstance(entry[1], str, "Title should be a string")
             # Assert that the second element of each entry is a string with a custom error message
             self.assertIsInstance(entry[2], int, "Points should be an integer")
             # Assert that the third element of each entry is an integer with a custom error message
             self.assertIsInstance(entry[3], int, "Comments should be an integer")
             # Assert that the fourth element of each entry is an integer with a custom error message
+            self.assertIsInstance(entry[4], int, "Item id should be an integer")
+            # Assert that the fifth element of each entry is an integer with a custom error message
 
     def test_store_and_fetch_entries(self):
         """
@@ -93,6 +167,143 @@ class TestScraper(unittest.TestCase):
         self.assertGreaterEqual(len(stored_entries), 2, "Should store and fetch at least the number of entries inserted")
         # Assert that the number of stored entries is at least the number of entries inserted, with a custom error message
 
+    def test_page_urls(self):
+        """
+        Tests that listing page URLs are built per section and page.
+        """
+        urls = self.scraper.page_urls(pages=2, sections=('', 'newest'))
+        self.assertEqual(urls, [
+            Scraper.BASE_URL,
+            Scraper.BASE_URL + '?p=2',
+            Scraper.BASE_URL + 'newest',
+            Scraper.BASE_URL + 'newest?p=2',
+        ])
+        with self.assertRaises(ValueError):
+            self.scraper.page_urls(sections=('nonexistent',))
+
+    def test_fetch_pages_merges_in_rank_order(self):
+        """
+        Tests that concurrently fetched pages are merged in rank order.
+        """
+        with mock.patch.object(self.scraper.session, 'get', side_effect=fake_get):
+            entries = self.scraper.fetch_pages(pages=3, workers=3)
+        self.assertEqual(len(entries), 90, "Should merge every entry of every page")
+        self.assertEqual([entry.rank for entry in entries], list(range(1, 91)), "Entries should be in rank order")
+
+    def test_fetch_pages_reuses_session(self):
+        """
+        Tests that every page is fetched through the shared session.
+        """
+        with mock.patch.object(self.scraper.session, 'get', side_effect=fake_get) as get:
+            self.scraper.fetch_pages(pages=2, sections=('', 'ask'))
+        self.assertEqual(get.call_count, 4, "Should issue one request per page through the session")
+
+    def test_parse_pages_in_process_pool(self):
+        """
+        Tests that the process pool parses pages like the calling process.
+        """
+        pages = [make_listing(start, 30).encode() for start in (1, 31, 61)] + [None]
+        in_process = Scraper(db_path=':memory:', parse_workers=0).parse_pages(pages)
+        pooled = Scraper(db_path=':memory:', parse_workers=2).parse_pages(pages)
+        self.assertEqual(pooled, in_process)
+        self.assertEqual([len(page) for page in pooled], [30, 30, 30, 0])
+
+    def test_fetch_and_parse(self):
+        """
+        Tests that staged fetching and parsing keep the order of the URLs.
+        """
+        scraper = Scraper(db_path=':memory:', parse_workers=2)
+
+        def fake_raw_get(url, **kwargs):
+            return mock.Mock(status_code=200, content=fake_get(url).text.encode())
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_raw_get):
+            pages = scraper.fetch_and_parse(scraper.page_urls(pages=3))
+        self.assertEqual([page[0].rank for page in pages], [1, 31, 61])
+
+    def test_fetch_and_parse_does_not_wait_for_slow_page(self):
+        """
+        Tests that downloaded pages are parsed while an earlier page is still downloading.
+        """
+        scraper = Scraper(db_path=':memory:', workers=3, parse_workers=2)
+        others_parsing = threading.Event()
+        submit = ProcessPoolExecutor.submit
+        submitted = []
+        waits = []
+
+        def counting_submit(executor, *args, **kwargs):
+            submitted.append(args)
+            if len(submitted) == 2:
+                others_parsing.set()
+            return submit(executor, *args, **kwargs)
+
+        def fake_raw_get(url, **kwargs):
+            if url == Scraper.BASE_URL:
+                waits.append(others_parsing.wait(5))
+            return mock.Mock(status_code=200, content=fake_get(url).text.encode())
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_raw_get), \
+                mock.patch.object(ProcessPoolExecutor, 'submit', counting_submit):
+            pages = scraper.fetch_and_parse(scraper.page_urls(pages=3))
+        self.assertEqual(waits, [True], "The later pages are parsed before the first one arrives")
+        self.assertEqual([page[0].rank for page in pages], [1, 31, 61], "The pages keep the order of the URLs")
+
+    def test_scrape_comments(self):
+        """
+        Tests that the threads of the top stories are fetched concurrently and stored.
+        """
+        scraper = Scraper(db_path=':memory:')
+        scraper.store_entries([Entry(rank, f'Story {rank}', rank * 10, rank, rank * 1000) for rank in range(1, 6)])
+
+        def fake_item_get(url, **kwargs):
+            story_id = int(url.rsplit('=', 1)[1])
+            return mock.Mock(status_code=200, text=make_item_page(comments=story_id // 100, story_id=story_id))
+
+        with mock.patch.object(scraper.session, 'get', side_effect=fake_item_get) as get:
+            stored = scraper.scrape_comments(top=3)
+        self.assertEqual(stored, {5000: 50, 4000: 40, 3000: 30}, "The stories with the most points are crawled")
+        self.assertEqual(sorted(call.args[0] for call in get.call_args_list),
+                         [Scraper.ITEM_URL + str(item_id) for item_id in (3000, 4000, 5000)])
+        self.assertEqual(len(scraper.db.fetch_thread(4000)), 40)
+        self.assertEqual({comment.story_id for comment in scraper.db.fetch_thread(5000)}, {5000})
+
+    def test_large_thread_loads_quickly(self):
+        """
+        Tests that a thread of thousands of comments is parsed and stored in well under a second.
+        """
+        scraper = Scraper(db_path=':memory:')
+        html = make_item_page(comments=5000, story_id=1)
+        start = time.perf_counter()
+        stored = scraper.db.store_comments(1, parse_comments(html, 1))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(stored, 5000)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(len(scraper.db.fetch_thread(1)), 5000)
+
+    def test_store_compacts_snapshots(self):
+        """
+        Tests that storing entries compacts the old snapshots at most once per interval.
+        """
+        scraper = Scraper(db_path=':memory:', compact_interval=3600)
+        # Every 10 minutes for four hours, three days ago, and one snapshot past the 30-day retention.
+        start = (int(time.time()) // 3600 - 72) * 3600
+        for minutes in range(0, 240, 10):
+            scraper.db.record_snapshots([Entry(1, 'Old story', minutes, 0, 5)], crawled_at=start + minutes * 60)
+        scraper.db.record_snapshots([Entry(1, 'Old story', 1, 0, 5)], crawled_at=time.time() - 40 * 86400)
+        count = 'SELECT COUNT(*) FROM snapshots'
+        self.assertEqual(scraper.db.conn.execute(count).fetchone()[0], 25)
+
+        with mock.patch.object(scraper.db, 'compact_snapshots', wraps=scraper.db.compact_snapshots) as compact:
+            scraper.store_entries([Entry(1, 'Old story', 99, 1, 5)])
+            self.assertEqual(scraper.db.conn.execute(count).fetchone()[0], 5,
+                             "One snapshot per old hour is kept, besides the new one")
+            scraper.store_entries([Entry(1, 'Old story', 100, 1, 5)])
+            self.assertEqual(compact.call_count, 1, "Compaction runs once per interval")
+            scraper._compacted_at -= 3600
+            scraper.store_entries([Entry(1, 'Old story', 101, 1, 5)])
+            self.assertEqual(compact.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
     # Run the unit tests if this script is executed directly
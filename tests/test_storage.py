@@ -19,6 +19,8 @@ Example:
 
 import unittest  # Import the unittest module for creating and running tests
 import os  # Import the os module for interacting with the operating system
+import sqlite3  # Import sqlite3 to build a database with the original schema
+from crawler.entry import Comment, Entry  # Import the records the database returns
 from crawler.storage import Database  # Import the Database class from the crawler.storage module
 
 class TestDatabase(unittest.TestCase):
@@ -41,6 +43,45 @@ class TestDatabase(unittest.TestCase):
     
     test_fetch_all_entries():
         Tests the fetch_all_entries method of the Database class.
+    
+    test_insert_entries():
+        Tests the insert_entries method of the Database class.
+    
+    test_performance_profile():
+        Tests that the performance profile applies its pragmas.
+    
+    test_upsert_by_item_id():
+        Tests that entries with a known item id are updated in place.
+    
+    test_migration_collapses_duplicates():
+        Tests that migrating an original database removes duplicate rows.
+    
+    test_crawl_after_migration_updates_legacy_rows():
+        Tests that the first crawl after the migration updates the rows without item id in place.
+    
+    test_adopt_legacy_rows_uses_partial_index():
+        Tests that a legacy title is looked up in the partial index, not among all rows without item id.
+    
+    test_fetch_entries_by():
+        Tests filtering, ordering and paging entries in SQLite.
+    
+    test_iter_entries():
+        Tests that iter_entries streams every entry in batches.
+    
+    test_snapshot_movers():
+        Tests the velocity and top movers queries over recorded snapshots.
+    
+    test_compact_snapshots():
+        Tests that old snapshots are downsampled per bucket and the oldest deleted.
+    
+    test_search_titles():
+        Tests full-text search combined with the other criteria and kept in sync on upserts.
+    
+    test_search_without_index():
+        Tests that search falls back to LIKE without the index and that rebuild restores it.
+    
+    test_comment_threads():
+        Tests storing a thread and walking it down and up with the recursive queries.
     """
 
     def setUp(self):
@@ -60,8 +101,9 @@ class TestDatabase(unittest.TestCase):
         Closes the database connection and removes the test database file if it exists.
         """
         self.db.conn.close()
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
 
     def test_insert_entry(self):
         """
@@ -72,7 +114,7 @@ class TestDatabase(unittest.TestCase):
         entry = ('1', 'Test title', 100, 50)
         self.db.insert_entry(entry)
         entries = self.db.fetch_all_entries()
-        self.assertIn(entry, entries, "Inserted entry should be present in the database")
+        self.assertIn(Entry(1, 'Test title', 100, 50), entries, "Inserted entry should be present in the database")
 
     def test_log_usage(self):
         """
@@ -103,6 +145,248 @@ class TestDatabase(unittest.TestCase):
         fetched_entries = self.db.fetch_all_entries()
         self.assertGreaterEqual(len(fetched_entries), 2, "Should fetch all inserted entries")
 
+    def test_insert_entries(self):
+        """
+        Tests the insert_entries method of the Database class.
+
+        Verifies that many entries are written in one call and fetched back in order.
+        """
+        entries = [Entry(i, f'Bulk title {i}', i, i * 2) for i in range(1, 501)]
+        inserted = self.db.insert_entries(iter(entries))
+        self.assertEqual(inserted, 500, "Should report the number of inserted entries")
+        self.assertEqual(self.db.fetch_all_entries(), entries, "Should fetch every bulk-inserted entry")
+
+    def test_performance_profile(self):
+        """
+        Tests that the performance profile applies its pragmas.
+        """
+        self.db.conn.close()
+        self.db = Database(self.db_path, performance=True)
+        self.assertEqual(self.db.conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(self.db.conn.execute('PRAGMA synchronous').fetchone()[0], 1, "NORMAL is 1")
+        self.assertEqual(self.db.conn.execute('PRAGMA cache_size').fetchone()[0], -64000)
+
+    def test_upsert_by_item_id(self):
+        """
+        Tests that entries with a known item id are updated in place.
+        """
+        self.db.insert_entries([('1', 'First story', 10, 1, 501), ('2', 'Second story', 20, 2, 502)])
+        self.db.insert_entries([('3', 'First story', 15, 4, 501), ('1', 'Third story', 5, 0, 503)])
+        entries = self.db.fetch_all_entries()
+        self.assertEqual(len(entries), 3, "Repeated item ids should not add rows")
+        self.assertIn(Entry(3, 'First story', 15, 4, 501), entries, "Points, comments and rank should be updated")
+
+    def test_migration_collapses_duplicates(self):
+        """
+        Tests that migrating an original database removes duplicate rows.
+        """
+        self.db.conn.close()
+        os.remove(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('CREATE TABLE entries (id INTEGER PRIMARY KEY, number TEXT, title TEXT, points INTEGER, comments INTEGER)')
+        conn.executemany('INSERT INTO entries (number, title, points, comments) VALUES (?, ?, ?, ?)', [
+            ('1', 'Old story', 10, 1),
+            ('2', 'Other story', 5, 0),
+            ('1', 'Old story', 30, 8),
+        ])
+        conn.commit()
+        conn.close()
+
+        self.db = Database(self.db_path)
+        self.assertEqual(sorted(entry[:4] for entry in self.db.fetch_all_entries()),
+                         [(1, 'Old story', 30, 8), (2, 'Other story', 5, 0)], "Ranks should become integers")
+        word_counts = self.db.conn.execute('SELECT title_word_count FROM entries').fetchall()
+        self.assertEqual(word_counts, [(2,), (2,)], "Word counts should be backfilled")
+        columns = [row[1] for row in self.db.conn.execute('PRAGMA table_info(entries)')]
+        self.assertIn('rank', columns)
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            self.assertNotIn('number', columns, "The text number column should be dropped")
+        version = self.db.conn.execute('PRAGMA user_version').fetchone()[0]
+        self.assertEqual(version, len(Database.MIGRATIONS), "Every migration should be recorded")
+
+    def test_crawl_after_migration_updates_legacy_rows(self):
+        """
+        Tests that the first crawl after the migration updates the rows without item id in place.
+        """
+        self.db.insert_entries([('1', 'Old story', 10, 1), ('2', 'Twice', 5, 0), ('3', 'Twice', 6, 0),
+                                ('4', 'Gone story', 1, 0)])
+        self.db.insert_entries([Entry(1, 'Old story', 30, 8, 901), Entry(2, 'Twice', 7, 1, 902),
+                                Entry(3, 'Twice', 8, 2, 903), Entry(4, 'New story', 2, 0, 904)])
+        self.db.insert_entry(Entry(5, 'Gone story', 3, 1, 905))
+        self.assertEqual(sorted(self.db.fetch_all_entries(), key=lambda entry: entry.item_id), [
+            Entry(1, 'Old story', 30, 8, 901),
+            Entry(2, 'Twice', 7, 1, 902),
+            Entry(3, 'Twice', 8, 2, 903),
+            Entry(4, 'New story', 2, 0, 904),
+            Entry(5, 'Gone story', 3, 1, 905),
+        ], "Each legacy row takes the item id of one entry with its title")
+        self.db.insert_entries([Entry(1, 'Old story', 40, 9, 901)])
+        self.assertEqual(len(self.db.fetch_all_entries()), 5)
+        self.assertEqual(len(self.db.search_titles('story')), 3, "The title index follows the adopted rows")
+
+    def test_adopt_legacy_rows_uses_partial_index(self):
+        """
+        Tests that a legacy title is looked up in the partial index, not among all rows without item id.
+        """
+        plan = self.db.conn.execute('EXPLAIN QUERY PLAN ' + Database.ADOPT_LEGACY_ENTRY, (1, 'title')).fetchall()
+        self.assertTrue(any('idx_entries_legacy_title' in row[-1] for row in plan), plan)
+
+    def test_fetch_entries_by(self):
+        """
+        Tests filtering, ordering and paging entries in SQLite.
+        """
+        self.db.insert_entries([
+            ('1', 'one two three four five six', 10, 3, 1),
+            ('2', 'short title', 50, 9, 2),
+            ('3', 'a title with exactly six words', 20, 7, 3),
+            ('4', 'tiny', 70, 1, 4),
+        ])
+        long_titles = self.db.fetch_entries_by('comments', min_words=6)
+        self.assertEqual([entry.rank for entry in long_titles], [3, 1])
+        short_titles = self.db.fetch_entries_by('points', max_words=5, limit=1, offset=1)
+        self.assertEqual([entry.rank for entry in short_titles], [2])
+        plan = ' '.join(row[-1] for row in self.db.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM entries WHERE title_word_count >= 6 ORDER BY comments DESC'))
+        self.assertIn('idx_entries_words', plan, "The word count index should be used")
+        with self.assertRaises(ValueError):
+            self.db.fetch_entries_by('title')
+
+    def test_iter_entries(self):
+        """
+        Tests that iter_entries streams every entry in batches.
+        """
+        entries = [Entry(i, f'Streamed title {i}', i, i, i) for i in range(1, 12)]
+        self.db.insert_entries(entries)
+        streamed = self.db.iter_entries(batch_size=4)
+        self.assertEqual(next(streamed), entries[0], "Should yield before reading the whole table")
+        self.assertEqual([entries[0]] + list(streamed), entries)
+
+    def test_snapshot_movers(self):
+        """
+        Tests the velocity and top movers queries over recorded snapshots.
+        """
+        now = 1_700_000_000
+        self.db.insert_entries([Entry(5, 'Rising story', 10, 1, 71), Entry(1, 'Steady story', 300, 90, 72),
+                                Entry(9, 'No id story', 1, 0)], snapshot_at=now - 7200)
+        self.db.insert_entries([Entry(3, 'Rising story', 40, 6, 71), Entry(2, 'Steady story', 310, 95, 72)],
+                               snapshot_at=now - 1800)
+        self.db.record_snapshots([Entry(1, 'Rising story', 130, 20, 71), Entry(4, 'Steady story', 320, 96, 72),
+                                  Entry(6, 'New story', 5, 0, 73)], crawled_at=now)
+        self.assertEqual(self.db.conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0], 7)
+
+        velocity = self.db.fetch_velocity(71, now=now)
+        self.assertEqual(velocity[0], (now - 7200, 5, 10, 1, None, None, None))
+        self.assertEqual(velocity[2], (now, 1, 130, 20, 90, 14, 180.0))
+        self.assertEqual(len(self.db.fetch_velocity(71, window=3600, now=now)), 2)
+
+        movers = self.db.fetch_top_movers(window=3600, now=now)
+        self.assertEqual([mover.item_id for mover in movers], [71, 72], "Items seen once are left out")
+        self.assertEqual(movers[0], (71, 'Rising story', 1, 130, 20, 90, 14, 2, 180.0))
+        by_rank = self.db.fetch_top_movers(window=86400, order_by='rank_change', limit=1, now=now)
+        self.assertEqual(by_rank[0].item_id, 71)
+        self.assertEqual(by_rank[0].points_gained, 120)
+        with self.assertRaises(ValueError):
+            self.db.fetch_top_movers(order_by='title')
+
+    def test_compact_snapshots(self):
+        """
+        Tests that old snapshots are downsampled per bucket and the oldest deleted.
+        """
+        now = 1_700_006_400  # A multiple of 3600, so buckets start on the hour.
+        hour, day = 3600, 86400
+        times = [now - 40 * day] + [now - 3 * day + minute * 600 for minute in range(12)] + [now - 60, now]
+        for crawled_at in times:
+            self.db.record_snapshots([Entry(1, 'Story', crawled_at % 1000, 0, 81)], crawled_at=crawled_at)
+        deleted = self.db.compact_snapshots(keep_full=day, bucket=hour, max_age=30 * day, now=now)
+        self.assertEqual(deleted, 1 + 10, "The 40-day-old row goes, and two hours of rows become one each")
+        kept = [row[0] for row in self.db.fetch_velocity(81, now=now)]
+        self.assertEqual(kept, [now - 3 * day + 3000, now - 3 * day + 6600, now - 60, now],
+                         "The last snapshot of each bucket and every recent one should be kept")
+        self.assertEqual(self.db.compact_snapshots(keep_full=day, bucket=hour, now=now), 0)
+
+    def test_search_titles(self):
+        """
+        Tests full-text search combined with the other criteria and kept in sync on upserts.
+        """
+        self.db.insert_entries([
+            Entry(1, 'Rust in production at scale', 300, 40, 91),
+            Entry(2, 'Why we rewrote it in Rust', 120, 250, 92),
+            Entry(3, 'Rust', 80, 5, 93),
+            Entry(4, 'Trusting trust revisited', 500, 90, 94),
+            Entry(5, 'A Café for rustaceans', 20, 2, 95),
+        ])
+        self.assertTrue(self.db.has_title_index())
+        by_comments = self.db.search_titles('RUST', order_by='comments')
+        self.assertEqual([entry.item_id for entry in by_comments], [92, 91, 93], "Whole words only, any case")
+        self.assertEqual(self.db.search_titles('rust', order_by='relevance')[0].item_id, 93,
+                         "BM25 should favour the shortest matching title")
+        long_popular = self.db.search_titles('rust', order_by='points', min_words=6, min_points=100)
+        self.assertEqual([entry.item_id for entry in long_popular], [92])
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('cafe')], [95], "Accents are ignored")
+        self.assertEqual(len(self.db.search_titles('fts:rust*')), 4)
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('"rust" AT (')], [91],
+                         "Quotes, operators and brackets are plain words, not query syntax")
+
+        self.db.insert_entries([Entry(1, 'Zig in production at scale', 310, 41, 91)])
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('production')], [91])
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('rust', order_by='points')], [92, 93])
+        self.db.conn.execute('DELETE FROM entries WHERE item_id = 92')
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('rust')], [93])
+        with self.assertRaises(ValueError):
+            self.db.search_titles('   ')
+        with self.assertRaises(ValueError):
+            self.db.search_titles('rust', order_by='title')
+
+    def test_search_without_index(self):
+        """
+        Tests that search falls back to LIKE without the index and that rebuild restores it.
+        """
+        self.db.insert_entries([Entry(1, 'Go 100% generics', 10, 1, 1), Entry(2, 'Go modules', 30, 3, 2)])
+        with self.db.conn:
+            for trigger in ('insert', 'delete', 'update'):
+                self.db.conn.execute(f'DROP TRIGGER entries_fts_{trigger}')
+            self.db.conn.execute('DROP TABLE entries_fts')
+        self.db.insert_entries([Entry(3, 'Gophers', 50, 5, 3)])
+        self.assertFalse(self.db.has_title_index())
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('go', order_by='points')], [3, 2, 1],
+                         "LIKE matches substrings")
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('100%')], [1])
+        self.db.rebuild_title_index()
+        self.assertTrue(self.db.has_title_index())
+        self.assertEqual([entry.item_id for entry in self.db.search_titles('go', order_by='points')], [2, 1])
+
+    def test_comment_threads(self):
+        """
+        Tests storing a thread and walking it down and up with the recursive queries.
+        """
+        # 1 ─ 11 ─ 12 ─ 13
+        #   │    └ 14
+        #   └ 15 ─ 16
+        thread = [
+            Comment(11, 1, 1, 0, 'alice', '2026-10-18T08:01:00', 'Top'),
+            Comment(12, 1, 11, 1, 'bob', '2026-10-18T08:02:00', 'Reply'),
+            Comment(13, 1, 12, 2, None, None, ''),
+            Comment(14, 1, 11, 1, 'carol', '2026-10-18T08:04:00', 'Second reply'),
+            Comment(15, 1, 1, 0, 'dave', '2026-10-18T08:05:00', 'Another top'),
+            Comment(16, 1, 15, 1, 'erin', '2026-10-18T08:06:00', 'Last'),
+        ]
+        self.assertEqual(self.db.store_comments(1, thread), 6)
+        self.db.store_comments(2, [Comment(21, 2, 2, 0, 'frank', None, 'Elsewhere')])
+        self.assertEqual(self.db.fetch_thread(1), thread, "The whole thread comes back in display order")
+        self.assertEqual(self.db.fetch_thread(11), thread[1:4])
+        self.assertEqual(self.db.fetch_thread(11, max_depth=1), [thread[1], thread[3]])
+        self.assertEqual(self.db.fetch_thread(1, max_depth=1), [thread[0], thread[4]])
+        self.assertEqual(self.db.fetch_thread(13), [])
+        self.assertEqual(self.db.fetch_ancestors(13), thread[:2])
+        self.assertEqual(self.db.fetch_ancestors(11), [])
+
+        # A new crawl replaces the thread, dropping the comments that disappeared.
+        self.db.store_comments(1, [thread[0], Comment(17, 1, 11, 1, 'gina', None, 'New')])
+        self.assertEqual([comment.comment_id for comment in self.db.fetch_thread(1)], [11, 17])
+        self.assertEqual([comment.comment_id for comment in self.db.fetch_thread(2)], [21])
+        plan = self.db.conn.execute('EXPLAIN QUERY PLAN SELECT id FROM comments WHERE parent_id = 1').fetchall()
+        self.assertIn('idx_comments_parent', plan[0][-1])
+
 if __name__ == '__main__':
     unittest.main()
     # Run the unit tests if this script is executed directly
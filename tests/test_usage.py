@@ -0,0 +1,212 @@
+"""
+This module contains unit tests for the crawler.usage module.
+
+Classes:
+--------
+TestUsage:
+    A class that contains test cases for the buffered usage logger.
+
+Usage:
+------
+To run the tests, execute this module directly. The unittest framework will discover and run all test cases.
+
+Example:
+--------
+    python -m unittest tests.test_usage
+"""
+
+import os  # Import os to remove the temporary database
+import sqlite3  # Import sqlite3 to check the error of an unusable database
+import tempfile  # Import tempfile to create a temporary database
+import threading  # Import threading to hold the writer thread
+import time  # Import time to wait for the flush interval
+import unittest  # Import the unittest module for creating and running tests
+from unittest import mock  # Import mock to slow down the writes
+from crawler.scraper import Scraper  # Import the Scraper class to test the integration
+from crawler.storage import Database  # Import the Database class to read the usage table
+from crawler.usage import BufferedUsageLogger  # Import the class under test
+
+
+class TestUsage(unittest.TestCase):
+    """
+    A test case class that contains test cases for the buffered usage logger.
+
+    Methods:
+    --------
+    setUp():
+        Creates a temporary database file.
+
+    tearDown():
+        Removes the temporary database file.
+
+    test_batches_by_size():
+        Tests that full batches are written in one transaction each.
+
+    test_flushes_by_time():
+        Tests that a partial batch is written after the flush interval.
+
+    test_close_flushes_queued_events():
+        Tests that leaving the context manager writes every queued event.
+
+    test_drops_when_full():
+        Tests that events are dropped and counted when the queue is full or the logger is closed.
+
+    test_scraper_uses_logger():
+        Tests that Scraper.log_usage goes through the configured logger.
+
+    test_open_error_is_raised():
+        Tests that a database the writer thread cannot open fails the constructor.
+
+    test_close_while_logging():
+        Tests that an event logged while close() runs is either written or counted as dropped.
+
+    test_close_while_flushing():
+        Tests that a flush racing with close() returns once the events are written.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary database file.
+        """
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = Database(self.path)
+
+    def tearDown(self):
+        """
+        Removes the temporary database file.
+        """
+        self.db.conn.close()
+        os.remove(self.path)
+
+    def count_usage(self):
+        """
+        Returns the number of rows in the usage table.
+        """
+        return self.db.conn.execute('SELECT COUNT(*) FROM usage').fetchone()[0]
+
+    def test_batches_by_size(self):
+        """
+        Tests that full batches are written in one transaction each.
+        """
+        with BufferedUsageLogger(self.path, max_batch=10, flush_interval=60) as usage:
+            for _ in range(30):
+                usage.log('points')
+            self.assertTrue(usage.flush(timeout=5))
+            self.assertEqual(self.count_usage(), 30)
+            self.assertLessEqual(usage.stats['batches'], 3, "Should write at most one batch per 10 events")
+
+    def test_flushes_by_time(self):
+        """
+        Tests that a partial batch is written after the flush interval.
+        """
+        with BufferedUsageLogger(self.path, max_batch=100, flush_interval=0.05) as usage:
+            usage.log('comments', '2024-01-01T00:00:00')
+            time.sleep(0.5)
+            self.assertEqual(usage.stats['flushed'], 1)
+        rows = self.db.conn.execute('SELECT timestamp, filter_type FROM usage').fetchall()
+        self.assertEqual(rows, [('2024-01-01T00:00:00', 'comments')])
+
+    def test_close_flushes_queued_events(self):
+        """
+        Tests that leaving the context manager writes every queued event.
+        """
+        with BufferedUsageLogger(self.path, max_batch=1000, flush_interval=60) as usage:
+            for _ in range(250):
+                usage.log('points')
+        self.assertEqual(self.count_usage(), 250)
+        self.assertEqual(usage.stats, {'logged': 250, 'flushed': 250, 'dropped': 0, 'failed': 0, 'batches': 1})
+
+    def test_drops_when_full(self):
+        """
+        Tests that events are dropped and counted when the queue is full or the logger is closed.
+        """
+        writing = threading.Event()
+        release = threading.Event()
+        log_usage_many = Database.log_usage_many
+
+        def slow_write(db, events):
+            writing.set()
+            release.wait(5)
+            return log_usage_many(db, events)
+
+        with mock.patch.object(Database, 'log_usage_many', slow_write):
+            usage = BufferedUsageLogger(self.path, max_batch=1, flush_interval=60, max_queue=2)
+            self.assertTrue(usage.log('points'))
+            self.assertTrue(writing.wait(5), "The writer should pick up the first event")
+            results = [usage.log('points') for _ in range(4)]
+            release.set()
+            usage.close()
+        self.assertEqual(results, [True, True, False, False])
+        self.assertFalse(usage.log('points'), "A closed logger should drop events")
+        self.assertEqual(usage.stats['dropped'], 3)
+        self.assertEqual(self.count_usage(), 3)
+
+    def test_scraper_uses_logger(self):
+        """
+        Tests that Scraper.log_usage goes through the configured logger.
+        """
+        with BufferedUsageLogger(self.path, flush_interval=60) as usage:
+            scraper = Scraper(db_path=self.path, usage_logger=usage)
+            scraper.log_usage('comments')
+            scraper.log_usage('points')
+            self.assertEqual(usage.stats['logged'], 2)
+        self.assertEqual(self.count_usage(), 2)
+        scraper.db.conn.close()
+
+    def test_open_error_is_raised(self):
+        """
+        Tests that a database the writer thread cannot open fails the constructor.
+        """
+        with self.assertRaises(sqlite3.OperationalError):
+            BufferedUsageLogger(os.path.join(self.path, 'missing', 'usage.db'))
+
+    def test_close_while_logging(self):
+        """
+        Tests that an event logged while close() runs is either written or counted as dropped.
+        """
+        usage = BufferedUsageLogger(self.path, flush_interval=60)
+        put_nowait = usage._queue.put_nowait
+        closer = threading.Thread(target=usage.close)
+
+        def close_then_put(item):
+            # close() starts between the closed check and the queueing of the event.
+            closer.start()
+            closer.join(0.2)
+            put_nowait(item)
+
+        with mock.patch.object(usage._queue, 'put_nowait', side_effect=close_then_put):
+            logged = usage.log('points')
+        closer.join()
+        self.assertTrue(logged)
+        self.assertEqual((usage.stats['logged'], usage.stats['flushed']), (1, 1))
+        self.assertEqual(self.count_usage(), 1)
+
+    def test_close_while_flushing(self):
+        """
+        Tests that a flush racing with close() returns once the events are written.
+        """
+        usage = BufferedUsageLogger(self.path, flush_interval=60)
+        usage.log('points')
+        queue_put, queue_put_nowait = usage._queue.put, usage._queue.put_nowait
+        closer = threading.Thread(target=usage.close)
+
+        def close_then_put(put):
+            def wrapper(item, *args, **kwargs):
+                if isinstance(item, threading.Event) and closer.ident is None:
+                    # close() starts between the closed check and the queueing of the flush marker.
+                    closer.start()
+                    closer.join(0.2)
+                return put(item, *args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(usage._queue, 'put', side_effect=close_then_put(queue_put)), \
+                mock.patch.object(usage._queue, 'put_nowait', side_effect=close_then_put(queue_put_nowait)):
+            flushed = usage.flush(timeout=2)
+        closer.join()
+        self.assertTrue(flushed, "The flush marker should not be queued after close()")
+        self.assertEqual(self.count_usage(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()  # Run the unit tests if this script is executed directly